@@ -1,5 +1,9 @@
+import io
+import lzma
+import zlib
+
 from source.vm_core.bytecodes import CORRECT_MODULE_SIGNATURE
-from source.vm_core.bytecodes import LiteralTags, SlotKindTags
+from source.vm_core.bytecodes import Opcodes, LiteralTags, ModuleFormatTags, SlotKindTags, JUMP_OPCODES, get_jump_target
 
 from source.vm_core.object_kinds import VM_ByteArray, VM_Code, VM_Assignment
 from source.vm_core.object_layout import VM_Object, SlotKind
@@ -12,27 +16,83 @@ from source.vm_core.object_layout import VM_Object, SlotKind
 class DeserializationError(Exception):
     pass
 
+# number of bytes deserializer reads from stream at once - bytes already parsed are dropped, so this bounds its buffer
+READ_AHEAD_SIZE = 64 * 1024
+
+# size of pieces in which compressed module is fed into decompressor
+COMPRESSED_CHUNK_SIZE = 64 * 1024
+
+
 class BytecodeDeserializer:
-    def __init__(self, universe, byte_list):
+    def __init__(self, universe, byte_list=b"", stream=None):
+        """
+        :param universe: universe in which objects are created
+        :param byte_list: bytes to parse
+        :param stream: optional binary stream, parsed after byte list - it is read only as parsing reaches it
+        """
         self._universe = universe
-        self._byte_list = byte_list
+
+        # bytes read ahead, index points to first unparsed one
+        self._window = bytes(byte_list)
         self._index = 0
 
+        self._stream = stream if stream is not None else io.BytesIO()
+
+        # symbols of module symbol pool, in order of their indices
+        self._symbol_pool = []
+
+
+    def _make_available(self, number):
+        """
+        Reads stream until window holds specified number of bytes after current index, or until stream ends.
+        Parsed bytes are dropped from window, so it never holds much more than requested bytes and READ_AHEAD_SIZE.
+        Stream is read in pieces of READ_AHEAD_SIZE, so number taken from size field of malformed module
+        can't make it allocate more than the stream really contains.
+        """
+        pieces = [self._window[self._index:]]
+        missing_count = number - len(pieces[0])
+
+        while missing_count > 0:
+            piece = self._stream.read(READ_AHEAD_SIZE)
+
+            if not piece:
+                break
+
+            pieces.append(piece)
+            missing_count -= len(piece)
+
+        self._window = b"".join(pieces)
+        self._index = 0
 
     def _is_finished(self):
-        return self._index >= len(self._byte_list)
+        if self._index >= len(self._window):
+            self._make_available(1)
+
+        return self._index >= len(self._window)
 
     def _get_current(self):
-        return self._byte_list[self._index]
+        if self._is_finished():
+            raise DeserializationError("Unexpected end of module")
+
+        return self._window[self._index]
 
     def _get_next_n_bytes(self, number):
-        if self._index + number > len(self._byte_list):
-            raise DeserializationError()
+        """
+        :return: bytes object with next number of bytes
+        """
+        if number < 0:
+            raise DeserializationError("Negative size")
+
+        if self._index + number > len(self._window):
+            self._make_available(number)
+
+            if number > len(self._window):
+                raise DeserializationError("Unexpected end of module")
 
         old_index = self._index
         self._index += number
 
-        return ( self._byte_list[local_index] for local_index in range(old_index, self._index) )
+        return self._window[old_index:self._index]
 
     def _move_by(self, distance):
         self._index += distance
@@ -51,14 +111,39 @@ class BytecodeDeserializer:
         arity = self._get_next_int64()
         character_count = self._get_next_int64()
 
-        symbol_text = "".join(chr(ch) for ch in self._get_next_n_bytes(character_count))
+        # every byte is one character
+        symbol_text = self._get_next_n_bytes(character_count).decode("latin-1")
 
         return self._universe.new_symbol(symbol_text, arity)
 
+    def unchecked_parse_symbol_reference(self):
+        pool_index = self._get_next_int64()
+
+        if not (0 <= pool_index < len(self._symbol_pool)):
+            raise DeserializationError("Symbol reference {} outside of symbol pool".format(pool_index))
+
+        return self._symbol_pool[pool_index]
+
     def parse_symbol(self):
+        """Parses symbol, either written in place or referenced from symbol pool"""
+        if self._get_current() == LiteralTags.VM_SYMBOL_REFERENCE:
+            self._move_by(1)
+            return self.unchecked_parse_symbol_reference()
+
         self._check_tag(LiteralTags.VM_SYMBOL)
         return self.unchecked_parse_symbol()
 
+    def parse_symbol_pool(self):
+        """Parses symbol pool section - every symbol is decoded and created only once, then shared by all its references"""
+        self._check_tag(ModuleFormatTags.SYMBOL_POOL)
+
+        symbol_count = self._get_next_int64()
+
+        if symbol_count < 0:
+            raise DeserializationError("Symbol pool can't have negative size")
+
+        self._symbol_pool = [self.unchecked_parse_symbol() for _ in range(symbol_count)]
+
 
 
 
@@ -66,7 +151,11 @@ class BytecodeDeserializer:
         byte_count = self._get_next_int64()
 
         character_bytes = self._get_next_n_bytes(byte_count)
-        characters = bytes(character_bytes).decode("utf-8")
+
+        try:
+            characters = character_bytes.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise DeserializationError("String is not valid UTF-8: {}".format(str(e)))
 
         return self._universe.new_string(characters)
 
@@ -88,12 +177,14 @@ class BytecodeDeserializer:
         # read size (8 bytes)
         byte_count = self._get_next_int64()
 
+        if byte_count < 0:
+            raise DeserializationError("Byte array can't have negative size")
+
         # read values into array
-        new_byte_array = self._universe.new_byte_array(byte_count)
         new_byte_array_content = self._get_next_n_bytes(byte_count)
 
-        for index in range(byte_count):
-            new_byte_array.byte_put_at(index, next(new_byte_array_content))
+        new_byte_array = self._universe.new_byte_array(byte_count)
+        new_byte_array.bytes_put_at(0, new_byte_array_content)
 
         return new_byte_array
 
@@ -121,11 +212,33 @@ class BytecodeDeserializer:
         return self.unchecked_parse_object_array()
 
 
+    def _verify_bytecode(self, bytecode):
+        """
+        Checks that bytecode consists of whole instructions, that all jumps lead inside of it
+        and that it contains no quickened sends - those are created only by interpreter, after send was resolved
+        """
+        if bytecode.get_byte_count() % 2 != 0:
+            raise DeserializationError("Bytecode must consist of 2 byte instructions")
+
+        instruction_count = bytecode.get_byte_count() // 2
+
+        for index in range(instruction_count):
+            opcode = bytecode.byte_get_at(index * 2)
+            parameter = bytecode.byte_get_at(index * 2 + 1)
+
+            if opcode in Opcodes.QUICKENED_SEND_OPCODES:
+                raise DeserializationError("Quickened send at instruction {} can't appear in module".format(index))
+
+            if opcode in JUMP_OPCODES and not (0 <= get_jump_target(index, opcode, parameter) <= instruction_count):
+                raise DeserializationError("Jump at instruction {} leads outside of code".format(index))
+
     def unchecked_parse_code(self):
         stack_usage = self._get_next_int64()
         literals = self.parse_object_array()
         bytecode = self.parse_bytearray()
 
+        self._verify_bytecode(bytecode)
+
         return self._universe.new_code(stack_usage, literals, bytecode)
 
     def parse_code(self):
@@ -136,12 +249,10 @@ class BytecodeDeserializer:
         slot_kind_bytes = self._get_current()
         self._move_by(1)
 
-        slot_kind = SlotKind()
-        if bool(slot_kind_bytes & SlotKindTags.PARAMETER_SLOT_TAG):
-            slot_kind.toggleParent()
-
-        if bool(slot_kind_bytes & SlotKindTags.PARENT_SLOT_TAG):
-            slot_kind.toggleParameter()
+        slot_kind = SlotKind(
+            isParent=slot_kind_bytes & SlotKindTags.PARENT_SLOT_TAG,
+            isParameter=slot_kind_bytes & SlotKindTags.PARAMETER_SLOT_TAG
+        )
 
         slot_name = self.parse_symbol()
         slot_content = self.parse_bytes()
@@ -204,6 +315,8 @@ class BytecodeDeserializer:
                 return self._universe.get_none_object()
             case LiteralTags.VM_SYMBOL:
                 return self.unchecked_parse_symbol()
+            case LiteralTags.VM_SYMBOL_REFERENCE:
+                return self.unchecked_parse_symbol_reference()
             case LiteralTags.VM_STRING:
                 return self.unchecked_parse_string()
             case LiteralTags.VM_SMALL_INTEGER:
@@ -223,11 +336,125 @@ class BytecodeDeserializer:
 
 
 
-def deserialize_module(universe, byte_sequence):
-    this_module_signature = byte_sequence[:3]
-    byte_sequence = byte_sequence[3:]
+    def parse_module_content(self):
+        """
+        Parses everything following module signature - sections introduced by module format tags, then code of module
+
+        :return: code of module
+        """
+        if self._is_finished():
+            raise DeserializationError("Module has no code")
+
+        if self._get_current() == ModuleFormatTags.SYMBOL_POOL:
+            self.parse_symbol_pool()
+
+        return self.parse_code()
+
+
+
+def _make_decompressor(format_tag):
+    if format_tag == ModuleFormatTags.ZLIB_COMPRESSED:
+        return zlib.decompressobj()
+
+    return lzma.LZMADecompressor()
+
+class _DecompressingReader(io.RawIOBase):
+    """
+    Binary stream of bytes decompressed from another stream.
+    Compressed stream is read one chunk at a time, only when bytes decompressed so far were all read.
+    Decompressor produces at most as many bytes as were requested, so highly compressed input can't inflate
+    into huge buffer - input it didn't get to yet is kept and fed to it again.
+    """
+
+    def __init__(self, decompressor, compressed_stream):
+        self._decompressor = decompressor
+        self._compressed_stream = compressed_stream
+
+        # compressed bytes not consumed by zlib decompressor yet (lzma decompressor keeps them by itself)
+        self._compressed_input = b""
+
+        self._pending = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def _needs_input(self):
+        if isinstance(self._decompressor, lzma.LZMADecompressor):
+            return self._decompressor.needs_input
+
+        return len(self._compressed_input) == 0
+
+    def readinto(self, buffer):
+        # zero max_length would mean no limit
+        if len(buffer) == 0:
+            return 0
+
+        while len(self._pending) == 0 and not self._decompressor.eof:
+            if self._needs_input():
+                self._compressed_input = self._compressed_stream.read(COMPRESSED_CHUNK_SIZE)
 
-    if this_module_signature != CORRECT_MODULE_SIGNATURE:
-        raise DeserializationError()
+                if len(self._compressed_input) == 0:
+                    raise DeserializationError("Compressed module is truncated")
 
-    return BytecodeDeserializer(universe, list(byte_sequence)).parse_code()
\ No newline at end of file
+            try:
+                self._pending = memoryview(self._decompressor.decompress(self._compressed_input, len(buffer)))
+            except (zlib.error, lzma.LZMAError) as e:
+                raise DeserializationError("Corrupted compressed module: {}".format(str(e)))
+
+            self._compressed_input = getattr(self._decompressor, "unconsumed_tail", b"")
+
+        count = min(len(buffer), len(self._pending))
+
+        buffer[:count] = self._pending[:count]
+        self._pending = self._pending[count:]
+
+        return count
+
+def compress_module(module_bytes, format_tag=ModuleFormatTags.ZLIB_COMPRESSED):
+    """
+    Converts module into compressed module
+
+    :param module_bytes: content of uncompressed module file, including signature
+    :param format_tag: ModuleFormatTags.ZLIB_COMPRESSED or ModuleFormatTags.LZMA_COMPRESSED
+    :return: content of compressed module file
+    """
+    assert format_tag in (ModuleFormatTags.ZLIB_COMPRESSED, ModuleFormatTags.LZMA_COMPRESSED)
+    assert list(module_bytes[:3]) == CORRECT_MODULE_SIGNATURE
+
+    module_content = bytes(module_bytes[3:])
+    compressed_content = zlib.compress(module_content, 9) if format_tag == ModuleFormatTags.ZLIB_COMPRESSED else lzma.compress(module_content)
+
+    return bytes(CORRECT_MODULE_SIGNATURE) + bytes([format_tag]) + compressed_content
+
+
+def deserialize_module_stream(universe, stream):
+    """
+    Deserializes module from binary stream, like opened module file.
+    Stream is read gradually, so memory used depends on created objects rather than on size of module.
+
+    :param universe: universe in which objects are created
+    :param stream: binary stream positioned at start of module
+    :return: code of module
+    """
+    if list(stream.read(3)) != CORRECT_MODULE_SIGNATURE:
+        raise DeserializationError("Wrong module signature")
+
+    format_tag = stream.read(1)
+
+    if format_tag in (bytes([ModuleFormatTags.ZLIB_COMPRESSED]), bytes([ModuleFormatTags.LZMA_COMPRESSED])):
+        decompressing_stream = _DecompressingReader(_make_decompressor(format_tag[0]), stream)
+
+        return BytecodeDeserializer(universe, stream=decompressing_stream).parse_module_content()
+
+    # tag belongs to content of module
+    return BytecodeDeserializer(universe, format_tag, stream).parse_module_content()
+
+def deserialize_module(universe, byte_sequence):
+    """
+    Deserializes module from its content
+
+    :param universe: universe in which objects are created
+    :param byte_sequence: bytes-like object or list of byte values
+    :return: code of module
+    """
+    return deserialize_module_stream(universe, io.BytesIO(bytes(byte_sequence)))
@@ -0,0 +1,172 @@
+"""
+Serializer of modules - writes code (with all its literals) in format read by bytecode_parsing.
+
+Symbols are written into symbol pool of module, in order of their first occurrence, and referenced by index.
+Serializer handles exactly what deserializer can create - symbols, strings, small integers, byte arrays,
+object arrays, codes, assignments and plain slot objects.
+"""
+
+from source.vm_core.bytecodes import CORRECT_MODULE_SIGNATURE, LiteralTags, ModuleFormatTags, SlotKindTags
+from source.vm_core.object_kinds import VM_Symbol, VM_String, VM_SmallInteger, VM_ByteArray, VM_ObjectArray, VM_Code, VM_Assignment
+from source.vm_core.object_layout import VM_Object
+
+
+class SerializationError(Exception):
+    pass
+
+
+def _int64_bytes(value):
+    return value.to_bytes(8, byteorder="big", signed=True)
+
+
+class ModuleSerializer:
+    def __init__(self, none_object, use_symbol_pool=True, bytecode_transform=None):
+        """
+        :param none_object: none object of universe - it is written as VM_NONE
+        :param use_symbol_pool: False to write symbols in place, in original module format
+        :param bytecode_transform: optional function turning bytes of bytecode into bytes that are written instead
+        """
+        self._none_object = none_object
+        self._use_symbol_pool = use_symbol_pool
+        self._bytecode_transform = bytecode_transform
+
+        # symbol -> its index in pool
+        self._symbol_indices = {}
+
+    def _write_symbol_content(self, output, symbol):
+        text_bytes = symbol.get_text().encode("latin-1")
+
+        output += _int64_bytes(symbol.get_arity())
+        output += _int64_bytes(len(text_bytes))
+        output += text_bytes
+
+    def _write_symbol(self, output, symbol):
+        if not self._use_symbol_pool:
+            output.append(LiteralTags.VM_SYMBOL)
+            self._write_symbol_content(output, symbol)
+            return
+
+        pool_index = self._symbol_indices.get(symbol)
+
+        if pool_index is None:
+            pool_index = len(self._symbol_indices)
+            self._symbol_indices[symbol] = pool_index
+
+        output.append(LiteralTags.VM_SYMBOL_REFERENCE)
+        output += _int64_bytes(pool_index)
+
+    def _write_code_content(self, output, code):
+        bytecode_bytes = code.get_bytecode().bytes_get_at(0, code.get_bytecode().get_byte_count())
+
+        if self._bytecode_transform is not None:
+            bytecode_bytes = self._bytecode_transform(bytecode_bytes)
+
+        output += _int64_bytes(code.get_stack_usage())
+        self._write_object(output, code.get_literals())
+
+        output.append(LiteralTags.VM_BYTE_ARRAY)
+        output += _int64_bytes(len(bytecode_bytes))
+        output += bytecode_bytes
+
+    def _write_slot_object(self, output, slot_object):
+        slots = list(slot_object.select_slots(lambda name, kind, content: True))
+
+        output.append(LiteralTags.VM_OBJECT)
+        output += _int64_bytes(len(slots))
+
+        for slot_name, slot_kind, slot_content in slots:
+            if not isinstance(slot_name, VM_Symbol):
+                raise SerializationError("Slot name must be symbol")
+
+            kind_tag = 0
+            if slot_kind.isParent():
+                kind_tag |= SlotKindTags.PARENT_SLOT_TAG
+            if slot_kind.isParameter():
+                kind_tag |= SlotKindTags.PARAMETER_SLOT_TAG
+
+            output.append(kind_tag)
+            self._write_symbol(output, slot_name)
+            self._write_object(output, slot_content)
+
+        if slot_object.has_code():
+            output.append(LiteralTags.VM_CODE)
+            self._write_code_content(output, slot_object.get_code())
+        else:
+            output.append(LiteralTags.VM_NONE)
+
+    def _write_object(self, output, vm_object):
+        if vm_object is self._none_object:
+            output.append(LiteralTags.VM_NONE)
+
+        elif isinstance(vm_object, VM_Symbol):
+            self._write_symbol(output, vm_object)
+
+        elif isinstance(vm_object, VM_String):
+            character_bytes = vm_object.get_characters().encode("utf-8")
+
+            output.append(LiteralTags.VM_STRING)
+            output += _int64_bytes(len(character_bytes))
+            output += character_bytes
+
+        elif isinstance(vm_object, VM_SmallInteger):
+            output.append(LiteralTags.VM_SMALL_INTEGER)
+            output += _int64_bytes(vm_object.get_value())
+
+        elif isinstance(vm_object, VM_ByteArray):
+            output.append(LiteralTags.VM_BYTE_ARRAY)
+            output += _int64_bytes(vm_object.get_byte_count())
+            output += vm_object.bytes_get_at(0, vm_object.get_byte_count())
+
+        elif isinstance(vm_object, VM_ObjectArray):
+            output.append(LiteralTags.VM_OBJECT_ARRAY)
+            output += _int64_bytes(vm_object.get_item_count())
+
+            for item in vm_object.items_get_at(0, vm_object.get_item_count()):
+                self._write_object(output, item)
+
+        elif isinstance(vm_object, VM_Code):
+            output.append(LiteralTags.VM_CODE)
+            self._write_code_content(output, vm_object)
+
+        elif isinstance(vm_object, VM_Assignment):
+            output.append(LiteralTags.VM_ASSIGNMENT)
+            self._write_symbol(output, vm_object.get_target_name())
+
+        elif type(vm_object) is VM_Object:
+            self._write_slot_object(output, vm_object)
+
+        else:
+            raise SerializationError("Object of kind {} can't be part of module".format(type(vm_object).__name__))
+
+    def serialize_module(self, code):
+        """
+        :param code: code of module
+        :return: content of module file
+        """
+        assert isinstance(code, VM_Code)
+
+        self._symbol_indices = {}
+
+        body = bytearray()
+        self._write_object(body, code)
+
+        output = bytearray(CORRECT_MODULE_SIGNATURE)
+
+        if self._use_symbol_pool:
+            output.append(ModuleFormatTags.SYMBOL_POOL)
+            output += _int64_bytes(len(self._symbol_indices))
+
+            # dict keeps order of insertion, which is order of indices
+            for symbol in self._symbol_indices:
+                self._write_symbol_content(output, symbol)
+
+        output += body
+
+        return bytes(output)
+
+
+def serialize_module(code, none_object, use_symbol_pool=True):
+    """
+    :return: content of module file with specified code
+    """
+    return ModuleSerializer(none_object, use_symbol_pool).serialize_module(code)
@@ -18,9 +18,45 @@ class Opcodes:
     # send message, selector is specified by literal index
     SEND = 0x20
 
+    # quickened forms of SEND - interpreter rewrites SEND into one of these after first execution,
+    # based on what the send resolved to. They are never produced by compiler and never appear in module files
+    SEND_PRIMITIVE = 0x21
+    SEND_ASSIGN = 0x22
+    SEND_DATA = 0x23
+    SEND_METHOD = 0x24
+
+    # opcodes which module files must not contain
+    QUICKENED_SEND_OPCODES = (SEND_PRIMITIVE, SEND_ASSIGN, SEND_DATA, SEND_METHOD)
+
     # returns top of the stack to previous frame
     RETURN_EXPLICIT = 0x30
 
+    # jumps are relative to instruction following the jump, parameter is distance of jump
+    # conditional jumps pull condition from stack - true/false object decides, anything else is error
+    # thus stack depth at each instruction doesn't depend on path taken to it
+    JUMP_FORWARD = 0x40
+    JUMP_BACKWARD = 0x41
+    JUMP_FORWARD_IF_TRUE = 0x42
+    JUMP_FORWARD_IF_FALSE = 0x43
+
+
+JUMP_OPCODES = (Opcodes.JUMP_FORWARD, Opcodes.JUMP_BACKWARD, Opcodes.JUMP_FORWARD_IF_TRUE, Opcodes.JUMP_FORWARD_IF_FALSE)
+
+
+def get_jump_target(instruction_index, opcode, parameter):
+    """
+    Computes index of instruction to which jump leads
+
+    :param instruction_index: index of jump instruction
+    :param opcode: opcode of jump instruction
+    :param parameter: distance of jump
+    :return: index of target instruction (index equal to instruction count means end of code)
+    """
+    if opcode == Opcodes.JUMP_BACKWARD:
+        return instruction_index + 1 - parameter
+
+    return instruction_index + 1 + parameter
+
 
 class LiteralTags:
     """Enumeration of tags that determine interpretation of following bytes"""
@@ -32,12 +68,28 @@ class LiteralTags:
     VM_SYMBOL = 0x12
     VM_STRING = 0x13
 
+    # index into symbol pool of module, only in modules having one
+    VM_SYMBOL_REFERENCE = 0x14
+
     VM_CODE = 0x20
     VM_ASSIGNMENT = 0x21
 
     VM_OBJECT = 0x30
 
 
+class ModuleFormatTags:
+    """
+    Enumeration of tags that may follow module signature, each introducing section of module preceding its code.
+    Original format has code right after signature, so it is recognized by VM_CODE tag of code itself.
+    """
+    # int64 count of symbols followed by symbols without tags - literals then refer to them by VM_SYMBOL_REFERENCE
+    SYMBOL_POOL = 0x01
+
+    # rest of module (possibly starting by other sections) is compressed as zlib or xz stream
+    ZLIB_COMPRESSED = 0x02
+    LZMA_COMPRESSED = 0x03
+
+
 class SlotKindTags:
     PARENT_SLOT_TAG =  0b00000001
 
@@ -0,0 +1,140 @@
+import json
+
+from source.vm_core.heap_statistics import walk_heap
+from source.vm_core.object_kinds import VM_Symbol, VM_String
+from source.vm_core.object_layout import VM_Object
+
+
+# first line of every snapshot file, so analyzer can reject unrelated files early
+SNAPSHOT_FORMAT_NAME = "vm-heap-snapshot"
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class HeapSnapshotError(Exception):
+    pass
+
+
+def get_slot_name_text(slot_name):
+    """
+    :param slot_name: name of slot, usually symbol
+    :return: printable form of slot name
+    """
+    if isinstance(slot_name, VM_Symbol):
+        return slot_name.get_text()
+
+    return str(slot_name)
+
+
+class _SnapshotIdentifiers:
+    """
+    Assigns small sequential ids to VM objects in order in which they are first mentioned
+    """
+
+    def __init__(self):
+        # python id of object -> snapshot id
+        # objects are reachable from roots during whole snapshot, so their python ids are not reused
+        self._identifiers = {}
+
+    def get_identifier(self, vm_object):
+        python_id = id(vm_object)
+
+        identifier = self._identifiers.get(python_id)
+        if identifier is None:
+            identifier = len(self._identifiers)
+            self._identifiers[python_id] = identifier
+
+        return identifier
+
+
+def _make_object_record(vm_object, identifiers):
+    slots = [
+        [get_slot_name_text(slot_name), identifiers.get_identifier(slot_content)]
+        for slot_name, _, slot_content in vm_object.select_slots(lambda *_: True)
+        if isinstance(slot_content, VM_Object)
+    ]
+
+    references = [
+        identifiers.get_identifier(referenced_object)
+        for referenced_object in vm_object.get_referenced_objects()
+        if isinstance(referenced_object, VM_Object)
+    ]
+
+    record = {
+        "id": identifiers.get_identifier(vm_object),
+        "kind": type(vm_object).__name__,
+        "size": vm_object.get_approximate_size(),
+        "slots": slots,
+        "references": references,
+    }
+
+    if isinstance(vm_object, VM_Symbol):
+        record["text"] = vm_object.get_text()
+    elif isinstance(vm_object, VM_String):
+        record["text"] = vm_object.get_characters()
+
+    return record
+
+
+def write_heap_snapshot(file_obj, root_objects):
+    """
+    Streams every object reachable from roots into text file, one JSON record per line.
+    Objects are written as they are visited, so snapshot is never built in memory as whole.
+
+    First line is header with ids of roots, every other line describes one object:
+    its id, kind, approximate size, named slots (slot name and id of slot content) and ids of all referenced objects
+
+    :param file_obj: text file opened for writing
+    :param root_objects: objects from which snapshot starts
+    :return: number of written objects
+    """
+    identifiers = _SnapshotIdentifiers()
+    root_objects = [root for root in root_objects if isinstance(root, VM_Object)]
+
+    header = {
+        "format": SNAPSHOT_FORMAT_NAME,
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "roots": [identifiers.get_identifier(root) for root in root_objects],
+    }
+    file_obj.write(json.dumps(header) + "\n")
+
+    object_count = 0
+    for vm_object in walk_heap(root_objects):
+        file_obj.write(json.dumps(_make_object_record(vm_object, identifiers)) + "\n")
+        object_count += 1
+
+    return object_count
+
+
+def read_heap_snapshot(file_obj):
+    """
+    Reads snapshot written by write_heap_snapshot
+
+    :param file_obj: text file opened for reading
+    :return: (list of root ids, dict of object id -> object record)
+    """
+    header_line = file_obj.readline()
+
+    try:
+        header = json.loads(header_line)
+    except ValueError:
+        raise HeapSnapshotError("Snapshot header is not valid JSON")
+
+    if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT_NAME:
+        raise HeapSnapshotError("File is not heap snapshot")
+
+    if header.get("version") != SNAPSHOT_FORMAT_VERSION:
+        raise HeapSnapshotError("Unsupported heap snapshot version {}".format(header.get("version")))
+
+    records = {}
+    for line_number, line in enumerate(file_obj, start=2):
+        if line.strip() == "":
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise HeapSnapshotError("Line {} of snapshot is not valid JSON".format(line_number))
+
+        records[record["id"]] = record
+
+    return header["roots"], records
@@ -0,0 +1,234 @@
+import argparse
+import sys
+
+from source.vm_core.heap_snapshot import HeapSnapshotError, read_heap_snapshot
+
+
+# number of objects listed in report by default
+DEFAULT_REPORT_SIZE = 20
+
+# artificial node dominating all roots, so heap with several roots has single dominator tree
+VIRTUAL_ROOT = -1
+
+
+class HeapSnapshotAnalysis:
+    """
+    Offline analysis of heap snapshot - dominator tree and retained sizes.
+
+    Object A dominates object B if every path from roots to B goes through A.
+    Retained size of A is size of all objects dominated by A, that is memory freed if A became unreachable.
+    """
+
+    def __init__(self, root_ids, records):
+        self._records = records
+        self._root_ids = [root_id for root_id in root_ids if root_id in records]
+
+        # object id -> id of immediate dominator
+        self._immediate_dominators = {}
+
+        # object id -> retained size in bytes
+        self._retained_sizes = {}
+
+        # object ids ordered so that every object comes after its immediate dominator
+        self._reverse_postorder = []
+
+        self._compute_dominators()
+        self._compute_retained_sizes()
+
+    def _get_successors(self, object_id):
+        if object_id == VIRTUAL_ROOT:
+            return self._root_ids
+
+        return [reference for reference in self._records[object_id]["references"] if reference in self._records]
+
+    def _compute_reverse_postorder(self):
+        postorder = []
+        visited = {VIRTUAL_ROOT}
+        stack = [(VIRTUAL_ROOT, iter(self._get_successors(VIRTUAL_ROOT)))]
+
+        while len(stack) > 0:
+            object_id, successors = stack[-1]
+
+            for successor in successors:
+                if successor not in visited:
+                    visited.add(successor)
+                    stack.append((successor, iter(self._get_successors(successor))))
+                    break
+            else:
+                stack.pop()
+                postorder.append(object_id)
+
+        postorder.reverse()
+        return postorder
+
+    def _compute_dominators(self):
+        """
+        Iterative algorithm by Cooper, Harvey and Kennedy: dominators are refined in reverse postorder until nothing changes
+        """
+        reverse_postorder = self._compute_reverse_postorder()
+        order_numbers = {object_id: number for number, object_id in enumerate(reverse_postorder)}
+
+        predecessors = {object_id: [] for object_id in reverse_postorder}
+        for object_id in reverse_postorder:
+            for successor in set(self._get_successors(object_id)):
+                predecessors[successor].append(object_id)
+
+        dominators = {VIRTUAL_ROOT: VIRTUAL_ROOT}
+
+        def intersect(first_id, second_id):
+            while first_id != second_id:
+                while order_numbers[first_id] > order_numbers[second_id]:
+                    first_id = dominators[first_id]
+                while order_numbers[second_id] > order_numbers[first_id]:
+                    second_id = dominators[second_id]
+            return first_id
+
+        changed = True
+        while changed:
+            changed = False
+
+            for object_id in reverse_postorder[1:]:
+                new_dominator = None
+
+                for predecessor in predecessors[object_id]:
+                    if predecessor not in dominators:
+                        continue
+
+                    new_dominator = predecessor if new_dominator is None else intersect(predecessor, new_dominator)
+
+                if dominators.get(object_id) != new_dominator:
+                    dominators[object_id] = new_dominator
+                    changed = True
+
+        del dominators[VIRTUAL_ROOT]
+
+        self._immediate_dominators = dominators
+        self._reverse_postorder = reverse_postorder[1:]
+
+    def _compute_retained_sizes(self):
+        retained_sizes = {object_id: self._records[object_id]["size"] for object_id in self._reverse_postorder}
+
+        # children come after their dominators, so walking backwards finishes each subtree before its dominator is reached
+        for object_id in reversed(self._reverse_postorder):
+            dominator_id = self._immediate_dominators[object_id]
+            if dominator_id != VIRTUAL_ROOT:
+                retained_sizes[dominator_id] += retained_sizes[object_id]
+
+        self._retained_sizes = retained_sizes
+
+    def get_reachable_object_count(self):
+        return len(self._reverse_postorder)
+
+    def get_total_size(self):
+        return sum(self._records[object_id]["size"] for object_id in self._reverse_postorder)
+
+    def get_immediate_dominator(self, object_id):
+        """
+        :return: id of immediate dominator, or None if object is dominated only by roots as whole
+        """
+        dominator_id = self._immediate_dominators[object_id]
+        return None if dominator_id == VIRTUAL_ROOT else dominator_id
+
+    def get_retained_size(self, object_id):
+        return self._retained_sizes[object_id]
+
+    def get_dominator_path(self, object_id):
+        """
+        :return: list of object ids, from root down through dominators to specified object
+        """
+        path = [object_id]
+
+        while self._immediate_dominators[path[-1]] != VIRTUAL_ROOT:
+            path.append(self._immediate_dominators[path[-1]])
+
+        path.reverse()
+        return path
+
+    def get_largest_retainers(self, count):
+        """
+        :return: list of object ids with biggest retained size, biggest first
+        """
+        return sorted(self._retained_sizes, key=lambda object_id: self._retained_sizes[object_id], reverse=True)[:count]
+
+    def describe_object(self, object_id):
+        record = self._records[object_id]
+
+        if "text" in record:
+            return "{}#{} {!r}".format(record["kind"], object_id, record["text"])
+
+        return "{}#{}".format(record["kind"], object_id)
+
+    def _describe_edge(self, holder_id, held_id):
+        """
+        :return: name of slot through which holder refers held object, or generic description if there is none
+        """
+        holder_record = self._records[holder_id]
+
+        for slot_name, slot_target in holder_record["slots"]:
+            if slot_target == held_id:
+                return slot_name
+
+        if held_id in holder_record["references"]:
+            return "<{}>".format(self._records[held_id]["kind"])
+
+        # dominator doesn't refer object directly
+        return "..."
+
+    def format_dominator_path(self, object_id):
+        path = self.get_dominator_path(object_id)
+
+        parts = [self.describe_object(path[0])]
+        for holder_id, held_id in zip(path, path[1:]):
+            parts.append(self._describe_edge(holder_id, held_id))
+
+        return " -> ".join(parts)
+
+    def format_report(self, count=DEFAULT_REPORT_SIZE):
+        """
+        :return: human-readable multi-line report of biggest retainers
+        """
+        lines = ["=== Heap snapshot analysis ==="]
+        lines.append("reachable objects: {}, total bytes: {}".format(self.get_reachable_object_count(), self.get_total_size()))
+
+        lines.append("")
+        lines.append("{:>12} {:>10}  {}".format("retained", "self", "object"))
+        for object_id in self.get_largest_retainers(count):
+            lines.append("{:>12} {:>10}  {}".format(
+                self._retained_sizes[object_id], self._records[object_id]["size"], self.describe_object(object_id)
+            ))
+            lines.append("{:>24}  path: {}".format("", self.format_dominator_path(object_id)))
+
+        return "\n".join(lines)
+
+
+def analyze_heap_snapshot(file_obj):
+    """
+    :param file_obj: text file containing snapshot written by write_heap_snapshot
+    :return: HeapSnapshotAnalysis
+    """
+    root_ids, records = read_heap_snapshot(file_obj)
+    return HeapSnapshotAnalysis(root_ids, records)
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Reports objects retaining most memory in heap snapshot.")
+    parser.add_argument("snapshot_file", help="name of heap snapshot file")
+    parser.add_argument("--top", type=int, default=DEFAULT_REPORT_SIZE, help="number of reported objects")
+
+    return parser.parse_args(arguments)
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments(sys.argv[1:])
+
+    try:
+        with open(arguments.snapshot_file, "r", encoding="utf-8") as snapshot_file_obj:
+            analysis = analyze_heap_snapshot(snapshot_file_obj)
+    except FileNotFoundError:
+        print("[Heap-Analysis-Fatal] :: snapshot file '{}' doesn't exist".format(arguments.snapshot_file))
+        sys.exit(1)
+    except HeapSnapshotError as e:
+        print("[Heap-Analysis-Fatal] :: {}".format(str(e)))
+        sys.exit(1)
+
+    print(analysis.format_report(arguments.top))
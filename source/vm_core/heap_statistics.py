@@ -0,0 +1,146 @@
+import heapq
+
+from source.vm_core.object_kinds import VM_Symbol
+from source.vm_core.object_layout import VM_Object
+
+
+# number of biggest objects remembered by census
+LARGEST_OBJECT_COUNT = 10
+
+
+def walk_heap(root_objects):
+    """
+    Visits every VM object reachable from root objects, each exactly once
+
+    :param root_objects: objects from which walk starts
+    :return: generator of reachable objects
+    """
+    visited_ids = set()
+    stack = [root for root in root_objects if isinstance(root, VM_Object)]
+
+    while len(stack) > 0:
+        viewed_object = stack.pop()
+
+        if id(viewed_object) in visited_ids:
+            continue
+
+        visited_ids.add(id(viewed_object))
+
+        yield viewed_object
+
+        for referenced_object in viewed_object.get_referenced_objects():
+            if isinstance(referenced_object, VM_Object) and id(referenced_object) not in visited_ids:
+                stack.append(referenced_object)
+
+
+class HeapStatistics:
+    """
+    Summary of objects reachable from roots of universe
+    """
+
+    def __init__(self):
+        # kind name -> number of objects
+        self._object_counts = {}
+
+        # kind name -> approximate number of bytes
+        self._object_bytes = {}
+
+        # slot count -> number of objects with that many slots
+        self._slot_count_histogram = {}
+
+        # list of (approximate size, kind name, slot count) of biggest objects
+        self._largest_objects = []
+
+        self._symbol_count = 0
+        self._distinct_symbols = set()
+
+    def add_object(self, vm_object):
+        kind_name = type(vm_object).__name__
+        object_size = vm_object.get_approximate_size()
+        slot_count = vm_object.get_slot_count()
+
+        self._object_counts[kind_name] = self._object_counts.get(kind_name, 0) + 1
+        self._object_bytes[kind_name] = self._object_bytes.get(kind_name, 0) + object_size
+        self._slot_count_histogram[slot_count] = self._slot_count_histogram.get(slot_count, 0) + 1
+
+        # ids break ties, so objects themselves are never compared
+        largest_entry = (object_size, id(vm_object), kind_name, slot_count)
+        if len(self._largest_objects) < LARGEST_OBJECT_COUNT:
+            heapq.heappush(self._largest_objects, largest_entry)
+        else:
+            heapq.heappushpop(self._largest_objects, largest_entry)
+
+        if isinstance(vm_object, VM_Symbol):
+            self._symbol_count += 1
+            self._distinct_symbols.add(vm_object)
+
+    def get_object_counts(self):
+        return dict(self._object_counts)
+
+    def get_object_bytes(self):
+        return dict(self._object_bytes)
+
+    def get_total_object_count(self):
+        return sum(self._object_counts.values())
+
+    def get_total_bytes(self):
+        return sum(self._object_bytes.values())
+
+    def get_slot_count_histogram(self):
+        return dict(self._slot_count_histogram)
+
+    def get_largest_objects(self):
+        """
+        :return: list of (approximate size, kind name, slot count), biggest first
+        """
+        return [
+            (object_size, kind_name, slot_count)
+            for object_size, _, kind_name, slot_count in sorted(self._largest_objects, reverse=True)
+        ]
+
+    def get_symbol_count(self):
+        return self._symbol_count
+
+    def get_distinct_symbol_count(self):
+        return len(self._distinct_symbols)
+
+    def format_report(self):
+        """
+        :return: human-readable multi-line report
+        """
+        lines = ["=== Heap statistics ==="]
+
+        lines.append("{:<20} {:>10} {:>12}".format("kind", "objects", "bytes"))
+        for kind_name in sorted(self._object_counts, key=lambda name: self._object_bytes[name], reverse=True):
+            lines.append("{:<20} {:>10} {:>12}".format(kind_name, self._object_counts[kind_name], self._object_bytes[kind_name]))
+        lines.append("{:<20} {:>10} {:>12}".format("total", self.get_total_object_count(), self.get_total_bytes()))
+
+        lines.append("")
+        lines.append("symbols: {} objects, {} distinct".format(self.get_symbol_count(), self.get_distinct_symbol_count()))
+
+        lines.append("")
+        lines.append("largest objects:")
+        for object_size, kind_name, slot_count in self.get_largest_objects():
+            lines.append("  {:>10} bytes  {} ({} slots)".format(object_size, kind_name, slot_count))
+
+        lines.append("")
+        lines.append("slot count histogram:")
+        for slot_count in sorted(self._slot_count_histogram):
+            lines.append("  {:>4} slots: {}".format(slot_count, self._slot_count_histogram[slot_count]))
+
+        return "\n".join(lines)
+
+
+def collect_heap_statistics(root_objects):
+    """
+    Takes census of all objects reachable from specified roots
+
+    :param root_objects: objects from which census starts
+    :return: HeapStatistics
+    """
+    statistics = HeapStatistics()
+
+    for vm_object in walk_heap(root_objects):
+        statistics.add_object(vm_object)
+
+    return statistics
@@ -1,5 +1,8 @@
 
+import time
+
 from source.vm_core import bytecodes
+from source.vm_core import jit_compiler
 from source.vm_core.object_kinds import VM_Process, VM_Assignment, VM_PrimitiveMethod, VM_Symbol
 from source.vm_core.object_layout import VM_Object, SlotKind, SlotLookupStatus
 
@@ -23,6 +26,95 @@ OPCODE_MAPPING[bytecodes.Opcodes.PULL] = lambda interpreter, parameter: interpre
 OPCODE_MAPPING[bytecodes.Opcodes.SEND] = lambda interpreter, parameter: interpreter._do_send(parameter)
 OPCODE_MAPPING[bytecodes.Opcodes.RETURN_EXPLICIT] = lambda interpreter, parameter: interpreter._do_return_explicit(parameter)
 
+OPCODE_MAPPING[bytecodes.Opcodes.SEND_PRIMITIVE] = lambda interpreter, parameter: interpreter._do_send_primitive(parameter)
+OPCODE_MAPPING[bytecodes.Opcodes.SEND_ASSIGN] = lambda interpreter, parameter: interpreter._do_send_assign(parameter)
+OPCODE_MAPPING[bytecodes.Opcodes.SEND_DATA] = lambda interpreter, parameter: interpreter._do_send_data(parameter)
+OPCODE_MAPPING[bytecodes.Opcodes.SEND_METHOD] = lambda interpreter, parameter: interpreter._do_send_method(parameter)
+
+OPCODE_MAPPING[bytecodes.Opcodes.JUMP_FORWARD] = lambda interpreter, parameter: interpreter._do_jump_forward(parameter)
+OPCODE_MAPPING[bytecodes.Opcodes.JUMP_BACKWARD] = lambda interpreter, parameter: interpreter._do_jump_backward(parameter)
+OPCODE_MAPPING[bytecodes.Opcodes.JUMP_FORWARD_IF_TRUE] = lambda interpreter, parameter: interpreter._do_jump_forward_if_true(parameter)
+OPCODE_MAPPING[bytecodes.Opcodes.JUMP_FORWARD_IF_FALSE] = lambda interpreter, parameter: interpreter._do_jump_forward_if_false(parameter)
+
+
+def _is_primitive_content(slot_content):
+    return type(slot_content) is VM_PrimitiveMethod
+
+def _is_assignment_content(slot_content):
+    return type(slot_content) is VM_Assignment
+
+def _is_method_content(slot_content):
+    # neither assignments nor primitive methods have code
+    return slot_content.has_code()
+
+# kinds of slot content that are evaluated by something else than pushing them
+_SPECIAL_CONTENT_TYPES = frozenset((VM_PrimitiveMethod, VM_Assignment))
+
+def _is_data_content(slot_content):
+    return type(slot_content) not in _SPECIAL_CONTENT_TYPES and not slot_content.has_code()
+
+def _pick_send_opcode(slot_content):
+    """
+    Picks quickened form of send instruction which is able to evaluate specified slot content
+
+    :param slot_content: content of slot found by send
+    :return: one of the quickened send opcodes
+    """
+    if isinstance(slot_content, VM_Assignment):
+        return bytecodes.Opcodes.SEND_ASSIGN
+
+    if isinstance(slot_content, VM_PrimitiveMethod):
+        return bytecodes.Opcodes.SEND_PRIMITIVE
+
+    if slot_content.has_code():
+        return bytecodes.Opcodes.SEND_METHOD
+
+    return bytecodes.Opcodes.SEND_DATA
+
+
+class ExecutionStatus:
+    Finished = 0
+    BudgetExhausted = 1
+    DeadlineReached = 2
+
+
+# number of instructions executed between checks of instruction budget and deadline
+BUDGET_CHECK_INTERVAL = 1000
+
+
+class Tracer:
+    """
+    Observer of execution, attached to interpreter by Interpreter.set_tracer.
+    All hooks do nothing - subclasses override only those they need.
+    """
+
+    def on_instruction(self, interpreter, frame, opcode, parameter):
+        """Called before instruction is executed"""
+        pass
+
+    def on_send(self, interpreter, selector, receiver, holder):
+        """
+        Called after send found slot - holder is object containing the slot.
+        If send was redirected, selector and holder are those of failure handler, which is what runs instead.
+        """
+        pass
+
+    def on_primitive_call(self, interpreter, primitive, receiver, arguments):
+        """Called right before native function of primitive method runs"""
+        pass
+
+    def on_frame_push(self, interpreter, frame):
+        """Called after frame became active frame of process, on top of previous one"""
+        pass
+
+    def on_frame_pop(self, interpreter, frame):
+        """Called after frame was removed from process (returned, or was replaced by tail send)"""
+        pass
+
+    def on_process_finish(self, interpreter, process):
+        """Called after process got its result (frames left by process error are not popped)"""
+        pass
+
 
 class Interpreter:
     def __init__(self, universe, process):
@@ -31,6 +123,8 @@ class Interpreter:
         self._universe = universe
         self._my_process = process
 
+        self._tracer = None
+
 
     def _get_none_object(self):
         return self._universe.get_none_object()
@@ -42,6 +136,33 @@ class Interpreter:
     def get_universe(self):
         return self._universe
 
+    def get_process(self):
+        return self._my_process
+
+    def get_tracer(self):
+        return self._tracer
+
+    def set_tracer(self, tracer):
+        """
+        Attaches tracer to interpreter, or detaches it if tracer is None.
+
+        Rather than checking for tracer on every instruction, interpreter with tracer uses traced versions of
+        instruction execution and send lookup, installed on this instance only - untraced execution stays untouched.
+        Traced execution doesn't run compiled functions, so tracer sees every instruction.
+
+        :param tracer: Tracer or None
+        :return: None
+        """
+        self._tracer = tracer
+
+        if tracer is None:
+            self.__dict__.pop("execute_instruction", None)
+            self.__dict__.pop("_lookup_send", None)
+            return
+
+        self.execute_instruction = self._execute_instruction_traced
+        self._lookup_send = self._lookup_send_traced
+
     def _handle_process_error(self, symbol_text):
         """
         Handles error that is concerning entire process.
@@ -50,11 +171,16 @@ class Interpreter:
         :param symbol_text: name of error
         :return: None
         """
-        error_symbol = self._universe.new_symbol(symbol_text, 0)
+        error_symbol = self._universe.get_error_symbol(symbol_text)
         error_obj = self._universe.new_error_object(error_symbol)
 
         self._my_process.set_result(error_obj)
 
+    def _note_code_activity(self, code):
+        """Counts activation (or loop iteration) of code and compiles code once it gets hot"""
+        if code.note_invocation() == jit_compiler.HOT_INVOCATION_THRESHOLD:
+            jit_compiler.compile_code(code)
+
     def _do_nothing(self, parameter):
         """Instruction that does nothing"""
         pass
@@ -95,28 +221,30 @@ class Interpreter:
 
         self.get_active_frame().pull_item(self._get_none_object())
 
-    def _do_send(self, parameter):
+    def _lookup_send(self, parameter, memoize_found=False):
         """
-        Takes arguments and receiver from stack, looks up slot and evaluates its content.
+        Takes arguments and receiver from stack and looks up slot of message selector.
+        If lookup fails, send is redirected to 'unknownSelector' / 'ambitiousSelector' handler of receiver.
 
         :param parameter: index of message selector in array of literals
-        :return: None
+        :param memoize_found: if True, successful lookup in parents is cached - used by quickened sends
+        :return: None if process error happened, otherwise tuple (receiver, arguments, slot location, slot content, was redirected)
         """
 
         ok, selector = self.get_active_frame().literal_get_at(parameter)
 
         if not ok:
             self._handle_process_error("literalIndexOutOfBound")
-            return
+            return None
 
         if not isinstance(selector, VM_Symbol):
             self._handle_process_error("notSymbolicSelector")
-            return
+            return None
 
         # check if there is enough stack items to extract receivers and arguments
         if not self.get_active_frame().can_stack_change_by(-(selector.get_arity() + 1)):
             self._handle_process_error("stackUnderflow")
-            return
+            return None
 
         # arguments extraction - parameter list is filled from the end because last parameter is at the top of stack
         arguments = [None] * selector.get_arity()
@@ -128,89 +256,244 @@ class Interpreter:
 
         assert isinstance(receiver, VM_Object)
 
-        lookup_status, lookup_slot_location = receiver.lookup_slot(selector)
+        lookup_status, lookup_slot_location = receiver.lookup_slot(selector, memoize_found)
+
+        # everything went fine
+        if lookup_status == SlotLookupStatus.FoundOne:
+            return (receiver, arguments, lookup_slot_location, lookup_slot_location.get_slot(selector), False)
+
+        fail_selector = self._get_failure_selector(lookup_status)
+
+        # try to get handler - handlers are looked up for every failed send, so their lookup is memoized
+        fail_lookup_status, fail_lookup_slot_location = receiver.lookup_slot(fail_selector, memoize_found=True)
 
-        # handle lookup errors
-        if lookup_status != SlotLookupStatus.FoundOne:
-            # pick correct lookup error
-            fail_selector_name = "unknownSelector" if SlotLookupStatus.FoundNone else "ambitiousSelector"
-            fail_selector = self.get_universe().new_symbol(fail_selector_name, 2)
+        # if receiver doesn't have handler, cause process error
+        if fail_lookup_status != SlotLookupStatus.FoundOne:
+            self._handle_process_error(fail_selector.get_text())
+            return None
+
+        # replace original info with failure info
+        arguments = [
+            selector,
+            self.get_universe().new_object_array_from_list(arguments)
+        ]
+
+        return (receiver, arguments, fail_lookup_slot_location, fail_lookup_slot_location.get_slot(fail_selector), True)
+
+    def _get_failure_selector(self, lookup_status):
+        """
+        :param lookup_status: status of failed lookup
+        :return: selector of handler of lookup failure
+        """
+        if lookup_status == SlotLookupStatus.FoundNone:
+            return self._universe.get_unknown_selector_symbol()
 
-            # try to get handler
-            fail_lookup_status, fail_lookup_slot_location = receiver.lookup_slot(fail_selector)
+        return self._universe.get_ambitious_selector_symbol()
 
-            # if receiver doesn't have handler, cause process error
-            if fail_lookup_status != SlotLookupStatus.FoundOne:
-                self._handle_process_error(fail_selector_name)
-                return
+    def _lookup_send_traced(self, parameter, memoize_found=False):
+        """Send lookup that reports found slots (and primitives about to be called) to tracer"""
+        _, selector = self.get_active_frame().literal_get_at(parameter)
 
-            # replace original info with failure info
-            arguments = [
-                selector,
-                self.get_universe().new_object_array_from_list(arguments)
-            ]
-            selector = fail_selector
-            lookup_slot_location = fail_lookup_slot_location
+        lookup_result = Interpreter._lookup_send(self, parameter, memoize_found)
 
-        slot_content = lookup_slot_location.get_slot(selector)
+        if lookup_result is None:
+            return None
 
-        ## evaluate slot content
-        # evaluate assignment primitive
-        if isinstance(slot_content, VM_Assignment):
+        receiver, arguments, slot_location, slot_content, was_redirected = lookup_result
 
-            ok = lookup_slot_location.set_slot(slot_content.get_target_name(), arguments[0])
+        # handler runs instead of original selector - failed lookups are cached, so repeating one is cheap
+        if was_redirected:
+            lookup_status, _ = receiver.lookup_slot(selector)
+            selector = self._get_failure_selector(lookup_status)
 
-            if not ok:
-                self._handle_process_error("missingAssigneeSlot")
-                return
+        self._tracer.on_send(self, selector, receiver, slot_location)
 
-            # there is no need to check if stack has space - if it had space for send itself, it has space for result
-            self.get_active_frame().push_item(arguments[0])
+        # primitive content is always evaluated right after lookup
+        if type(slot_content) is VM_PrimitiveMethod:
+            self._tracer.on_primitive_call(self, slot_content, receiver, arguments)
 
-        # evaluate primitive method
-        if isinstance(slot_content, VM_PrimitiveMethod):
-            result = slot_content.native_call(self, arguments)
+        return lookup_result
 
-            self.get_active_frame().push_item(result)
+    def _evaluate_assignment(self, receiver, arguments, slot_location, slot_content):
+        """Stores argument into target slot of assignment primitive and pushes it to stack"""
+        ok = slot_location.set_slot(slot_content.get_target_name(), arguments[0])
 
+        if not ok:
+            self._handle_process_error("missingAssigneeSlot")
             return
 
-        # has code? Evaluate method object
-        if slot_content.has_code():
-            method_activation = slot_content.copy()
+        # there is no need to check if stack has space - if it had space for send itself, it has space for result
+        self.get_active_frame().push_item(arguments[0])
+
+    def _evaluate_primitive(self, receiver, arguments, slot_location, slot_content):
+        """Runs native function of primitive method and pushes its result to stack"""
+        result = slot_content.native_call(self, arguments)
+
+        self.get_active_frame().push_item(result)
 
-            parameter_slots = method_activation.select_slots(lambda name, kind, content: kind.isParameter())
+    def _evaluate_method(self, receiver, arguments, slot_location, slot_content):
+        """Creates activation of method object, fills its parameters and pushes new frame for it"""
+        method_activation = slot_content.copy()
 
-            for index in range(len(arguments)):
-                parameter_name, _, _ = next(parameter_slots)
+        # TODO: Handle possible error of parameter param count and slot arity don't match
+        method_activation.bind_parameters(arguments)
 
-                # TODO: Handle possible error of parameter param count and slot arity don't match
-                method_activation.set_slot(parameter_name, arguments[index])
+        # insert scope
+        # TODO: This needs to be more solid
+        method_activation.add_slot(
+            self._universe.new_symbol("me", 0),
+            SlotKind.PARENT,
+            receiver
+        )
 
-            # insert scope
-            # TODO: This needs to be more solid
-            method_activation.add_slot(
-                self._universe.new_symbol("me", 0),
-                SlotKind().toggleParent(),
-                receiver
-            )
+        code = method_activation.get_code()
+        self._note_code_activity(code)
 
-            self._my_process.push_frame(
-                self._universe.new_frame_with_stack_size(
-                    method_activation.get_code().get_stack_usage(),
-                    method_activation
-                )
-            )
+        new_frame = self._universe.new_frame_with_stack_size(
+            code.get_stack_usage(),
+            method_activation
+        )
 
+        # tail send - active frame would only return result of this send, so new frame can take its place
+        if self.get_active_frame().is_returning_next():
+            self._my_process.replace_frame(new_frame, self._get_none_object())
             return
 
-        # evaluate everything else (which means 'push to the stack')
+        self._my_process.push_frame(new_frame)
+
+    def _evaluate_data(self, receiver, arguments, slot_location, slot_content):
+        """Pushes content of ordinary data slot to stack"""
         if self.get_active_frame().is_stack_full():
             self._handle_process_error("stackOverflow")
             return
 
         self.get_active_frame().push_item(slot_content)
 
+    def _evaluate_send_generic(self, frame, receiver, arguments, slot_location, slot_content, was_redirected):
+        """
+        Picks correct evaluation of slot content and executes it.
+        Unless send was redirected to lookup failure handler, instruction that caused it is quickened to specialized form.
+
+        :param frame: frame which executes send instruction
+        :return: None
+        """
+        send_opcode = _pick_send_opcode(slot_content)
+
+        if not was_redirected:
+            frame.rewrite_previous_opcode(send_opcode)
+
+        SEND_EVALUATION_MAPPING[send_opcode](self, receiver, arguments, slot_location, slot_content)
+
+    def _do_send(self, parameter):
+        """
+        Takes arguments and receiver from stack, looks up slot and evaluates its content.
+
+        :param parameter: index of message selector in array of literals
+        :return: None
+        """
+        frame = self.get_active_frame()
+
+        lookup_result = self._lookup_send(parameter)
+
+        if lookup_result is None:
+            return
+
+        self._evaluate_send_generic(frame, *lookup_result)
+
+    def _do_quickened_send(self, parameter, guard, evaluation):
+        """
+        Executes quickened form of send instruction.
+        If guard rejects found slot content (or send was redirected to failure handler), falls back to generic evaluation.
+
+        Send site was already resolved, so its lookup in parents of receiver is memoized - repeated send skips search
+        of parents, and cached result is dropped once any searched object changes its slots or parents.
+
+        :param parameter: index of message selector in array of literals
+        :param guard: predicate that accepts slot content this quickened form can evaluate
+        :param evaluation: evaluation for accepted slot content
+        :return: None
+        """
+        frame = self.get_active_frame()
+
+        lookup_result = self._lookup_send(parameter, True)
+
+        if lookup_result is None:
+            return
+
+        receiver, arguments, slot_location, slot_content, was_redirected = lookup_result
+
+        if was_redirected or not guard(slot_content):
+            self._evaluate_send_generic(frame, *lookup_result)
+            return
+
+        evaluation(self, receiver, arguments, slot_location, slot_content)
+
+    def _do_send_primitive(self, parameter):
+        self._do_quickened_send(parameter, _is_primitive_content, Interpreter._evaluate_primitive)
+
+    def _do_send_assign(self, parameter):
+        self._do_quickened_send(parameter, _is_assignment_content, Interpreter._evaluate_assignment)
+
+    def _do_send_data(self, parameter):
+        self._do_quickened_send(parameter, _is_data_content, Interpreter._evaluate_data)
+
+    def _do_send_method(self, parameter):
+        self._do_quickened_send(parameter, _is_method_content, Interpreter._evaluate_method)
+
+    def _do_jump(self, distance):
+        """Moves instruction index of active frame by specified distance"""
+        if not self.get_active_frame().can_instruction_move_by(distance):
+            self._handle_process_error("jumpOutOfBounds")
+            return
+
+        self.get_active_frame().move_instruction_by(distance)
+
+    def _do_jump_forward(self, parameter):
+        """
+        Unconditionally jumps forward
+
+        :param parameter: distance of jump, counted from next instruction
+        :return: None
+        """
+        self._do_jump(parameter)
+
+    def _do_jump_backward(self, parameter):
+        """
+        Unconditionally jumps backward. Loops are made of backward jumps, so each one counts towards hotness of code
+
+        :param parameter: distance of jump, counted from next instruction
+        :return: None
+        """
+        self._note_code_activity(self.get_active_frame().get_code())
+
+        self._do_jump(-parameter)
+
+    def _do_conditional_jump(self, parameter, jump_condition):
+        """
+        Pulls condition from stack and jumps forward if it is the jump condition object
+
+        :param parameter: distance of jump, counted from next instruction
+        :param jump_condition: either true or false object
+        :return: None
+        """
+        if self.get_active_frame().is_stack_empty():
+            self._handle_process_error("stackUnderflow")
+            return
+
+        condition = self.get_active_frame().pull_item(self._get_none_object())
+
+        if condition is jump_condition:
+            self._do_jump(parameter)
+            return
+
+        if condition is not self._universe.get_true_object() and condition is not self._universe.get_false_object():
+            self._handle_process_error("nonBooleanCondition")
+
+    def _do_jump_forward_if_true(self, parameter):
+        self._do_conditional_jump(parameter, self._universe.get_true_object())
+
+    def _do_jump_forward_if_false(self, parameter):
+        self._do_conditional_jump(parameter, self._universe.get_false_object())
 
     def _do_return_explicit(self, parameter):
         """Passes control and top of the stack from active frame to its predecessor"""
@@ -239,19 +522,32 @@ class Interpreter:
 
 
 
-    def execute_instruction(self):
+    def execute_instruction(self, instruction_limit=jit_compiler.DEFAULT_INSTRUCTION_LIMIT):
         """
-        Takes current instruction from active frame and executes it
-        :return: None
+        Takes current instruction from active frame and executes it.
+        If code of active frame is compiled, compiled function runs first and can execute more instructions.
+
+        :param instruction_limit: number of instructions after which compiled function returns
+        :return: number of executed instructions
         """
         # don't execute instructions of already finished process
         if self._my_process.has_finished(self._universe.get_none_object()):
-            return
+            return 0
 
         # get rid of finished frame
         if self.get_active_frame().has_finished():
             self._do_return_explicit(0)
-            return
+            return 1
+
+        # compiled code runs as far as it can and stops at instruction it leaves to interpreter
+        compiled_function = self.get_active_frame().get_code().get_compiled_function()
+        executed_count = 0
+
+        if compiled_function is not None:
+            executed_count = compiled_function(self, self.get_active_frame(), instruction_limit)
+
+            if executed_count >= instruction_limit or self.get_active_frame().has_finished():
+                return executed_count
 
         # extract instruction (opcode and its parameter)
         opcode, parameter = self.get_active_frame().get_current_instruction()
@@ -262,6 +558,98 @@ class Interpreter:
         # much faster than if-else spam
         OPCODE_MAPPING[opcode](self, parameter)
 
-    def execute_all(self):
-        while not self._my_process.has_finished(self.get_universe().get_none_object()):
-            self.execute_instruction()
\ No newline at end of file
+        return executed_count + 1
+
+    def _execute_instruction_traced(self, instruction_limit=None):
+        """
+        Version of execute_instruction used while tracer is attached.
+        Frame changes are found by comparing active frame before and after instruction.
+        Compiled functions are not used, so exactly one instruction is executed.
+        """
+        if self._my_process.has_finished(self._universe.get_none_object()):
+            return 0
+
+        tracer = self._tracer
+        frame = self.get_active_frame()
+        previous_frame = frame.get_previous_frame()
+
+        if frame.has_finished():
+            self._do_return_explicit(0)
+        else:
+            opcode, parameter = frame.get_current_instruction()
+            tracer.on_instruction(self, frame, opcode, parameter)
+
+            frame.move_instruction_by(1)
+            OPCODE_MAPPING[opcode](self, parameter)
+
+        active_frame = self.get_active_frame()
+
+        if active_frame is previous_frame:
+            # frame returned
+            tracer.on_frame_pop(self, frame)
+        elif active_frame is not frame:
+            # frame was replaced by tail send
+            if active_frame.get_previous_frame() is not frame:
+                tracer.on_frame_pop(self, frame)
+
+            tracer.on_frame_push(self, active_frame)
+
+        if self._my_process.has_finished(self._universe.get_none_object()):
+            tracer.on_process_finish(self, self._my_process)
+
+        return 1
+
+    def execute_all(self, instruction_budget=None, deadline=None):
+        """
+        Executes instructions until process finishes, or until instruction budget or deadline runs out.
+        Stopped process can be resumed by calling this method again.
+
+        Budget and deadline are checked once per BUDGET_CHECK_INTERVAL instructions, so they don't slow down execution.
+        Compiled functions are charged for every instruction they execute and are limited to the rest of the interval,
+        which they can exceed only by instructions of code without backward jump.
+
+        :param instruction_budget: maximal number of instructions to execute, None for no limit
+        :param deadline: value of time.monotonic() after which execution stops, None for no limit
+        :return: ExecutionStatus
+        """
+        none_object = self._universe.get_none_object()
+
+        if instruction_budget is None and deadline is None:
+            while not self._my_process.has_finished(none_object):
+                self.execute_instruction()
+
+            return ExecutionStatus.Finished
+
+        remaining_budget = instruction_budget
+
+        while not self._my_process.has_finished(none_object):
+            if deadline is not None and time.monotonic() >= deadline:
+                return ExecutionStatus.DeadlineReached
+
+            if remaining_budget is None:
+                chunk_size = BUDGET_CHECK_INTERVAL
+            elif remaining_budget <= 0:
+                return ExecutionStatus.BudgetExhausted
+            else:
+                chunk_size = min(remaining_budget, BUDGET_CHECK_INTERVAL)
+
+            executed_count = 0
+
+            while executed_count < chunk_size and not self._my_process.has_finished(none_object):
+                executed_count += self.execute_instruction(chunk_size - executed_count)
+
+            if remaining_budget is not None:
+                remaining_budget -= executed_count
+
+        return ExecutionStatus.Finished
+
+
+"""
+Maps quickened send opcodes to evaluation of slot content they are specialized for
+"""
+SEND_EVALUATION_MAPPING = {
+    bytecodes.Opcodes.SEND_PRIMITIVE: Interpreter._evaluate_primitive,
+    bytecodes.Opcodes.SEND_ASSIGN: Interpreter._evaluate_assignment,
+    bytecodes.Opcodes.SEND_DATA: Interpreter._evaluate_data,
+    bytecodes.Opcodes.SEND_METHOD: Interpreter._evaluate_method,
+}
@@ -0,0 +1,394 @@
+"""
+Tier-2 compiler - turns hot code objects into python functions.
+
+Compiled function is called by interpreter with active frame and runs as many instructions as it can.
+Items of frame stack are held in local variables (s0, s1, ...) and literals are bound as constants.
+Instructions that compiled function doesn't execute by itself (method sends, returns, unverifiable instructions)
+are "exits" - compiled function stores its locals back into the frame, points frame at exit instruction and returns,
+so interpreter can execute it. Execution can enter compiled function again at instruction following an exit.
+Jumps between instructions are compiled into loop dispatching on instruction index of basic blocks.
+Compiled function counts instructions it executes and returns their number. At backward jumps, it checks
+the count against instruction limit given by interpreter and leaves the loop once the limit is reached,
+so interpreter regains control (and can charge its execution budget and check its deadline) even if code loops forever.
+
+Quickened sends are compiled with assumption that they will keep resolving to the same kind of slot content.
+When assumption breaks, compiled function deoptimizes - leaves send to interpreter the same way as exit does.
+Code which deoptimizes too often loses its compiled function for good.
+"""
+
+from source.vm_core.bytecodes import Opcodes, JUMP_OPCODES, get_jump_target
+from source.vm_core.object_kinds import VM_Symbol, VM_PrimitiveMethod, VM_Assignment
+from source.vm_core.object_layout import SlotLookupStatus
+
+
+# number of activations after which code is compiled
+HOT_INVOCATION_THRESHOLD = 100
+
+# number of deoptimizations after which compiled function is thrown away
+DEOPTIMIZATION_LIMIT = 50
+
+# number of executed instructions after which compiled function returns to interpreter, unless it is given lower limit
+DEFAULT_INSTRUCTION_LIMIT = 100000
+
+_INLINE_SEND_OPCODES = (Opcodes.SEND_PRIMITIVE, Opcodes.SEND_ASSIGN, Opcodes.SEND_DATA)
+_ALL_SEND_OPCODES = (Opcodes.SEND,) + _INLINE_SEND_OPCODES + (Opcodes.SEND_METHOD,)
+_INLINE_OPCODES = (Opcodes.NOOP, Opcodes.PUSH_MYSELF, Opcodes.PUSH_LITERAL, Opcodes.PULL) + _INLINE_SEND_OPCODES + JUMP_OPCODES
+
+
+def _deoptimize(interpreter, frame, stack_items, instruction_index):
+    """
+    Leaves compiled function because its assumption didn't hold - interpreter will execute instruction instead
+
+    :param stack_items: local stack of compiled function
+    :param instruction_index: index of instruction whose assumption failed
+    :return: None
+    """
+    frame.set_stack_items(stack_items, interpreter.get_universe().get_none_object())
+    frame.set_instruction_index(instruction_index)
+
+    code = frame.get_code()
+
+    if code.note_deoptimization() >= DEOPTIMIZATION_LIMIT:
+        code.disable_compilation()
+
+
+class _CodeCompiler:
+    def __init__(self, code):
+        self._code = code
+        self._literals = code.get_literals()
+        self._bytecode = code.get_bytecode()
+
+        self._instruction_count = code.get_instruction_count()
+
+        # stack depth before each instruction (and at the end of code), None for instructions outside of compiled region
+        self._depths = [None] * (self._instruction_count + 1)
+
+        # instructions which compiled function leaves to interpreter
+        self._exits = set()
+
+        # instructions at which basic blocks start
+        self._block_starts = {0}
+
+        self._lines = []
+
+    def _get_instruction(self, index):
+        return (
+            self._bytecode.byte_get_at(index * 2),
+            self._bytecode.byte_get_at(index * 2 + 1)
+        )
+
+    def _get_send_arity(self, parameter):
+        """Returns arity of send selector or None if selector is not valid"""
+        if parameter >= self._literals.get_item_count():
+            return None
+
+        selector = self._literals.item_get_at(parameter)
+
+        if not isinstance(selector, VM_Symbol):
+            return None
+
+        return selector.get_arity()
+
+    def _get_stack_effect(self, opcode, parameter, depth):
+        """
+        Computes how instruction changes stack depth
+
+        :return: change of stack depth or None if instruction can't be proven to execute without error
+        """
+        stack_usage = self._code.get_stack_usage()
+
+        if opcode == Opcodes.NOOP:
+            return 0
+
+        if opcode == Opcodes.PUSH_MYSELF:
+            return 1 if depth < stack_usage else None
+
+        if opcode == Opcodes.PUSH_LITERAL:
+            if parameter >= self._literals.get_item_count():
+                return None
+
+            return 1 if depth < stack_usage else None
+
+        if opcode == Opcodes.PULL:
+            return -1 if depth > 0 else None
+
+        if opcode in _ALL_SEND_OPCODES:
+            arity = self._get_send_arity(parameter)
+
+            if arity is None or depth < arity + 1:
+                return None
+
+            # receiver and arguments are replaced by result
+            return -arity
+
+        if opcode == Opcodes.JUMP_FORWARD or opcode == Opcodes.JUMP_BACKWARD:
+            return 0
+
+        if opcode == Opcodes.JUMP_FORWARD_IF_TRUE or opcode == Opcodes.JUMP_FORWARD_IF_FALSE:
+            return -1 if depth > 0 else None
+
+        return None
+
+    def _analyze(self):
+        """
+        Computes stack depth of each instruction reachable from start of code, finds exits and basic blocks
+
+        :return: False if stack depth of some instruction depends on path taken to it, True otherwise
+        """
+        worklist = [(0, 0)]
+
+        while len(worklist) > 0:
+            index, depth = worklist.pop()
+
+            if self._depths[index] is not None:
+                if self._depths[index] != depth:
+                    return False
+                continue
+
+            self._depths[index] = depth
+
+            # end of code
+            if index == self._instruction_count:
+                continue
+
+            opcode, parameter = self._get_instruction(index)
+            stack_effect = self._get_stack_effect(opcode, parameter, depth)
+
+            if opcode in JUMP_OPCODES and stack_effect is not None:
+                target = get_jump_target(index, opcode, parameter)
+
+                # invalid jump is left to interpreter to report
+                if not (0 <= target <= self._instruction_count):
+                    stack_effect = None
+
+            # instructions that could fail or that end the frame are exits with no successors
+            if stack_effect is None or opcode == Opcodes.RETURN_EXPLICIT:
+                self._exits.add(index)
+                continue
+
+            if opcode in JUMP_OPCODES:
+                self._block_starts.add(target)
+                worklist.append((target, depth + stack_effect))
+
+                if opcode != Opcodes.JUMP_FORWARD and opcode != Opcodes.JUMP_BACKWARD:
+                    worklist.append((index + 1, depth + stack_effect))
+
+                continue
+
+            # execution re-enters compiled function after exit
+            if opcode not in _INLINE_OPCODES:
+                self._exits.add(index)
+                self._block_starts.add(index + 1)
+
+            worklist.append((index + 1, depth + stack_effect))
+
+        return True
+
+    def _get_entries(self):
+        """Returns indices of instructions at which execution can enter compiled function"""
+        return sorted(
+            index for index in self._block_starts if index < self._instruction_count and self._depths[index] is not None
+        )
+
+    def _emit(self, indentation, line):
+        self._lines.append("    " * indentation + line)
+
+    @staticmethod
+    def _stack_list(depth):
+        return "[" + ", ".join("s{}".format(index) for index in range(depth)) + "]"
+
+    @staticmethod
+    def _executed_count(block_count):
+        """
+        :param block_count: number of instructions executed in current basic block
+        :return: expression of number of all instructions executed by compiled function
+        """
+        return "executed + {}".format(block_count) if block_count > 0 else "executed"
+
+    def _emit_exit(self, indentation, index, depth, block_count):
+        self._emit(indentation, "frame.set_stack_items({}, none_object)".format(self._stack_list(depth)))
+        self._emit(indentation, "frame.set_instruction_index({})".format(index))
+        self._emit(indentation, "return {}".format(self._executed_count(block_count)))
+
+    def _emit_deoptimization(self, indentation, index, depth, block_count):
+        self._emit(indentation, "deoptimize(interpreter, frame, {}, {})".format(self._stack_list(depth), index))
+        self._emit(indentation, "return {}".format(self._executed_count(block_count)))
+
+    def _emit_send(self, indentation, index, opcode, parameter, depth, block_count):
+        arity = self._get_send_arity(parameter)
+        receiver = "s{}".format(depth - arity - 1)
+        arguments = ["s{}".format(position) for position in range(depth - arity, depth)]
+        selector = "literal_{}".format(parameter)
+
+        self._emit(indentation, "status, holder = {}.lookup_slot({})".format(receiver, selector))
+        self._emit(indentation, "if status != FOUND_ONE:")
+        self._emit_deoptimization(indentation + 1, index, depth, block_count)
+        self._emit(indentation, "content = holder.get_slot({})".format(selector))
+
+        if opcode == Opcodes.SEND_PRIMITIVE:
+            self._emit(indentation, "if type(content) is not VM_PrimitiveMethod:")
+            self._emit_deoptimization(indentation + 1, index, depth, block_count)
+            self._emit(indentation, "{} = content.native_call(interpreter, [{}])".format(receiver, ", ".join(arguments)))
+
+        elif opcode == Opcodes.SEND_ASSIGN:
+            self._emit(indentation, "if type(content) is not VM_Assignment or not holder.set_slot(content.get_target_name(), {}):".format(arguments[0]))
+            self._emit_deoptimization(indentation + 1, index, depth, block_count)
+            self._emit(indentation, "{} = {}".format(receiver, arguments[0]))
+
+        else:
+            self._emit(indentation, "if content.has_code() or type(content) is VM_PrimitiveMethod or type(content) is VM_Assignment:")
+            self._emit_deoptimization(indentation + 1, index, depth, block_count)
+            self._emit(indentation, "{} = content".format(receiver))
+
+    def _emit_goto(self, indentation, target, depth, block_count, is_backward=False):
+        """Emits transfer of control to basic block starting at target"""
+        if target == self._instruction_count:
+            # end of code - frame has finished
+            self._emit_exit(indentation, target, depth, block_count)
+            return
+
+        self._emit(indentation, "executed += {}".format(block_count))
+
+        if is_backward:
+            self._emit(indentation, "if executed >= instruction_limit:")
+            self._emit_exit(indentation + 1, target, depth, 0)
+
+        self._emit(indentation, "pc = {}".format(target))
+        self._emit(indentation, "continue")
+
+    def _emit_jump(self, indentation, index, opcode, parameter, depth, block_count):
+        target = get_jump_target(index, opcode, parameter)
+        is_backward = target <= index
+
+        # jump itself counts as executed once control is transferred
+        if opcode == Opcodes.JUMP_FORWARD or opcode == Opcodes.JUMP_BACKWARD:
+            self._emit_goto(indentation, target, depth, block_count + 1, is_backward)
+            return
+
+        condition = "s{}".format(depth - 1)
+        jump_object, other_object = ("true_object", "false_object") if opcode == Opcodes.JUMP_FORWARD_IF_TRUE else ("false_object", "true_object")
+
+        self._emit(indentation, "if {} is {}:".format(condition, jump_object))
+        self._emit_goto(indentation + 1, target, depth - 1, block_count + 1, is_backward)
+        self._emit(indentation, "if {} is not {}:".format(condition, other_object))
+        self._emit_deoptimization(indentation + 1, index, depth, block_count)
+
+    def _emit_instruction(self, indentation, index, block_count):
+        opcode, parameter = self._get_instruction(index)
+        depth = self._depths[index]
+
+        if opcode == Opcodes.NOOP:
+            self._emit(indentation, "pass")
+
+        elif opcode == Opcodes.PUSH_MYSELF:
+            self._emit(indentation, "s{} = frame.get_method_activation()".format(depth))
+
+        elif opcode == Opcodes.PUSH_LITERAL:
+            self._emit(indentation, "s{} = literal_{}.copy()".format(depth, parameter))
+
+        elif opcode == Opcodes.PULL:
+            pass
+
+        elif opcode in JUMP_OPCODES:
+            self._emit_jump(indentation, index, opcode, parameter, depth, block_count)
+
+        else:
+            self._emit_send(indentation, index, opcode, parameter, depth, block_count)
+
+    def _emit_block(self, start):
+        """Emits instructions of basic block - from its start up to exit, unconditional jump or start of another block"""
+        self._emit(2, "if pc == {}:".format(start))
+
+        index = start
+        while True:
+            if index == self._instruction_count or (index != start and index in self._block_starts):
+                self._emit_goto(3, index, self._depths[index], index - start)
+                return
+
+            if index in self._exits:
+                self._emit_exit(3, index, self._depths[index], index - start)
+                return
+
+            self._emit(3, "# instruction {}".format(index))
+            self._emit_instruction(3, index, index - start)
+
+            opcode, _ = self._get_instruction(index)
+            if opcode == Opcodes.JUMP_FORWARD or opcode == Opcodes.JUMP_BACKWARD:
+                return
+
+            index += 1
+
+    def compile(self):
+        """
+        Generates source of compiled function and turns it into python function
+
+        :return: compiled function accepting interpreter, frame and optional instruction limit and returning
+                 number of instructions it executed, None if code can't be compiled
+        """
+        if not self._analyze():
+            return None
+
+        entries = self._get_entries()
+
+        self._emit(0, "def compiled_code(interpreter, frame, instruction_limit=DEFAULT_INSTRUCTION_LIMIT):")
+        self._emit(1, "pc = frame.get_instruction_index()")
+        self._emit(1, "depth = frame.get_stack_depth()")
+        self._emit(1, "none_object = interpreter.get_universe().get_none_object()")
+        self._emit(1, "true_object = interpreter.get_universe().get_true_object()")
+        self._emit(1, "false_object = interpreter.get_universe().get_false_object()")
+        self._emit(1, "executed = 0")
+
+        # compiled function relies on having whole stack of code available
+        self._emit(1, "if not frame.can_stack_change_by(STACK_USAGE - depth):")
+        self._emit(2, "return 0")
+
+        # load stack into locals
+        for entry in entries:
+            self._emit(1, "{} pc == {} and depth == {}:".format("if" if entry == 0 else "elif", entry, self._depths[entry]))
+            if self._depths[entry] > 0:
+                self._emit(2, "{}, = frame.get_stack_items()".format(", ".join("s{}".format(index) for index in range(self._depths[entry]))))
+            else:
+                self._emit(2, "pass")
+        self._emit(1, "else:")
+        self._emit(2, "return 0")
+
+        self._emit(1, "while True:")
+        for start in entries:
+            self._emit_block(start)
+        self._emit(2, "return executed")
+
+        namespace = {
+            "STACK_USAGE": self._code.get_stack_usage(),
+            "DEFAULT_INSTRUCTION_LIMIT": DEFAULT_INSTRUCTION_LIMIT,
+            "FOUND_ONE": SlotLookupStatus.FoundOne,
+            "VM_PrimitiveMethod": VM_PrimitiveMethod,
+            "VM_Assignment": VM_Assignment,
+            "deoptimize": _deoptimize,
+        }
+
+        for index in range(self._literals.get_item_count()):
+            namespace["literal_{}".format(index)] = self._literals.item_get_at(index)
+
+        source = "\n".join(self._lines)
+        exec(compile(source, "<compiled VM_Code>", "exec"), namespace)
+
+        return namespace["compiled_code"]
+
+
+def compile_code(code):
+    """
+    Compiles code object and attaches compiled function to it
+
+    :param code: VM_Code to be compiled
+    :return: None
+    """
+    if code.is_compilation_disabled() or code.get_instruction_count() == 0:
+        return
+
+    compiled_function = _CodeCompiler(code).compile()
+
+    if compiled_function is None:
+        code.disable_compilation()
+        return
+
+    code.set_compiled_function(compiled_function)
@@ -1,19 +1,25 @@
+import argparse
 import sys
-from source.vm_core.bytecode_parsing import DeserializationError, BytecodeDeserializer, deserialize_module
+from source.vm_core.bytecode_parsing import DeserializationError, BytecodeDeserializer, deserialize_module_stream
 from source.vm_core.interpreter import Interpreter
+from source.vm_core.method_profiler import MethodProfiler
 from source.vm_core.object_layout import VM_Object, SlotKind
+from source.vm_core.sampling_profiler import SamplingProfiler
 from source.vm_core.universe import Universe
 
 BOOTLOADER_MODULE_NAME = "bootloader"
 
 
-def make_module_process(universe, module_bytes):
-    # deserialize module bytecode
-    try:
-        module_code_object = deserialize_module(universe, list(module_bytes))
-    except DeserializationError as e:
-        print("[VM-Fatal]: Deserialization error: {}".format(str(e)))
-        sys.exit(1)
+def load_module_process(universe, module_file_obj):
+    """
+    Deserializes module and creates process that will run it
+
+    :param universe: universe in which module will run
+    :param module_file_obj: binary file (or other binary stream) with module
+    :return: VM_Process
+    :raises DeserializationError: if module is malformed
+    """
+    module_code_object = deserialize_module_stream(universe, module_file_obj)
 
     ## CONSTRUCT MODULE
     module_method_object = VM_Object()
@@ -21,7 +27,7 @@ def make_module_process(universe, module_bytes):
     module_method_object.set_code(module_code_object)
     module_method_object.add_slot(
         universe.new_symbol("me", 0),
-        SlotKind().toggleParent(),
+        SlotKind.PARENT,
         universe.get_lobby_object()
     )
 
@@ -31,30 +37,84 @@ def make_module_process(universe, module_bytes):
     return module_process
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("[VM-Fatal] :: Pass exactly 1 argument - name of bytecode file.")
+def make_module_process(universe, module_file_obj):
+    # deserialize module bytecode
+    try:
+        return load_module_process(universe, module_file_obj)
+    except DeserializationError as e:
+        print("[VM-Fatal]: Deserialization error: {}".format(str(e)))
         sys.exit(1)
 
+
+def bootstrap_universe(bootloader_module_name=BOOTLOADER_MODULE_NAME):
+    """
+    Creates clean universe and runs bootloader module in it, if bootloader exists
+
+    :param bootloader_module_name: name of bootloader file
+    :return: Universe
+    """
     universe = Universe()
     universe.init_clean_universe()
 
     try:
-        with open(BOOTLOADER_MODULE_NAME, "rb") as bootloader_file_obj:
-            module_bytes = bootloader_file_obj.read()
-            bootstrap_process = make_module_process(universe, module_bytes)
+        with open(bootloader_module_name, "rb") as bootloader_file_obj:
+            bootstrap_process = make_module_process(universe, bootloader_file_obj)
             Interpreter(universe, bootstrap_process).execute_all()
     except FileNotFoundError:
         # bootloader doesn't exist, but that is not really a problem - bootloader just set up stdlib, it is not mandatory
         pass
 
+    return universe
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Runs bytecode module (after running bootloader module, if present).")
+    parser.add_argument("module_file", help="name of bytecode file")
+    parser.add_argument("--heap-stats", action="store_true", help="print heap statistics to stderr at exit")
+    parser.add_argument("--heap-snapshot", metavar="SNAPSHOT_FILE", help="write heap snapshot into file at exit")
+
+    # only one profiler can observe module process
+    profile_group = parser.add_mutually_exclusive_group()
+    profile_group.add_argument("--method-profile", metavar="STATS_FILE", help="profile every method of module process and write pstats file")
+    profile_group.add_argument("--sample-profile", metavar="FOLDED_FILE", help="sample stacks of module process and write them in folded format")
+
+    return parser.parse_args(arguments)
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments(sys.argv[1:])
+
+    universe = bootstrap_universe()
 
     try:
-        with open(sys.argv[1], "rb") as bootloader_file_obj:
-            module_bytes = bootloader_file_obj.read()
-            target_process = make_module_process(universe, module_bytes)
-            Interpreter(universe, target_process).execute_all()
+        with open(arguments.module_file, "rb") as bootloader_file_obj:
+            target_process = make_module_process(universe, bootloader_file_obj)
+            target_interpreter = Interpreter(universe, target_process)
+
+            if arguments.method_profile is not None:
+                method_profiler = MethodProfiler()
+                method_profiler.attach(target_interpreter)
+                target_interpreter.execute_all()
+                method_profiler.detach()
+
+                method_profiler.dump_stats(arguments.method_profile)
+                print(method_profiler.format_table(), file=sys.stderr)
+            elif arguments.sample_profile is None:
+                target_interpreter.execute_all()
+            else:
+                with SamplingProfiler(target_interpreter) as profiler:
+                    target_interpreter.execute_all()
+
+                with open(arguments.sample_profile, "w", encoding="utf-8") as folded_file_obj:
+                    profiler.write_folded_stacks(folded_file_obj)
     except FileNotFoundError:
         # this one missing is actually a problem
-        print("[VM-Fatal] :: code file '{}' doesn't exist".format(sys.argv[1]))
+        print("[VM-Fatal] :: code file '{}' doesn't exist".format(arguments.module_file))
         sys.exit(1)
+
+    if arguments.heap_stats:
+        print(universe.get_heap_statistics(extra_roots=[target_process]).format_report(), file=sys.stderr)
+
+    if arguments.heap_snapshot is not None:
+        with open(arguments.heap_snapshot, "w", encoding="utf-8") as snapshot_file_obj:
+            universe.write_heap_snapshot(snapshot_file_obj, extra_roots=[target_process])
@@ -0,0 +1,247 @@
+"""
+Deterministic method profiler - measures every method activation, driven by frame push/pop hooks of tracer.
+
+Methods are identified by their code and selector through which they were reached - send redirected to failure handler
+reaches handler through its selector ("unknownSelector" or "ambitiousSelector"), not through the original one.
+For each method, profiler counts calls and objects allocated by universe (plus literal copies) while method's frame was active,
+and measures exclusive time (spent in method's own frame) and inclusive time (including callees).
+Recursive activations add to inclusive time only once, the same way python profilers do.
+
+Statistics can be written in format of python's profile module, so they can be inspected by pstats and related tools.
+"""
+
+import marshal
+import time
+
+from source.vm_core.bytecodes import Opcodes
+from source.vm_core.interpreter import Tracer
+from source.vm_core.object_kinds import VM_Symbol, VM_PrimitiveMethod
+
+
+# label of frames that were active when profiler was attached - their selector is unknown
+ROOT_METHOD_NAME = "<module>"
+
+# kinds of literals that are not copied when pushed
+_SHARED_LITERAL_KINDS = (VM_Symbol, VM_PrimitiveMethod)
+
+
+class _Activation:
+    __slots__ = ("frame", "method_key", "start_time", "callee_time", "is_outermost")
+
+    def __init__(self, frame, method_key, start_time, is_outermost):
+        self.frame = frame
+        self.method_key = method_key
+        self.start_time = start_time
+        self.callee_time = 0.0
+        self.is_outermost = is_outermost
+
+
+class MethodStatistics:
+    __slots__ = ("call_count", "outermost_call_count", "exclusive_time", "inclusive_time", "allocation_count", "callers")
+
+    def __init__(self):
+        self.call_count = 0
+
+        # calls that weren't recursive
+        self.outermost_call_count = 0
+
+        self.exclusive_time = 0.0
+        self.inclusive_time = 0.0
+        self.allocation_count = 0
+
+        # caller method key -> [call count, outermost call count, exclusive time, inclusive time]
+        self.callers = {}
+
+
+class MethodProfiler(Tracer):
+    def __init__(self):
+        self._interpreter = None
+
+        # (code, selector name) -> MethodStatistics
+        self._statistics = {}
+
+        # code -> small number, identifies code in reports
+        self._code_numbers = {}
+
+        # activations of frames, innermost last
+        self._activations = []
+
+        # method key -> number of its activations in self._activations
+        self._active_counts = {}
+
+        # selector of last send, method frame pushed after it was reached through it
+        self._last_selector = None
+
+    def _get_method_key(self, frame, selector_name):
+        code = frame.get_code()
+
+        if code not in self._code_numbers:
+            self._code_numbers[code] = len(self._code_numbers)
+
+        return (code, selector_name)
+
+    def _get_statistics(self, method_key):
+        statistics = self._statistics.get(method_key)
+
+        if statistics is None:
+            statistics = MethodStatistics()
+            self._statistics[method_key] = statistics
+
+        return statistics
+
+    def _enter(self, frame, selector_name):
+        method_key = self._get_method_key(frame, selector_name)
+        active_count = self._active_counts.get(method_key, 0)
+
+        self._active_counts[method_key] = active_count + 1
+        self._activations.append(_Activation(frame, method_key, time.perf_counter(), active_count == 0))
+
+    def _leave(self):
+        activation = self._activations.pop()
+        elapsed_time = time.perf_counter() - activation.start_time
+        exclusive_time = elapsed_time - activation.callee_time
+        inclusive_time = elapsed_time if activation.is_outermost else 0.0
+
+        self._active_counts[activation.method_key] -= 1
+
+        statistics = self._get_statistics(activation.method_key)
+        statistics.call_count += 1
+        statistics.outermost_call_count += activation.is_outermost
+        statistics.exclusive_time += exclusive_time
+        statistics.inclusive_time += inclusive_time
+
+        if len(self._activations) > 0:
+            caller = self._activations[-1]
+            caller.callee_time += elapsed_time
+
+            caller_entry = statistics.callers.setdefault(caller.method_key, [0, 0, 0.0, 0.0])
+            caller_entry[0] += 1
+            caller_entry[1] += activation.is_outermost
+            caller_entry[2] += exclusive_time
+            caller_entry[3] += inclusive_time
+
+    def _note_allocation(self, new_object):
+        if len(self._activations) > 0:
+            self._get_statistics(self._activations[-1].method_key).allocation_count += 1
+
+    def attach(self, interpreter):
+        """Starts profiling of interpreter - active frame of its process is profiled as root method"""
+        self._interpreter = interpreter
+
+        interpreter.set_tracer(self)
+        interpreter.get_universe().set_allocation_observer(self._note_allocation)
+
+        active_frame = interpreter.get_process().peek_frame()
+        if active_frame is not interpreter.get_universe().get_none_object():
+            self._enter(active_frame, ROOT_METHOD_NAME)
+
+    def detach(self):
+        """Stops profiling - frames still active are measured up to this moment"""
+        while len(self._activations) > 0:
+            self._leave()
+
+        self._interpreter.set_tracer(None)
+        self._interpreter.get_universe().set_allocation_observer(None)
+        self._interpreter = None
+
+    def on_instruction(self, interpreter, frame, opcode, parameter):
+        if opcode != Opcodes.PUSH_LITERAL:
+            return
+
+        ok, literal = frame.literal_get_at(parameter)
+        if ok and not isinstance(literal, _SHARED_LITERAL_KINDS):
+            self._note_allocation(literal)
+
+    def on_send(self, interpreter, selector, receiver, holder):
+        self._last_selector = selector
+
+    def on_frame_push(self, interpreter, frame):
+        selector_name = self._last_selector.get_text() if isinstance(self._last_selector, VM_Symbol) else "<unknown>"
+
+        # activation is copy of method made by sender, together with frame itself
+        self._note_allocation(frame.get_method_activation())
+        self._enter(frame, selector_name)
+
+    def on_frame_pop(self, interpreter, frame):
+        # frames that were below active frame when profiler was attached are not measured
+        if len(self._activations) == 0:
+            return
+
+        if self._activations[-1].frame is not frame and all(activation.frame is not frame for activation in self._activations):
+            return
+
+        while self._activations[-1].frame is not frame:
+            self._leave()
+
+        self._leave()
+
+    def on_process_finish(self, interpreter, process):
+        # process error leaves frames in process, but none of them will ever run again
+        while len(self._activations) > 0:
+            self._leave()
+
+    def _get_function_label(self, method_key):
+        """
+        :return: (file name, line number, function name) identifying method in python profile format
+        """
+        code, selector_name = method_key
+        return ("<vm code>", self._code_numbers[code], selector_name)
+
+    def get_statistics(self):
+        """
+        :return: dict of ((code, selector name) -> MethodStatistics)
+        """
+        return dict(self._statistics)
+
+    def format_table(self, sort_key="inclusive", limit=None):
+        """
+        :param sort_key: "inclusive", "exclusive", "calls" or "allocations"
+        :param limit: maximal number of listed methods, None for all
+        :return: human-readable table of methods, biggest first
+        """
+        sort_functions = {
+            "inclusive": lambda statistics: statistics.inclusive_time,
+            "exclusive": lambda statistics: statistics.exclusive_time,
+            "calls": lambda statistics: statistics.call_count,
+            "allocations": lambda statistics: statistics.allocation_count,
+        }
+
+        method_keys = sorted(self._statistics, key=lambda method_key: sort_functions[sort_key](self._statistics[method_key]), reverse=True)
+        if limit is not None:
+            method_keys = method_keys[:limit]
+
+        lines = ["{:>10} {:>12} {:>12} {:>12}  {}".format("calls", "exclusive", "inclusive", "allocations", "method")]
+
+        for method_key in method_keys:
+            statistics = self._statistics[method_key]
+            _, code_number, selector_name = self._get_function_label(method_key)
+
+            lines.append("{:>10} {:>12.6f} {:>12.6f} {:>12}  {} (code #{})".format(
+                statistics.call_count, statistics.exclusive_time, statistics.inclusive_time,
+                statistics.allocation_count, selector_name, code_number
+            ))
+
+        return "\n".join(lines)
+
+    def get_pstats_dict(self):
+        """
+        :return: statistics in format used by python's profile module - {function: (cc, nc, tt, ct, callers)}
+        """
+        return {
+            self._get_function_label(method_key): (
+                statistics.outermost_call_count,
+                statistics.call_count,
+                statistics.exclusive_time,
+                statistics.inclusive_time,
+                {
+                    self._get_function_label(caller_key): tuple(caller_entry)
+                    for caller_key, caller_entry in statistics.callers.items()
+                }
+            )
+            for method_key, statistics in self._statistics.items()
+        }
+
+    def dump_stats(self, file_name):
+        """Writes statistics into file readable by pstats.Stats"""
+        with open(file_name, "wb") as stats_file_obj:
+            marshal.dump(self.get_pstats_dict(), stats_file_obj)
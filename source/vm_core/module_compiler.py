@@ -0,0 +1,194 @@
+"""
+Ahead-of-time module compiler - turns module files into optimized modules, so that work is done once per build
+instead of once per process.
+
+Each module is deserialized (which validates its structure and jump targets), its bytecode is optimized
+and it is written back with symbol pool, optionally compressed. Written module is deserialized again before
+it is reported as compiled, so broken output is never left behind unnoticed.
+Modules are compiled in parallel, each in its own worker process.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+
+from source.vm_core.bytecode_parsing import DeserializationError, deserialize_module, deserialize_module_stream, compress_module
+from source.vm_core.bytecode_serialization import ModuleSerializer, SerializationError
+from source.vm_core.bytecodes import Opcodes, ModuleFormatTags, JUMP_OPCODES, get_jump_target
+from source.vm_core.universe import Universe
+
+
+DEFAULT_OUTPUT_SUFFIX = ".aot"
+
+COMPRESSION_TAGS = {
+    "none": None,
+    "zlib": ModuleFormatTags.ZLIB_COMPRESSED,
+    "lzma": ModuleFormatTags.LZMA_COMPRESSED,
+}
+
+
+def _is_removable(opcode, parameter):
+    """Instructions without any effect - NOOP and unconditional forward jump to the next instruction"""
+    return opcode == Opcodes.NOOP or (opcode == Opcodes.JUMP_FORWARD and parameter == 0)
+
+def optimize_bytecode(bytecode_bytes):
+    """
+    Removes instructions without effect and adjusts jumps over them.
+    Jump leading to removed instruction leads to first instruction kept after it instead, which is where execution
+    would continue anyway. Jumps only get shorter, so their distances still fit into parameter.
+
+    :param bytecode_bytes: bytes of bytecode
+    :return: bytes of optimized bytecode
+    """
+    instructions = [(bytecode_bytes[index], bytecode_bytes[index + 1]) for index in range(0, len(bytecode_bytes), 2)]
+
+    # index of each instruction (and of end of code) after removal
+    new_indices = []
+    kept_count = 0
+
+    for opcode, parameter in instructions:
+        new_indices.append(kept_count)
+
+        if not _is_removable(opcode, parameter):
+            kept_count += 1
+
+    new_indices.append(kept_count)
+
+    optimized_bytes = bytearray()
+
+    for index, (opcode, parameter) in enumerate(instructions):
+        if _is_removable(opcode, parameter):
+            continue
+
+        if opcode in JUMP_OPCODES:
+            new_target = new_indices[get_jump_target(index, opcode, parameter)]
+            new_next_index = new_indices[index] + 1
+
+            parameter = new_next_index - new_target if opcode == Opcodes.JUMP_BACKWARD else new_target - new_next_index
+
+        optimized_bytes += bytes((opcode, parameter))
+
+    return bytes(optimized_bytes)
+
+
+def compile_module(module_file_obj, compression_tag=None):
+    """
+    :param module_file_obj: binary file with module
+    :param compression_tag: ModuleFormatTags.ZLIB_COMPRESSED or ModuleFormatTags.LZMA_COMPRESSED, None for no compression
+    :return: (content of compiled module, number of removed instructions)
+    :raises DeserializationError: if module is malformed
+    """
+    universe = Universe()
+    universe.init_clean_universe()
+
+    module_code = deserialize_module_stream(universe, module_file_obj)
+
+    removed_counts = []
+
+    def transform_bytecode(bytecode_bytes):
+        optimized_bytes = optimize_bytecode(bytecode_bytes)
+        removed_counts.append((len(bytecode_bytes) - len(optimized_bytes)) // 2)
+
+        return optimized_bytes
+
+    compiled_bytes = ModuleSerializer(universe.get_none_object(), bytecode_transform=transform_bytecode).serialize_module(module_code)
+
+    if compression_tag is not None:
+        compiled_bytes = compress_module(compiled_bytes, compression_tag)
+
+    # verify that compiled module loads
+    deserialize_module(universe, compiled_bytes)
+
+    return compiled_bytes, sum(removed_counts)
+
+def _make_failure_report(module_path, error):
+    return {"module": module_path, "status": "failed", "message": "Unexpected error: {}: {}".format(type(error).__name__, str(error))}
+
+def compile_module_file(module_path, output_path, compression_tag=None):
+    """
+    Compiles module file into output file. Errors are reported, not raised, so one bad module doesn't stop others.
+    That includes unexpected errors (like MemoryError), which are reported with their type.
+
+    :return: report as JSON-compatible dict
+    """
+    try:
+        with open(module_path, "rb") as module_file_obj:
+            compiled_bytes, removed_count = compile_module(module_file_obj, compression_tag)
+
+        with open(output_path, "wb") as output_file_obj:
+            output_file_obj.write(compiled_bytes)
+    except OSError as e:
+        return {"module": module_path, "status": "failed", "message": "Can't access file: {}".format(str(e))}
+    except (DeserializationError, SerializationError) as e:
+        return {"module": module_path, "status": "failed", "message": "Invalid module: {}".format(str(e))}
+    except Exception as e:
+        return _make_failure_report(module_path, e)
+
+    return {
+        "module": module_path,
+        "status": "compiled",
+        "output": output_path,
+        "originalSize": os.path.getsize(module_path),
+        "compiledSize": len(compiled_bytes),
+        "removedInstructions": removed_count,
+    }
+
+
+def get_output_path(module_path, output_directory=None, suffix=DEFAULT_OUTPUT_SUFFIX):
+    if output_directory is None:
+        output_directory = os.path.dirname(module_path)
+
+    return os.path.join(output_directory, os.path.basename(module_path) + suffix)
+
+def compile_module_files(module_paths, output_directory=None, suffix=DEFAULT_OUTPUT_SUFFIX, compression_tag=None, worker_count=None):
+    """
+    Compiles modules in parallel
+
+    :param worker_count: number of worker processes, None for number of cores. With 1, modules are compiled in this process
+    :return: generator of reports in order of completion - module whose worker died is reported as failed
+    """
+    jobs = [(module_path, get_output_path(module_path, output_directory, suffix), compression_tag) for module_path in module_paths]
+
+    if worker_count == 1:
+        for job in jobs:
+            yield compile_module_file(*job)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=worker_count) as executor:
+        # future -> path of its module
+        futures = {executor.submit(compile_module_file, *job): job[0] for job in jobs}
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                report = future.result()
+            except Exception as e:
+                report = _make_failure_report(futures[future], e)
+
+            yield report
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Compiles bytecode modules into optimized, fast-loading modules.")
+    parser.add_argument("module_files", nargs="+", help="names of bytecode files")
+    parser.add_argument("--output-dir", default=None, help="directory of compiled modules (default: next to original modules)")
+    parser.add_argument("--suffix", default=DEFAULT_OUTPUT_SUFFIX, help="suffix appended to names of compiled modules")
+    parser.add_argument("--compress", choices=sorted(COMPRESSION_TAGS), default="none", help="compression of compiled modules")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+
+    return parser.parse_args(arguments)
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments(sys.argv[1:])
+
+    has_failed = False
+
+    for report in compile_module_files(
+        arguments.module_files, arguments.output_dir, arguments.suffix, COMPRESSION_TAGS[arguments.compress], arguments.workers
+    ):
+        print(json.dumps(report))
+        has_failed = has_failed or report["status"] != "compiled"
+
+    sys.exit(1 if has_failed else 0)
@@ -1,9 +1,14 @@
+import sys
+from array import array
+
+from source.vm_core.bytecodes import Opcodes
 from source.vm_core.object_layout import VM_Object
 
 class VM_Symbol(VM_Object):
     """
     Represents immutable name of slots and message selectors
     """
+    __slots__ = ("_text", "_arity")
 
     def __init__(self, text, arity):
         super().__init__()
@@ -20,6 +25,9 @@ class VM_Symbol(VM_Object):
 
         return self
 
+    def get_text(self):
+        return self._text
+
     def get_arity(self):
         return self._arity
 
@@ -40,6 +48,8 @@ class VM_SmallInteger(VM_Object):
     """
     Represents signed integer
     """
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         super().__init__()
 
@@ -60,13 +70,15 @@ class VM_ByteArray(VM_Object):
     """
     Represents sequence of bytes
     """
+    __slots__ = ("_bytes",)
+
     def __init__(self, item_count):
         super().__init__()
 
-        self._bytes = [0] * item_count
+        self._bytes = bytearray(item_count)
 
     def copy(self):
-        copy_object = VM_ByteArray(self.get_byte_count())
+        copy_object = VM_ByteArray(0)
 
         copy_object._bytes = self._bytes.copy()
         self._copy_slots_into(copy_object)
@@ -82,18 +94,59 @@ class VM_ByteArray(VM_Object):
     def get_byte_count(self):
         return len(self._bytes)
 
+    def bytes_get_at(self, start_index, count):
+        """
+        :return: immutable copy of bytes in specified range
+        """
+        return bytes(self._bytes[start_index:start_index + count])
+
+    def bytes_put_at(self, start_index, new_bytes):
+        """
+        Overwrites range starting at specified index with new bytes. Range must fit into array
+
+        :param start_index: index of first overwritten byte
+        :param new_bytes: bytes-like object
+        :return: None
+        """
+        assert 0 <= start_index and start_index + len(new_bytes) <= len(self._bytes)
+
+        self._bytes[start_index:start_index + len(new_bytes)] = new_bytes
+
+    def bytes_fill(self, start_index, count, byte):
+        """Overwrites range of bytes by single byte value"""
+        self._bytes[start_index:start_index + count] = bytes((byte,)) * count
+
+    def byte_find(self, byte, start_index):
+        """
+        :return: index of first occurrence of byte at or after start index, -1 if there is none
+        """
+        return self._bytes.find(byte, start_index)
+
+    def get_approximate_size(self):
+        return super().get_approximate_size() + sys.getsizeof(self._bytes)
+
+    def bytes_compare(self, other_byte_array):
+        """
+        Compares bytes lexicographically
+
+        :return: -1 if self is lesser, 0 if equal, 1 if greater than other byte array
+        """
+        return (self._bytes > other_byte_array._bytes) - (self._bytes < other_byte_array._bytes)
+
 
 class VM_ObjectArray(VM_Object):
     """
     Represents sequence of objects
     """
+    __slots__ = ("_items",)
+
     def __init__(self, item_count, none_object):
         super().__init__()
 
         self._items = [none_object] * item_count
 
     def copy(self):
-        copy_object = VM_ObjectArray(self.get_item_count())
+        copy_object = VM_ObjectArray(0, None)
 
         copy_object._items = self._items.copy()
         self._copy_slots_into(copy_object)
@@ -109,11 +162,120 @@ class VM_ObjectArray(VM_Object):
     def get_item_count(self):
         return len(self._items)
 
+    def items_get_at(self, start_index, count):
+        """
+        :return: list of items in specified range
+        """
+        return self._items[start_index:start_index + count]
+
+    def items_put_at(self, start_index, new_items):
+        """
+        Overwrites range starting at specified index with new items. Range must fit into array
+
+        :param start_index: index of first overwritten item
+        :param new_items: list of items
+        :return: None
+        """
+        assert 0 <= start_index and start_index + len(new_items) <= len(self._items)
+
+        self._items[start_index:start_index + len(new_items)] = new_items
+
+    def items_fill(self, start_index, count, item):
+        """Overwrites range of items by single item"""
+        self._items[start_index:start_index + count] = [item] * count
+
+    def item_find(self, item, start_index):
+        """
+        Searches for item by identity
+
+        :return: index of first occurrence of item at or after start index, -1 if there is none
+        """
+        # list.index compares by equality (identity is checked first), only symbols have their own equality
+        while True:
+            try:
+                index = self._items.index(item, start_index)
+            except ValueError:
+                return -1
+
+            if self._items[index] is item:
+                return index
+
+            start_index = index + 1
+
+    def items_reverse(self):
+        self._items.reverse()
+
+    def get_referenced_objects(self):
+        return super().get_referenced_objects() + self._items
+
+    def get_approximate_size(self):
+        return super().get_approximate_size() + sys.getsizeof(self._items)
+
+
+class VM_IntegerVector(VM_Object):
+    """
+    Represents sequence of signed 64-bit integers stored unboxed, in single contiguous buffer
+    """
+    __slots__ = ("_items",)
+
+    # typecode of array holding items
+    ITEM_TYPECODE = "q"
+
+    def __init__(self, item_count):
+        super().__init__()
+
+        self._items = array(VM_IntegerVector.ITEM_TYPECODE, bytes(item_count * 8))
+
+    def copy(self):
+        copy_object = VM_IntegerVector(0)
+
+        copy_object._items = array(VM_IntegerVector.ITEM_TYPECODE, self._items)
+        self._copy_slots_into(copy_object)
+
+        return copy_object
+
+    def item_get_at(self, index):
+        return self._items[index]
+
+    def item_put_at(self, index, value):
+        self._items[index] = value
+
+    def get_item_count(self):
+        return len(self._items)
+
+    def get_items(self):
+        """
+        :return: array of items itself - not a copy, so it must not be modified by caller
+        """
+        return self._items
+
+    def set_items(self, new_items):
+        """
+        Replaces all items of vector
+
+        :param new_items: array of typecode ITEM_TYPECODE, vector takes ownership of it
+        :return: None
+        """
+        assert isinstance(new_items, array) and new_items.typecode == VM_IntegerVector.ITEM_TYPECODE
+
+        self._items = new_items
+
+    def items_get_at(self, start_index, count):
+        """
+        :return: array with copy of items in specified range
+        """
+        return self._items[start_index:start_index + count]
+
+    def get_approximate_size(self):
+        return super().get_approximate_size() + sys.getsizeof(self._items)
+
 
 class VM_String(VM_Object):
     """
     Represents UTF-8 string
     """
+    __slots__ = ("_characters",)
+
     def __init__(self, characters):
         assert isinstance(characters, str)
 
@@ -140,11 +302,57 @@ class VM_String(VM_Object):
     def get_characters(self):
         return self._characters
 
+    def get_approximate_size(self):
+        return super().get_approximate_size() + sys.getsizeof(self._characters)
+
+
+class VM_StringBuilder(VM_Object):
+    """
+    Represents mutable string under construction. Appending is amortized constant time
+    """
+    __slots__ = ("_fragments", "_character_count")
+
+    def __init__(self):
+        super().__init__()
+
+        self._fragments = []
+        self._character_count = 0
+
+    def copy(self):
+        copy_object = VM_StringBuilder()
+
+        copy_object._fragments = self._fragments.copy()
+        copy_object._character_count = self._character_count
+        self._copy_slots_into(copy_object)
+
+        return copy_object
+
+    def append(self, characters):
+        assert isinstance(characters, str)
+
+        self._fragments.append(characters)
+        self._character_count += len(characters)
+
+    def get_character_count(self):
+        return self._character_count
+
+    def get_characters(self):
+        # fragments are joined only once, following calls reuse result
+        if len(self._fragments) > 1:
+            self._fragments = ["".join(self._fragments)]
+
+        return self._fragments[0] if len(self._fragments) > 0 else ""
+
+    def get_approximate_size(self):
+        return super().get_approximate_size() + sys.getsizeof(self._fragments) + sum(sys.getsizeof(fragment) for fragment in self._fragments)
+
 
 class VM_Assignment(VM_Object):
     """
     Represents assignment primitive
     """
+    __slots__ = ("_target_slot_name",)
+
     def __init__(self, target_slot_name):
         super().__init__()
 
@@ -163,7 +371,12 @@ class VM_Assignment(VM_Object):
     def get_target_name(self):
         return self._target_slot_name
 
+    def get_referenced_objects(self):
+        return super().get_referenced_objects() + [self._target_slot_name]
+
 class VM_Mirror(VM_Object):
+    __slots__ = ("_reflectee",)
+
     def __init__(self, reflectee):
         assert isinstance(reflectee, VM_Object)
 
@@ -181,12 +394,17 @@ class VM_Mirror(VM_Object):
     def get_reflectee(self):
         return self._reflectee
 
+    def get_referenced_objects(self):
+        return super().get_referenced_objects() + [self._reflectee]
+
 
 
 class VM_PrimitiveMethod(VM_Object):
     """
     Represents object which runs native code when evaluated
     """
+    __slots__ = ("_parameter_count", "_native_function")
+
     def __init__(self, parameter_count, native_function):
         assert parameter_count >= 0
         assert callable(native_function)
@@ -214,6 +432,10 @@ class VM_Code(VM_Object):
     """
     Represents executable sequence of bytecode and list of literals referenced by it
     """
+    __slots__ = (
+        "_stack_usage", "_literals", "_bytecode",
+        "_invocation_count", "_deoptimization_count", "_compiled_function", "_is_compilation_disabled"
+    )
 
     def __init__(self, stack_usage, literals, bytecode):
         assert isinstance(literals, VM_ObjectArray)
@@ -228,6 +450,12 @@ class VM_Code(VM_Object):
         self._literals = literals
         self._bytecode = bytecode
 
+        # runtime information used by tier-2 compiler
+        self._invocation_count = 0
+        self._deoptimization_count = 0
+        self._compiled_function = None
+        self._is_compilation_disabled = False
+
     def copy(self):
         copy_object = VM_Code(
             self._stack_usage,
@@ -251,11 +479,47 @@ class VM_Code(VM_Object):
     def get_instruction_count(self):
         return self._bytecode.get_byte_count() // 2
 
+    def get_referenced_objects(self):
+        return super().get_referenced_objects() + [self._literals, self._bytecode]
+
+    def note_invocation(self):
+        """
+        Counts new activation of this code
+
+        :return: number of activations so far
+        """
+        self._invocation_count += 1
+        return self._invocation_count
+
+    def note_deoptimization(self):
+        """
+        Counts exit from compiled function caused by broken assumption
+
+        :return: number of deoptimizations so far
+        """
+        self._deoptimization_count += 1
+        return self._deoptimization_count
+
+    def get_compiled_function(self):
+        return self._compiled_function
+
+    def set_compiled_function(self, compiled_function):
+        self._compiled_function = compiled_function
+
+    def is_compilation_disabled(self):
+        return self._is_compilation_disabled
+
+    def disable_compilation(self):
+        """Throws away compiled function and prevents code from being compiled again"""
+        self._compiled_function = None
+        self._is_compilation_disabled = True
+
 
 class VM_Frame(VM_Object):
     """
     Represents runtime context of executed method (local values, selected instruction)
     """
+    __slots__ = ("_previous_frame", "_local_stack", "_local_stack_index", "_method_activation", "_instruction_index")
 
     def __init__(self, none_object, stack, method_activation):
         super().__init__()
@@ -325,6 +589,31 @@ class VM_Frame(VM_Object):
     def is_stack_empty(self):
         return self._local_stack_index <= 0
 
+    def get_stack_depth(self):
+        return self._local_stack_index
+
+    def get_stack_items(self):
+        """
+        :return: list of items in stack, from bottom to top
+        """
+        return [self._local_stack.item_get_at(index) for index in range(self._local_stack_index)]
+
+    def set_stack_items(self, items, none_object):
+        """
+        Replaces content of stack with specified items
+
+        :param items: list of new stack items, from bottom to top
+        :param none_object: object which fills now unused stack positions
+        :return: None
+        """
+        for index in range(len(items)):
+            self._local_stack.item_put_at(index, items[index])
+
+        for index in range(len(items), self._local_stack_index):
+            self._local_stack.item_put_at(index, none_object)
+
+        self._local_stack_index = len(items)
+
 
     def get_current_instruction(self):
         bytecode_index = self._instruction_index * 2
@@ -338,12 +627,56 @@ class VM_Frame(VM_Object):
     def move_instruction_by(self, distance):
         self._instruction_index += distance
 
+    def get_instruction_index(self):
+        return self._instruction_index
+
+    def can_instruction_move_by(self, distance):
+        """
+        Checks if moving instruction index by said distance still produces valid position.
+        Position right after last instruction is valid - it means frame has finished.
+
+        :param distance: number of instructions from current index
+        :return: True if resulting instruction index would be valid, False otherwise
+        """
+        new_index = self._instruction_index + distance
+
+        return 0 <= new_index <= self.get_instruction_count()
+
+    def set_instruction_index(self, new_index):
+        self._instruction_index = new_index
+
+    def rewrite_previous_opcode(self, new_opcode):
+        """
+        Replaces opcode of instruction right before current one (that is instruction being executed).
+        Used by interpreter to quicken instructions in place.
+
+        :param new_opcode: opcode which will replace original one
+        :return: None
+        """
+        bytecode_index = (self._instruction_index - 1) * 2
+
+        self.get_code().get_bytecode().byte_put_at(bytecode_index, new_opcode)
+
     def get_instruction_count(self):
         return self._method_activation.get_code().get_instruction_count()
 
     def has_finished(self):
         return self._instruction_index >= self.get_instruction_count()
 
+    def is_returning_next(self):
+        """
+        Checks if frame returns right after currently executed instruction,
+        either by explicit return or by running out of instructions
+
+        :return: True if current instruction is the last one this frame executes
+        """
+        if self.has_finished():
+            return True
+
+        opcode, _ = self.get_current_instruction()
+
+        return opcode == Opcodes.RETURN_EXPLICIT
+
 
     def get_previous_frame(self):
         return self._previous_frame
@@ -352,6 +685,9 @@ class VM_Frame(VM_Object):
         self._previous_frame = new_previous_frame
 
 
+    def get_referenced_objects(self):
+        return super().get_referenced_objects() + [self._previous_frame, self._local_stack, self._method_activation]
+
     def literal_get_at(self, index):
         if index >= self.get_code().get_literals().get_item_count():
             return (False, None)
@@ -360,6 +696,8 @@ class VM_Frame(VM_Object):
 
 
 class VM_Process(VM_Object):
+    __slots__ = ("_active_frame", "_error_handler", "_result")
+
     def __init__(self, none_object, root_frame):
         super().__init__()
 
@@ -394,6 +732,19 @@ class VM_Process(VM_Object):
 
         return old_active_frame
 
+    def replace_frame(self, new_frame, none_object):
+        """
+        Replaces active frame by new frame, which then returns directly to predecessor of replaced frame
+
+        :param new_frame: frame that will become active
+        :param none_object: none object of universe
+        :return: replaced frame
+        """
+        old_active_frame = self.pull_frame(none_object)
+        self.push_frame(new_frame)
+
+        return old_active_frame
+
     def peek_frame(self):
         return self._active_frame
 
@@ -408,6 +759,9 @@ class VM_Process(VM_Object):
         """Process is finished if either result is not none_object or there are no frames"""
         return self.get_result() != none_object or self.peek_frame() == none_object
 
+    def get_referenced_objects(self):
+        return super().get_referenced_objects() + [self._active_frame, self._error_handler, self._result]
+
     def get_error_handler(self):
         return self._error_handler
 
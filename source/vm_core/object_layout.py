@@ -1,20 +1,39 @@
+import sys
+from collections import deque
+
+
 
 
 class SlotKind:
     """
-    Represents possible combinations of slot kinds
+    Represents possible combinations of slot kinds.
+    There are only four such combinations, so each one has single immutable instance shared by all slots.
+    Toggling returns another shared instance instead of changing this one
     """
-    def __init__(self):
-        self._isParent = False
-        self._isParameter = False
+    __slots__ = ("_isParent", "_isParameter")
+
+    _shared_kinds = {}
+
+    def __new__(cls, isParent=False, isParameter=False):
+        key = (bool(isParent), bool(isParameter))
+
+        if key not in cls._shared_kinds:
+            new_kind = super().__new__(cls)
+            object.__setattr__(new_kind, "_isParent", key[0])
+            object.__setattr__(new_kind, "_isParameter", key[1])
+
+            cls._shared_kinds[key] = new_kind
+
+        return cls._shared_kinds[key]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SlotKind is immutable")
 
     def toggleParent(self):
-        self._isParent = not self._isParent
-        return self
+        return SlotKind(not self._isParent, self._isParameter)
 
     def toggleParameter(self):
-        self._isParameter = not self._isParameter
-        return self
+        return SlotKind(self._isParent, not self._isParameter)
 
     def isParent(self):
         return self._isParent
@@ -23,15 +42,54 @@ class SlotKind:
         return self._isParameter
 
 
+SlotKind.NORMAL = SlotKind(False, False)
+SlotKind.PARENT = SlotKind(True, False)
+SlotKind.PARAMETER = SlotKind(False, True)
+SlotKind.PARENT_PARAMETER = SlotKind(True, True)
+
+# kinds are shared, so checking for parent slot is just identity check
+PARENT_SLOT_KINDS = (SlotKind.PARENT, SlotKind.PARENT_PARAMETER)
+PARAMETER_SLOT_KINDS = (SlotKind.PARAMETER, SlotKind.PARENT_PARAMETER)
+
+
 class SlotLookupStatus:
-    FoundNone = 0,
-    FoundOne = 1,
+    FoundNone = 0
+    FoundOne = 1
     FoundMany = 2
 
 
+# Results of lookups in parents: (slot name, ids of parent objects) -> (status, holder, parent objects).
+# Result of lookup depends only on slot names and parent slots of searched objects,
+# so cached result is valid until any searched object gets slot added or removed, or its parent slot reassigned.
+# Entries keep parent objects alive, so their ids (and ids of their ancestors) can't be reused while cached.
+_cached_lookups = {}
+
+# ids of all objects searched by cached lookups
+_cached_lookup_dependencies = set()
+
+# cache is dropped as whole when it grows over this limit
+CACHED_LOOKUP_LIMIT = 4096
+
+
+def invalidate_cached_lookups():
+    _cached_lookups.clear()
+    _cached_lookup_dependencies.clear()
+
+
 class VM_Object:
+    # subclasses declare their own __slots__ too, so no VM object carries python __dict__
+    __slots__ = ("_slots", "_parent_slot_names", "_parameter_slot_names", "_code")
+
     def __init__(self):
         self._slots = {}
+
+        # names of parent slots, kept aside so lookup doesn't have to scan all slots
+        # tuple is never mutated, so copies of object can share it
+        self._parent_slot_names = ()
+
+        # names of parameter slots in order of their creation, which is order of arguments - shared by copies too
+        self._parameter_slot_names = ()
+
         self._code = None
 
     def copy(self):
@@ -54,7 +112,10 @@ class VM_Object:
         :return: None
         """
 
+        # slot lists are shared with copy - set_slot replaces list instead of changing it, so they are never mutated
         copy_object._slots = self._slots.copy()
+        copy_object._parent_slot_names = self._parent_slot_names
+        copy_object._parameter_slot_names = self._parameter_slot_names
 
     def get_parameter_count(self):
         """
@@ -64,9 +125,22 @@ class VM_Object:
         if not self.has_code():
             return 0
 
-        return len(
-            self.select_slots(lambda slot_name, slot_kind, slot_content: slot_kind.isParameter())
-        )
+        return len(self._parameter_slot_names)
+
+    def bind_parameters(self, arguments):
+        """
+        Stores arguments into parameter slots, first argument into first created parameter slot and so on
+
+        :param arguments: list of arguments, extra arguments (over number of parameters) are ignored
+        :return: None
+        """
+        slots = self._slots
+
+        for slot_name, argument in zip(self._parameter_slot_names, arguments):
+            slots[slot_name] = [slots[slot_name][0], argument]
+
+        if len(self._parent_slot_names) > 0:
+            self._note_layout_change()
 
     def get_slot(self, slot_name):
         """
@@ -90,10 +164,16 @@ class VM_Object:
         :return: True if slot exists, False if otherwise
         """
 
-        if slot_name not in self._slots:
+        slot = self._slots.get(slot_name)
+
+        if slot is None:
             return False
 
-        self._slots[slot_name][1] = new_value
+        self._slots[slot_name] = [slot[0], new_value]
+
+        if slot_name in self._parent_slot_names:
+            self._note_layout_change()
+
         return True
 
 
@@ -111,6 +191,14 @@ class VM_Object:
             return False
 
         self._slots[slot_name] = [slot_kind, slot_value]
+
+        if slot_kind in PARENT_SLOT_KINDS:
+            self._parent_slot_names += (slot_name,)
+
+        if slot_kind in PARAMETER_SLOT_KINDS:
+            self._parameter_slot_names += (slot_name,)
+
+        self._note_layout_change()
         return True
 
     def del_slot(self, slot_name):
@@ -125,8 +213,21 @@ class VM_Object:
             return False
 
         del self._slots[slot_name]
+
+        if slot_name in self._parent_slot_names:
+            self._parent_slot_names = tuple(name for name in self._parent_slot_names if name != slot_name)
+
+        if slot_name in self._parameter_slot_names:
+            self._parameter_slot_names = tuple(name for name in self._parameter_slot_names if name != slot_name)
+
+        self._note_layout_change()
         return True
 
+    def _note_layout_change(self):
+        """Drops cached lookups if they could be affected by change of slots of this object"""
+        if id(self) in _cached_lookup_dependencies:
+            invalidate_cached_lookups()
+
     def select_slot_values(self, predicate):
         """
         Returns slot values that fit passed predicate
@@ -148,11 +249,13 @@ class VM_Object:
             (slot_name, slot_kind, slot_content) for slot_name, (slot_kind, slot_content) in self._slots.items() if predicate(slot_name, slot_kind, slot_content)
         )
 
-    def lookup_slot(self, slot_name):
+    def lookup_slot(self, slot_name, memoize_found=False):
         """
-        Searches for slot in object. If not found, continues search in parent slots
+        Searches for slot in object. If not found, continues search in parent slots.
+        Failed searches in parents are cached, successful ones only if requested.
 
         :param slot_name: name of slot we want
+        :param memoize_found: if True, successful search in parents is cached too (used for handlers of failed sends, which are looked up repeatedly)
         :return: (SlotLookupStatus: status of lookup, Object: object containing slot or None)
         """
 
@@ -160,51 +263,88 @@ class VM_Object:
         if slot_name in self._slots:
             return (SlotLookupStatus.FoundOne, self)
 
-        visited = {self}
-        queue = []
+        # objects without parents (most of activations of non-method objects) don't need cache
+        if len(self._parent_slot_names) == 0:
+            return (SlotLookupStatus.FoundNone, None)
 
-        def parent_predicate(slot_value):
-            return slot_value[0].isParent() and slot_value[1] not in visited
+        if len(_cached_lookups) > 0 or memoize_found:
+            cache_key, _ = self._get_lookup_cache_key(slot_name)
 
-        # take all unvisited parent objects, mark them as visited and add them to search queue
-        for slot in self.select_slot_values(parent_predicate):
-            if slot[0].isParent() and slot[1] not in visited:
-                visited.add(slot[1])
-                queue.append(slot[1])
+            cached_lookup = _cached_lookups.get(cache_key)
+            if cached_lookup is not None:
+                return (cached_lookup[0], cached_lookup[1])
 
+        # objects are tracked by identity - some kinds (symbols) define equality by content
+        visited_ids = {id(self)}
+        queue = deque((self,))
 
-        slot_was_found = False
         slot_was_found_in = None
 
-        # loop while there are parents to look at
+        # loop while there are objects to look at - receiver first, then its parents
         while len(queue) > 0:
-
-            # get object and mark it as viewed
-            viewed_object = queue.pop(0)
+            viewed_object = queue.popleft()
+            viewed_slots = viewed_object._slots
 
             # is slot in currently viewed object
-            if slot_name in viewed_object._slots:
-                # if slot was already found, return FoundSeveral
-                if slot_was_found:
-                    return (SlotLookupStatus.FoundMany, None)
+            if slot_name in viewed_slots:
+                # if slot was already found, return FoundMany
+                if slot_was_found_in is not None:
+                    lookup_result = (SlotLookupStatus.FoundMany, None)
+                    break
 
                 # mark the object and skip - we don't search parents of object that has slot we want
-                slot_was_found = True
                 slot_was_found_in = viewed_object
                 continue
 
             # in case slot is not in this object
             # take all unvisited parent objects, mark them as visited and add them to search queue
-            for slot in viewed_object.select_slot_values(parent_predicate):
-                visited.add(slot[1])
-                queue.append(slot[1])
+            for parent_slot_name in viewed_object._parent_slot_names:
+                parent_object = viewed_slots[parent_slot_name][1]
+
+                if id(parent_object) not in visited_ids:
+                    visited_ids.add(id(parent_object))
+                    queue.append(parent_object)
 
-        # if we found slot, return object in which it was
-        if slot_was_found:
-            return (SlotLookupStatus.FoundOne, slot_was_found_in)
+        else:
+            if slot_was_found_in is not None:
+                # if we found slot, return object in which it was
+                lookup_result = (SlotLookupStatus.FoundOne, slot_was_found_in)
+            else:
+                # if we walked over all parents and found nothing, return FoundNone
+                lookup_result = (SlotLookupStatus.FoundNone, None)
 
-        # if we walked over all parents and found nothing, return FoundNone
-        return (SlotLookupStatus.FoundNone, None)
+        if lookup_result[0] != SlotLookupStatus.FoundOne or memoize_found:
+            self._cache_lookup(slot_name, lookup_result, visited_ids)
+
+        return lookup_result
+
+    def _get_lookup_cache_key(self, slot_name):
+        """
+        :return: (key of cached lookup in parents of this object, parent objects that must be kept alive by cache entry)
+        """
+        parent_slot_names = self._parent_slot_names
+
+        # most objects have single parent, key for them avoids building tuples
+        if len(parent_slot_names) == 1:
+            parent_object = self._slots[parent_slot_names[0]][1]
+            return (slot_name, id(parent_object)), parent_object
+
+        parent_objects = tuple(self._slots[parent_slot_name][1] for parent_slot_name in parent_slot_names)
+        return (slot_name, tuple(id(parent_object) for parent_object in parent_objects)), parent_objects
+
+    def _cache_lookup(self, slot_name, lookup_result, visited_ids):
+        """
+        Remembers result of lookup in parents of this object
+
+        :param visited_ids: ids of all objects searched by lookup - result depends on them
+        """
+        if len(_cached_lookups) >= CACHED_LOOKUP_LIMIT:
+            invalidate_cached_lookups()
+
+        cache_key, parent_objects = self._get_lookup_cache_key(slot_name)
+
+        _cached_lookups[cache_key] = (lookup_result[0], lookup_result[1], parent_objects)
+        _cached_lookup_dependencies.update(visited_ids)
 
     def get_code(self):
         return self._code
@@ -215,3 +355,31 @@ class VM_Object:
     def has_code(self):
         """TODO: Maybe replace this with none_object?"""
         return self._code is not None
+
+    def get_slot_count(self):
+        return len(self._slots)
+
+    def get_referenced_objects(self):
+        """
+        Returns objects directly referenced by this object - slot names, slot values and code
+
+        :return: list of referenced objects
+        """
+        referenced_objects = []
+
+        for slot_name, (_, slot_value) in self._slots.items():
+            referenced_objects.append(slot_name)
+            referenced_objects.append(slot_value)
+
+        if self._code is not None:
+            referenced_objects.append(self._code)
+
+        return referenced_objects
+
+    def get_approximate_size(self):
+        """
+        Estimates memory used by this object alone (without objects it references)
+
+        :return: size in bytes
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self._slots)
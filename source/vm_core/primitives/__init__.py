@@ -4,8 +4,10 @@ from source.vm_core.object_layout import SlotKind
 from source.vm_core.primitives import primitives_debug
 from source.vm_core.primitives import primitives_small_integer
 from source.vm_core.primitives import primitives_string
+from source.vm_core.primitives import primitives_string_builder
 from source.vm_core.primitives import primitives_byte_array
 from source.vm_core.primitives import primitives_object_array
+from source.vm_core.primitives import primitives_integer_vector
 from source.vm_core.primitives import primitives_mirror
 
 
@@ -25,7 +27,7 @@ def add_primitives_into(universe, primitives_holder):
 
         primitives_holder.add_slot(
             symbol_name,
-            SlotKind(),
+            SlotKind.NORMAL,
             VM_PrimitiveMethod(primitive_param_count, primitive_func)
         )
 
@@ -36,7 +38,9 @@ def add_primitives_into(universe, primitives_holder):
     add_all_local(primitives_debug)
     add_all_local(primitives_small_integer)
     add_all_local(primitives_string)
+    add_all_local(primitives_string_builder)
     add_all_local(primitives_byte_array)
     add_all_local(primitives_object_array)
+    add_all_local(primitives_integer_vector)
     add_all_local(primitives_mirror)
 
@@ -19,9 +19,9 @@ def primitive_byte_array_byte_put_at(interpreter, parameters):
     assert isinstance(index_object, VM_SmallInteger)
     assert 0 <= index_object.get_value() < byte_array_object.get_byte_count()
     assert isinstance(byte_object, VM_SmallInteger)
-    assert 0 <= index_object.get_value() < byte_array_object.get_byte_count()
+    assert 0 <= byte_object.get_value() <= 0xFF
 
-    byte_array_object.byte_put_at(index_object.get_code(), byte_object.get_value())
+    byte_array_object.byte_put_at(index_object.get_value(), byte_object.get_value())
 
     return interpreter.get_universe().get_none_object()
 
@@ -35,8 +35,80 @@ def primitive_byte_array_get_byte_count(interpreter, parameters):
     )
 
 
+def _assert_valid_range(byte_array_object, start_object, count_object):
+    assert isinstance(byte_array_object, VM_ByteArray)
+    assert isinstance(start_object, VM_SmallInteger)
+    assert isinstance(count_object, VM_SmallInteger)
+    assert 0 <= start_object.get_value()
+    assert 0 <= count_object.get_value()
+    assert start_object.get_value() + count_object.get_value() <= byte_array_object.get_byte_count()
+
+def primitive_byte_array_copy_range(interpreter, parameters):
+    source_object, source_start_object, target_object, target_start_object, count_object = parameters
+
+    _assert_valid_range(source_object, source_start_object, count_object)
+    _assert_valid_range(target_object, target_start_object, count_object)
+
+    target_object.bytes_put_at(
+        target_start_object.get_value(),
+        source_object.bytes_get_at(source_start_object.get_value(), count_object.get_value())
+    )
+
+    return interpreter.get_universe().get_none_object()
+
+def primitive_byte_array_fill(interpreter, parameters):
+    byte_array_object, start_object, count_object, byte_object = parameters
+
+    _assert_valid_range(byte_array_object, start_object, count_object)
+    assert isinstance(byte_object, VM_SmallInteger)
+    assert 0 <= byte_object.get_value() <= 0xFF
+
+    byte_array_object.bytes_fill(start_object.get_value(), count_object.get_value(), byte_object.get_value())
+
+    return interpreter.get_universe().get_none_object()
+
+def primitive_byte_array_compare(interpreter, parameters):
+    left_byte_array, right_byte_array = parameters
+
+    assert isinstance(left_byte_array, VM_ByteArray)
+    assert isinstance(right_byte_array, VM_ByteArray)
+
+    return interpreter.get_universe().new_small_integer(
+        left_byte_array.bytes_compare(right_byte_array)
+    )
+
+def primitive_byte_array_find(interpreter, parameters):
+    byte_array_object, byte_object, start_object = parameters
+
+    assert isinstance(byte_array_object, VM_ByteArray)
+    assert isinstance(byte_object, VM_SmallInteger)
+    assert 0 <= byte_object.get_value() <= 0xFF
+    assert isinstance(start_object, VM_SmallInteger)
+    assert 0 <= start_object.get_value() <= byte_array_object.get_byte_count()
+
+    return interpreter.get_universe().new_small_integer(
+        byte_array_object.byte_find(byte_object.get_value(), start_object.get_value())
+    )
+
+def primitive_byte_array_as_string(interpreter, parameters):
+    byte_array_object = parameters[0]
+
+    assert isinstance(byte_array_object, VM_ByteArray)
+
+    # byte array may hold any bytes - sequences that aren't valid UTF-8 become replacement characters
+    return interpreter.get_universe().new_string(
+        byte_array_object.bytes_get_at(0, byte_array_object.get_byte_count()).decode("utf-8", errors="replace")
+    )
+
+
 LOCAL_PRIMITIVES = (
     ("ByteArray_GetAt", 2, primitive_byte_array_byte_get_at),
     ("ByteArray_PutAt", 3, primitive_byte_array_byte_put_at),
-    ("ByteArray_ByteCount", 1, primitive_byte_array_get_byte_count)
-)
\ No newline at end of file
+    ("ByteArray_ByteCount", 1, primitive_byte_array_get_byte_count),
+
+    ("ByteArray_CopyRange", 5, primitive_byte_array_copy_range),
+    ("ByteArray_Fill", 4, primitive_byte_array_fill),
+    ("ByteArray_Compare", 2, primitive_byte_array_compare),
+    ("ByteArray_Find", 3, primitive_byte_array_find),
+    ("ByteArray_AsString", 1, primitive_byte_array_as_string),
+)
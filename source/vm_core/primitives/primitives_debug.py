@@ -1,4 +1,4 @@
-
+from source.vm_core.object_kinds import VM_String
 
 def primitive_debug_print_special_string(interpreter, parameters):
     print("Primitive function correctly called. Debug script printed")
@@ -6,7 +6,28 @@ def primitive_debug_print_special_string(interpreter, parameters):
 
     return interpreter.get_universe().new_small_integer(64)
 
+def primitive_debug_heap_statistics(interpreter, parameters):
+    statistics = interpreter.get_universe().get_heap_statistics(
+        extra_roots=[interpreter.get_process()]
+    )
+
+    return interpreter.get_universe().new_string(statistics.format_report())
+
+def primitive_debug_write_heap_snapshot(interpreter, parameters):
+    file_name_object = parameters[0]
+
+    assert isinstance(file_name_object, VM_String)
+
+    with open(file_name_object.get_characters(), "w", encoding="utf-8") as snapshot_file_obj:
+        object_count = interpreter.get_universe().write_heap_snapshot(
+            snapshot_file_obj, extra_roots=[interpreter.get_process()]
+        )
+
+    return interpreter.get_universe().new_small_integer(object_count)
+
 
 LOCAL_PRIMITIVES = (
     ("debug_printSpecialString", 0, primitive_debug_print_special_string),
-)
\ No newline at end of file
+    ("debug_heapStatistics", 0, primitive_debug_heap_statistics),
+    ("debug_writeHeapSnapshot", 1, primitive_debug_write_heap_snapshot),
+)
@@ -0,0 +1,271 @@
+import operator
+from array import array
+from itertools import compress, repeat
+
+from source.vm_core.object_kinds import VM_SmallInteger, VM_ObjectArray, VM_IntegerVector
+
+
+_ITEM_MODULUS = 1 << 64
+_ITEM_MINIMUM = -(1 << 63)
+
+
+def _wrap_item(value):
+    """Wraps arbitrary integer into range of signed 64-bit integer, the same way machine arithmetic does"""
+    return (value - _ITEM_MINIMUM) % _ITEM_MODULUS + _ITEM_MINIMUM
+
+def _make_items(values):
+    """
+    :param values: iterable of integers
+    :return: array of items, values out of 64-bit range are wrapped
+    """
+    values = list(values)
+
+    try:
+        return array(VM_IntegerVector.ITEM_TYPECODE, values)
+    except OverflowError:
+        return array(VM_IntegerVector.ITEM_TYPECODE, map(_wrap_item, values))
+
+def _get_right_operands(vector_object, operand_object):
+    """
+    :param vector_object: left operand of elementwise operation
+    :param operand_object: right operand - either vector of the same size, or small integer used for every item
+    :return: iterable of right operands of items
+    """
+    assert isinstance(vector_object, VM_IntegerVector)
+
+    if isinstance(operand_object, VM_SmallInteger):
+        return repeat(operand_object.get_value(), vector_object.get_item_count())
+
+    assert isinstance(operand_object, VM_IntegerVector)
+    assert operand_object.get_item_count() == vector_object.get_item_count()
+
+    return operand_object.get_items()
+
+def _truncated_division(a, b):
+    # rounds toward zero like SmallInteger_Div, but without going through float
+    quotient = abs(a) // abs(b)
+
+    return -quotient if (a < 0) != (b < 0) else quotient
+
+
+def primitive_integer_vector_new(interpreter, parameters):
+    count_object = parameters[0]
+
+    assert isinstance(count_object, VM_SmallInteger)
+    assert count_object.get_value() >= 0
+
+    return interpreter.get_universe().new_integer_vector(count_object.get_value())
+
+def primitive_integer_vector_from_array(interpreter, parameters):
+    object_array_object = parameters[0]
+
+    assert isinstance(object_array_object, VM_ObjectArray)
+
+    items = object_array_object.items_get_at(0, object_array_object.get_item_count())
+    assert all(isinstance(item, VM_SmallInteger) for item in items)
+
+    return interpreter.get_universe().new_integer_vector_from_items(
+        _make_items(item.get_value() for item in items)
+    )
+
+def primitive_integer_vector_as_array(interpreter, parameters):
+    vector_object = parameters[0]
+
+    assert isinstance(vector_object, VM_IntegerVector)
+
+    universe = interpreter.get_universe()
+
+    return universe.new_object_array_from_list(
+        [universe.new_small_integer(value) for value in vector_object.get_items()]
+    )
+
+def primitive_integer_vector_item_get_at(interpreter, parameters):
+    vector_object, index_object = parameters
+
+    assert isinstance(vector_object, VM_IntegerVector)
+    assert isinstance(index_object, VM_SmallInteger)
+    assert 0 <= index_object.get_value() < vector_object.get_item_count()
+
+    return interpreter.get_universe().new_small_integer(
+        vector_object.item_get_at(index_object.get_value())
+    )
+
+def primitive_integer_vector_item_put_at(interpreter, parameters):
+    vector_object, index_object, value_object = parameters
+
+    assert isinstance(vector_object, VM_IntegerVector)
+    assert isinstance(index_object, VM_SmallInteger)
+    assert isinstance(value_object, VM_SmallInteger)
+    assert 0 <= index_object.get_value() < vector_object.get_item_count()
+
+    vector_object.item_put_at(index_object.get_value(), _wrap_item(value_object.get_value()))
+
+    return interpreter.get_universe().get_none_object()
+
+def primitive_integer_vector_get_item_count(interpreter, parameters):
+    vector_object = parameters[0]
+
+    assert isinstance(vector_object, VM_IntegerVector)
+
+    return interpreter.get_universe().new_small_integer(
+        vector_object.get_item_count()
+    )
+
+def primitive_integer_vector_slice(interpreter, parameters):
+    vector_object, start_object, count_object = parameters
+
+    assert isinstance(vector_object, VM_IntegerVector)
+    assert isinstance(start_object, VM_SmallInteger)
+    assert isinstance(count_object, VM_SmallInteger)
+    assert 0 <= start_object.get_value()
+    assert 0 <= count_object.get_value()
+    assert start_object.get_value() + count_object.get_value() <= vector_object.get_item_count()
+
+    return interpreter.get_universe().new_integer_vector_from_items(
+        vector_object.items_get_at(start_object.get_value(), count_object.get_value())
+    )
+
+
+
+def _do_elementwise_operation(interpreter, vector_object, operand_object, operation):
+    right_operands = _get_right_operands(vector_object, operand_object)
+
+    return interpreter.get_universe().new_integer_vector_from_items(
+        _make_items(map(operation, vector_object.get_items(), right_operands))
+    )
+
+def primitive_integer_vector_add(interpreter, parameters):
+    vector_object, operand_object = parameters
+
+    return _do_elementwise_operation(interpreter, vector_object, operand_object, operator.add)
+
+def primitive_integer_vector_sub(interpreter, parameters):
+    vector_object, operand_object = parameters
+
+    return _do_elementwise_operation(interpreter, vector_object, operand_object, operator.sub)
+
+def primitive_integer_vector_mul(interpreter, parameters):
+    vector_object, operand_object = parameters
+
+    return _do_elementwise_operation(interpreter, vector_object, operand_object, operator.mul)
+
+def primitive_integer_vector_div(interpreter, parameters):
+    vector_object, operand_object = parameters
+
+    assert 0 not in _get_right_operands(vector_object, operand_object)
+
+    return _do_elementwise_operation(interpreter, vector_object, operand_object, _truncated_division)
+
+def primitive_integer_vector_modulo(interpreter, parameters):
+    vector_object, operand_object = parameters
+
+    assert 0 not in _get_right_operands(vector_object, operand_object)
+
+    return _do_elementwise_operation(interpreter, vector_object, operand_object, operator.mod)
+
+
+
+def _do_comparison_operation(interpreter, vector_object, operand_object, predicate):
+    """
+    :return: mask - vector with 1 where predicate holds and 0 elsewhere
+    """
+    right_operands = _get_right_operands(vector_object, operand_object)
+
+    return interpreter.get_universe().new_integer_vector_from_items(
+        array(VM_IntegerVector.ITEM_TYPECODE, map(predicate, vector_object.get_items(), right_operands))
+    )
+
+def primitive_integer_vector_equal(interpreter, parameters):
+    vector_object, operand_object = parameters
+
+    return _do_comparison_operation(interpreter, vector_object, operand_object, operator.eq)
+
+def primitive_integer_vector_greater(interpreter, parameters):
+    vector_object, operand_object = parameters
+
+    return _do_comparison_operation(interpreter, vector_object, operand_object, operator.gt)
+
+def primitive_integer_vector_lesser(interpreter, parameters):
+    vector_object, operand_object = parameters
+
+    return _do_comparison_operation(interpreter, vector_object, operand_object, operator.lt)
+
+def primitive_integer_vector_select(interpreter, parameters):
+    vector_object, mask_object = parameters
+
+    assert isinstance(vector_object, VM_IntegerVector)
+    assert isinstance(mask_object, VM_IntegerVector)
+    assert mask_object.get_item_count() == vector_object.get_item_count()
+
+    return interpreter.get_universe().new_integer_vector_from_items(
+        array(VM_IntegerVector.ITEM_TYPECODE, compress(vector_object.get_items(), mask_object.get_items()))
+    )
+
+
+
+def primitive_integer_vector_sum(interpreter, parameters):
+    vector_object = parameters[0]
+
+    assert isinstance(vector_object, VM_IntegerVector)
+
+    return interpreter.get_universe().new_small_integer(
+        sum(vector_object.get_items())
+    )
+
+def primitive_integer_vector_min(interpreter, parameters):
+    vector_object = parameters[0]
+
+    assert isinstance(vector_object, VM_IntegerVector)
+    assert vector_object.get_item_count() > 0
+
+    return interpreter.get_universe().new_small_integer(
+        min(vector_object.get_items())
+    )
+
+def primitive_integer_vector_max(interpreter, parameters):
+    vector_object = parameters[0]
+
+    assert isinstance(vector_object, VM_IntegerVector)
+    assert vector_object.get_item_count() > 0
+
+    return interpreter.get_universe().new_small_integer(
+        max(vector_object.get_items())
+    )
+
+def primitive_integer_vector_dot(interpreter, parameters):
+    left_vector, right_vector = parameters
+
+    assert isinstance(left_vector, VM_IntegerVector)
+    assert isinstance(right_vector, VM_IntegerVector)
+    assert left_vector.get_item_count() == right_vector.get_item_count()
+
+    return interpreter.get_universe().new_small_integer(
+        sum(map(operator.mul, left_vector.get_items(), right_vector.get_items()))
+    )
+
+
+LOCAL_PRIMITIVES = (
+    ("IntegerVector_New", 1, primitive_integer_vector_new),
+    ("IntegerVector_FromArray", 1, primitive_integer_vector_from_array),
+    ("IntegerVector_AsArray", 1, primitive_integer_vector_as_array),
+    ("IntegerVector_GetAt", 2, primitive_integer_vector_item_get_at),
+    ("IntegerVector_PutAt", 3, primitive_integer_vector_item_put_at),
+    ("IntegerVector_ItemCount", 1, primitive_integer_vector_get_item_count),
+    ("IntegerVector_Slice", 3, primitive_integer_vector_slice),
+
+    ("IntegerVector_Add", 2, primitive_integer_vector_add),
+    ("IntegerVector_Sub", 2, primitive_integer_vector_sub),
+    ("IntegerVector_Mul", 2, primitive_integer_vector_mul),
+    ("IntegerVector_Div", 2, primitive_integer_vector_div),
+    ("IntegerVector_Mod", 2, primitive_integer_vector_modulo),
+
+    ("IntegerVector_Equal", 2, primitive_integer_vector_equal),
+    ("IntegerVector_Greater", 2, primitive_integer_vector_greater),
+    ("IntegerVector_Lesser", 2, primitive_integer_vector_lesser),
+    ("IntegerVector_Select", 2, primitive_integer_vector_select),
+
+    ("IntegerVector_Sum", 1, primitive_integer_vector_sum),
+    ("IntegerVector_Min", 1, primitive_integer_vector_min),
+    ("IntegerVector_Max", 1, primitive_integer_vector_max),
+    ("IntegerVector_Dot", 2, primitive_integer_vector_dot),
+)
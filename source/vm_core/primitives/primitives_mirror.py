@@ -1,7 +1,3 @@
-from ast import iter_child_nodes
-
-from charset_normalizer.utils import is_arabic_isolated_form
-
 from source.vm_core.bytecodes import SlotKindTags
 from source.vm_core.object_kinds import VM_Mirror, VM_Symbol, VM_SmallInteger
 from source.vm_core.object_layout import SlotKind
@@ -24,12 +20,10 @@ def primitive_mirror_add_slot(interpreter, parameters):
     reflectee = mirror_object.get_reflectee()
 
     slot_kind_bytes = slot_kind_object.get_value()
-    slot_kind = SlotKind()
-
-    if slot_kind_bytes | SlotKindTags.PARAMETER_SLOT_TAG:
-        slot_kind.toggleParameter()
-    if slot_kind_bytes | SlotKindTags.PARENT_SLOT_TAG:
-        slot_kind.toggleParent()
+    slot_kind = SlotKind(
+        isParent=slot_kind_bytes & SlotKindTags.PARENT_SLOT_TAG,
+        isParameter=slot_kind_bytes & SlotKindTags.PARAMETER_SLOT_TAG
+    )
 
 
 
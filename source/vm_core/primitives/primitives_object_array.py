@@ -1,4 +1,4 @@
-from source.vm_core.object_kinds import VM_ByteArray, VM_SmallInteger, VM_ObjectArray
+from source.vm_core.object_kinds import VM_SmallInteger, VM_ObjectArray
 
 
 def primitive_object_array_item_get_at(interpreter, parameters):
@@ -8,9 +8,7 @@ def primitive_object_array_item_get_at(interpreter, parameters):
     assert isinstance(index_object, VM_SmallInteger)
     assert 0 <= index_object.get_value() < object_array_object.get_item_count()
 
-    return interpreter.get_universe().new_small_integer(
-        object_array_object.item_get_at(index_object.get_value())
-    )
+    return object_array_object.item_get_at(index_object.get_value())
 
 def primitive_object_array_item_put_at(interpreter, parameters):
     object_array_object, index_object, item_object = parameters
@@ -19,7 +17,7 @@ def primitive_object_array_item_put_at(interpreter, parameters):
     assert isinstance(index_object, VM_SmallInteger)
     assert 0 <= index_object.get_value() < object_array_object.get_item_count()
 
-    object_array_object.item_put_at(index_object.get_code(), item_object)
+    object_array_object.item_put_at(index_object.get_value(), item_object)
 
     return interpreter.get_universe().get_none_object()
 
@@ -33,8 +31,88 @@ def primitive_object_array_get_item_count(interpreter, parameters):
     )
 
 
+def _assert_valid_range(object_array_object, start_object, count_object):
+    assert isinstance(object_array_object, VM_ObjectArray)
+    assert isinstance(start_object, VM_SmallInteger)
+    assert isinstance(count_object, VM_SmallInteger)
+    assert 0 <= start_object.get_value()
+    assert 0 <= count_object.get_value()
+    assert start_object.get_value() + count_object.get_value() <= object_array_object.get_item_count()
+
+def primitive_object_array_copy_range(interpreter, parameters):
+    source_object, source_start_object, target_object, target_start_object, count_object = parameters
+
+    _assert_valid_range(source_object, source_start_object, count_object)
+    _assert_valid_range(target_object, target_start_object, count_object)
+
+    target_object.items_put_at(
+        target_start_object.get_value(),
+        source_object.items_get_at(source_start_object.get_value(), count_object.get_value())
+    )
+
+    return interpreter.get_universe().get_none_object()
+
+def primitive_object_array_resized(interpreter, parameters):
+    object_array_object, size_object = parameters
+
+    assert isinstance(object_array_object, VM_ObjectArray)
+    assert isinstance(size_object, VM_SmallInteger)
+    assert size_object.get_value() >= 0
+
+    new_object_array = interpreter.get_universe().new_object_array(size_object.get_value())
+    new_object_array.items_put_at(0, object_array_object.items_get_at(0, size_object.get_value()))
+
+    return new_object_array
+
+def primitive_object_array_fill(interpreter, parameters):
+    object_array_object, start_object, count_object, item_object = parameters
+
+    _assert_valid_range(object_array_object, start_object, count_object)
+
+    object_array_object.items_fill(start_object.get_value(), count_object.get_value(), item_object)
+
+    return interpreter.get_universe().get_none_object()
+
+def primitive_object_array_index_of(interpreter, parameters):
+    object_array_object, item_object, start_object = parameters
+
+    assert isinstance(object_array_object, VM_ObjectArray)
+    assert isinstance(start_object, VM_SmallInteger)
+    assert 0 <= start_object.get_value() <= object_array_object.get_item_count()
+
+    return interpreter.get_universe().new_small_integer(
+        object_array_object.item_find(item_object, start_object.get_value())
+    )
+
+def primitive_object_array_reverse(interpreter, parameters):
+    object_array_object = parameters[0]
+
+    assert isinstance(object_array_object, VM_ObjectArray)
+
+    object_array_object.items_reverse()
+
+    return interpreter.get_universe().get_none_object()
+
+def primitive_object_array_concatenate(interpreter, parameters):
+    left_array, right_array = parameters
+
+    assert isinstance(left_array, VM_ObjectArray)
+    assert isinstance(right_array, VM_ObjectArray)
+
+    return interpreter.get_universe().new_object_array_from_list(
+        left_array.items_get_at(0, left_array.get_item_count()) + right_array.items_get_at(0, right_array.get_item_count())
+    )
+
+
 LOCAL_PRIMITIVES = (
     ("ObjectArray_GetAt", 2, primitive_object_array_item_get_at),
     ("ObjectArray_PutAt", 3, primitive_object_array_item_put_at),
-    ("ObjectArray_ItemCount", 1, primitive_object_array_get_item_count)
-)
\ No newline at end of file
+    ("ObjectArray_ItemCount", 1, primitive_object_array_get_item_count),
+
+    ("ObjectArray_CopyRange", 5, primitive_object_array_copy_range),
+    ("ObjectArray_Resized", 2, primitive_object_array_resized),
+    ("ObjectArray_Fill", 4, primitive_object_array_fill),
+    ("ObjectArray_IndexOf", 3, primitive_object_array_index_of),
+    ("ObjectArray_Reverse", 1, primitive_object_array_reverse),
+    ("ObjectArray_Concatenate", 2, primitive_object_array_concatenate),
+)
@@ -39,7 +39,16 @@ def primitive_string_combine(interpreter, parameters):
     assert isinstance(right_string, VM_String)
 
     return interpreter.get_universe().new_string(
-        (left_string.get_characters() + right_string.get_characters()).encode(encoding="utf-8")
+        left_string.get_characters() + right_string.get_characters()
+    )
+
+def primitive_string_as_byte_array(interpreter, parameters):
+    string_object = parameters[0]
+
+    assert isinstance(string_object, VM_String)
+
+    return interpreter.get_universe().new_byte_array_from_bytes(
+        string_object.get_characters().encode("utf-8")
     )
 
 
@@ -57,5 +66,6 @@ LOCAL_PRIMITIVES = (
     ("String_CharCount", 1, primitive_string_get_character_count),
     ("String_Combine", 2, primitive_string_combine),
     ("String_Print", 1, primitive_string_print),
-    ("String_AsSymbol", 1, primitive_string_as_symbol)
+    ("String_AsSymbol", 1, primitive_string_as_symbol),
+    ("String_AsByteArray", 1, primitive_string_as_byte_array)
 )
\ No newline at end of file
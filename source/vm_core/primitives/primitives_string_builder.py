@@ -0,0 +1,52 @@
+from source.vm_core.object_kinds import VM_SmallInteger, VM_String, VM_StringBuilder
+
+
+def primitive_string_builder_new(interpreter, parameters):
+    return interpreter.get_universe().new_string_builder()
+
+def primitive_string_builder_append(interpreter, parameters):
+    string_builder_object, string_object = parameters
+
+    assert isinstance(string_builder_object, VM_StringBuilder)
+    assert isinstance(string_object, VM_String)
+
+    string_builder_object.append(string_object.get_characters())
+
+    return interpreter.get_universe().get_none_object()
+
+def primitive_string_builder_append_integer(interpreter, parameters):
+    string_builder_object, integer_object = parameters
+
+    assert isinstance(string_builder_object, VM_StringBuilder)
+    assert isinstance(integer_object, VM_SmallInteger)
+
+    string_builder_object.append(str(integer_object.get_value()))
+
+    return interpreter.get_universe().get_none_object()
+
+def primitive_string_builder_get_character_count(interpreter, parameters):
+    string_builder_object = parameters[0]
+
+    assert isinstance(string_builder_object, VM_StringBuilder)
+
+    return interpreter.get_universe().new_small_integer(
+        string_builder_object.get_character_count()
+    )
+
+def primitive_string_builder_as_string(interpreter, parameters):
+    string_builder_object = parameters[0]
+
+    assert isinstance(string_builder_object, VM_StringBuilder)
+
+    return interpreter.get_universe().new_string(
+        string_builder_object.get_characters()
+    )
+
+
+LOCAL_PRIMITIVES = (
+    ("StringBuilder_New", 0, primitive_string_builder_new),
+    ("StringBuilder_Append", 2, primitive_string_builder_append),
+    ("StringBuilder_AppendInteger", 2, primitive_string_builder_append_integer),
+    ("StringBuilder_CharCount", 1, primitive_string_builder_get_character_count),
+    ("StringBuilder_AsString", 1, primitive_string_builder_as_string),
+)
@@ -0,0 +1,195 @@
+"""
+Sampling profiler - periodically captures stack of VM frames of running process.
+
+Samples are taken by profiling timer signal when profiler is started from main thread (and platform has one),
+otherwise by sampler thread. Interpreter itself is not instrumented at all.
+Frames are labelled by name of slot through which their method is reachable from receiver of the method.
+Result is in folded-stack format ("outer;inner;innermost count" per line), ready for flamegraph tools.
+Labels can't contain separators of that format - semicolons and whitespace in them are replaced by underscores.
+"""
+
+import re
+import signal
+import threading
+from collections import Counter, deque
+
+from source.vm_core.object_kinds import VM_Frame, VM_Symbol
+from source.vm_core.object_layout import VM_Object
+
+
+DEFAULT_SAMPLING_INTERVAL = 0.001
+
+# deeper stacks keep only their outermost and innermost frames, so single sample can't take long
+MAX_SAMPLED_DEPTH = 512
+
+# label standing for frames left out of sample of deep stack
+TRUNCATED_LABEL = "[truncated]"
+
+_LABEL_SEPARATOR_PATTERN = re.compile(r"[;\s]")
+
+# number of objects searched while looking for name of method
+MAX_LABEL_SEARCH_OBJECTS = 64
+
+_ME_SYMBOL = VM_Symbol("me", 0)
+
+
+def find_method_name(frame):
+    """
+    Looks for name of slot containing method that is executed by frame.
+    Search starts in receiver of method and continues through its parents.
+
+    :return: name of slot, None if method wasn't found
+    """
+    receiver = frame.get_method_activation().get_slot(_ME_SYMBOL)
+    code = frame.get_code()
+
+    if not isinstance(receiver, VM_Object):
+        return None
+
+    visited_ids = {id(receiver)}
+    queue = [receiver]
+
+    while len(queue) > 0 and len(visited_ids) <= MAX_LABEL_SEARCH_OBJECTS:
+        viewed_object = queue.pop(0)
+
+        for slot_name, slot_kind, slot_content in viewed_object.select_slots(lambda *_: True):
+            if not isinstance(slot_content, VM_Object):
+                continue
+
+            if slot_content.has_code() and slot_content.get_code() is code:
+                return slot_name.get_text() if isinstance(slot_name, VM_Symbol) else str(slot_name)
+
+            if slot_kind.isParent() and id(slot_content) not in visited_ids:
+                visited_ids.add(id(slot_content))
+                queue.append(slot_content)
+
+    return None
+
+
+def sanitize_label(label):
+    """
+    :return: label that can be part of folded stack - without semicolons and whitespace
+    """
+    return _LABEL_SEPARATOR_PATTERN.sub("_", label)
+
+
+class SamplingProfiler:
+    def __init__(self, interpreter, interval=DEFAULT_SAMPLING_INTERVAL):
+        self._interpreter = interpreter
+        self._interval = interval
+
+        # tuple of frame labels (outermost first) -> number of samples
+        self._stack_counts = Counter()
+
+        # code -> label, so method is searched for only once
+        self._code_labels = {}
+
+        self._sampler_thread = None
+        self._stop_event = threading.Event()
+
+        self._is_sampling_by_signal = False
+        self._previous_signal_handler = None
+
+    def _get_frame_label(self, frame, is_outermost):
+        code = frame.get_code()
+
+        label = self._code_labels.get(code)
+        if label is None:
+            label = find_method_name(frame)
+
+            if label is None:
+                label = "<module>" if is_outermost else "<anonymous#{}>".format(len(self._code_labels))
+
+            label = sanitize_label(label)
+            self._code_labels[code] = label
+
+        return label
+
+    def take_sample(self):
+        """
+        Records current stack of frames of interpreted process.
+        Stack deeper than MAX_SAMPLED_DEPTH keeps its outermost and innermost frames, with TRUNCATED_LABEL between them.
+        """
+        innermost_count = MAX_SAMPLED_DEPTH // 2
+
+        # frames are walked from innermost one, frames over limit push out the inner ones of outer part
+        innermost_frames = []
+        outermost_frames = deque(maxlen=MAX_SAMPLED_DEPTH - innermost_count)
+        frame_count = 0
+
+        frame = self._interpreter.get_process().peek_frame()
+        while isinstance(frame, VM_Frame):
+            if frame_count < innermost_count:
+                innermost_frames.append(frame)
+            else:
+                outermost_frames.append(frame)
+
+            frame_count += 1
+            frame = frame.get_previous_frame()
+
+        if frame_count == 0:
+            return
+
+        frames = list(reversed(outermost_frames)) + list(reversed(innermost_frames))
+
+        labels = [self._get_frame_label(frame, index == 0) for index, frame in enumerate(frames)]
+
+        if frame_count > MAX_SAMPLED_DEPTH:
+            labels.insert(len(outermost_frames), TRUNCATED_LABEL)
+
+        self._stack_counts[tuple(labels)] += 1
+
+    def _sample_periodically(self):
+        while not self._stop_event.wait(self._interval):
+            self.take_sample()
+
+    def _can_use_signal(self):
+        return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+    def start(self):
+        if self._can_use_signal():
+            self._previous_signal_handler = signal.signal(signal.SIGPROF, lambda signal_number, python_frame: self.take_sample())
+            self._is_sampling_by_signal = True
+            signal.setitimer(signal.ITIMER_PROF, self._interval, self._interval)
+            return
+
+        self._stop_event.clear()
+        self._sampler_thread = threading.Thread(target=self._sample_periodically, daemon=True)
+        self._sampler_thread.start()
+
+    def stop(self):
+        if self._sampler_thread is not None:
+            self._stop_event.set()
+            self._sampler_thread.join()
+            self._sampler_thread = None
+            return
+
+        if self._is_sampling_by_signal:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+
+            # handler installed outside of python can't be restored
+            previous_handler = self._previous_signal_handler if self._previous_signal_handler is not None else signal.SIG_DFL
+            signal.signal(signal.SIGPROF, previous_handler)
+
+            self._is_sampling_by_signal = False
+            self._previous_signal_handler = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def get_sample_count(self):
+        return sum(self._stack_counts.values())
+
+    def get_folded_stacks(self):
+        """
+        :return: dict of "outer;inner" stack -> number of samples
+        """
+        return {";".join(labels): count for labels, count in self._stack_counts.items()}
+
+    def write_folded_stacks(self, file_obj):
+        for stack, count in sorted(self.get_folded_stacks().items()):
+            file_obj.write("{} {}\n".format(stack, count))
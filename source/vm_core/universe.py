@@ -1,11 +1,28 @@
 from source.vm_core.object_layout import VM_Object, SlotKind
 from source.vm_core.object_kinds import *
+from source.vm_core.heap_snapshot import write_heap_snapshot
+from source.vm_core.heap_statistics import collect_heap_statistics
 from source.vm_core.primitives import add_primitives_into
 
 
+# names of errors raised by interpreter - their symbols are created once, with universe
+PROCESS_ERROR_NAMES = (
+    "stackOverflow",
+    "stackUnderflow",
+    "literalIndexOutOfBound",
+    "notSymbolicSelector",
+    "missingAssigneeSlot",
+    "unknownOpcode",
+    "jumpOutOfBounds",
+    "nonBooleanCondition",
+    "unknownSelector",
+    "ambitiousSelector",
+)
+
+
 class Universe:
-    PARENT_KIND = SlotKind().toggleParent()
-    NORMAL_KIND = SlotKind()
+    PARENT_KIND = SlotKind.PARENT
+    NORMAL_KIND = SlotKind.NORMAL
 
     def __init__(self):
         # root object of system
@@ -17,9 +34,11 @@ class Universe:
         # traits for other objects (object kinds + important objects)
         self._symbol_trait = None
         self._string_trait = None
+        self._string_builder_trait = None
         self._small_integer_trait = None
         self._byte_array_trait = None
         self._object_array_trait = None
+        self._integer_vector_trait = None
         self._mirror_trait = None
         self._code_trait = None
         self._frame_trait = None
@@ -35,12 +54,24 @@ class Universe:
         self._false_object = None
         self._none_object = None
 
+        # selectors of handlers of failed sends
+        self._unknown_selector_symbol = None
+        self._ambitious_selector_symbol = None
+
+        # error name -> symbol of error
+        self._error_symbols = {}
+
+        # name of slot containing name of error in error objects
+        self._error_name_symbol = None
+
     def init_clean_universe(self):
         self._symbol_trait = VM_Object()
         self._string_trait = VM_Object()
+        self._string_builder_trait = VM_Object()
         self._small_integer_trait = VM_Object()
         self._byte_array_trait = VM_Object()
         self._object_array_trait = VM_Object()
+        self._integer_vector_trait = VM_Object()
         self._mirror_trait = VM_Object()
         self._code_trait = VM_Object()
         self._frame_trait = VM_Object()
@@ -62,6 +93,12 @@ class Universe:
         self._false_object.add_slot(self._parent_symbol, Universe.PARENT_KIND, self._false_object_trait)
         self._none_object.add_slot(self._parent_symbol, Universe.PARENT_KIND, self._none_object_trait)
 
+        self._unknown_selector_symbol = self.new_symbol("unknownSelector", 2)
+        self._ambitious_selector_symbol = self.new_symbol("ambitiousSelector", 2)
+
+        self._error_symbols = {error_name: self.new_symbol(error_name, 0) for error_name in PROCESS_ERROR_NAMES}
+        self._error_name_symbol = self.new_symbol("name", 0)
+
         traits_object = VM_Object()
 
         def add_trait(name, trait_object):
@@ -69,9 +106,11 @@ class Universe:
 
         add_trait("Symbol", self._symbol_trait)
         add_trait("String", self._string_trait)
+        add_trait("StringBuilder", self._string_builder_trait)
         add_trait("SmallInteger", self._small_integer_trait)
         add_trait("ByteArray", self._byte_array_trait)
         add_trait("ObjectArray", self._object_array_trait)
+        add_trait("IntegerVector", self._integer_vector_trait)
         add_trait("Mirror", self._mirror_trait)
         add_trait("Code", self._code_trait)
         add_trait("Frame", self._frame_trait)
@@ -102,6 +141,25 @@ class Universe:
     def get_lobby_object(self):
         return self._lobby_object
 
+    def get_heap_statistics(self, extra_roots=()):
+        """
+        Takes census of objects reachable from lobby (and from extra roots, like live processes)
+
+        :param extra_roots: objects not reachable from lobby that should be counted too
+        :return: HeapStatistics
+        """
+        return collect_heap_statistics([self._lobby_object] + list(extra_roots))
+
+    def write_heap_snapshot(self, file_obj, extra_roots=()):
+        """
+        Streams objects reachable from lobby (and from extra roots, like live processes) into snapshot file
+
+        :param file_obj: text file opened for writing
+        :param extra_roots: objects not reachable from lobby that should be written too
+        :return: number of written objects
+        """
+        return write_heap_snapshot(file_obj, [self._lobby_object] + list(extra_roots))
+
     def get_none_object(self):
         return self._none_object
 
@@ -111,6 +169,59 @@ class Universe:
     def get_false_object(self):
         return self._false_object
 
+    def get_unknown_selector_symbol(self):
+        return self._unknown_selector_symbol
+
+    def get_ambitious_selector_symbol(self):
+        return self._ambitious_selector_symbol
+
+    def get_error_symbol(self, error_name):
+        """
+        :param error_name: name of error
+        :return: symbol of error, shared by all errors of the same name
+        """
+        error_symbol = self._error_symbols.get(error_name)
+
+        if error_symbol is None:
+            error_symbol = self.new_symbol(error_name, 0)
+            self._error_symbols[error_name] = error_symbol
+
+        return error_symbol
+
+    def get_error_name(self, vm_object):
+        """
+        :param vm_object: any object
+        :return: name of error if object is error object, None otherwise
+        """
+        if vm_object.get_slot(self._parent_symbol) is not self._error_object_trait:
+            return None
+
+        error_symbol = vm_object.get_slot(self._error_name_symbol)
+
+        if not isinstance(error_symbol, VM_Symbol):
+            return None
+
+        return error_symbol.get_text()
+
+    def set_allocation_observer(self, observer):
+        """
+        Makes universe call observer with every object it creates, or stop doing so if observer is None.
+        Every created object is linked to its trait exactly once, so observed version of linking is installed
+        on this instance only - universe without observer is not slowed down.
+
+        :param observer: function accepting new object, or None
+        :return: None
+        """
+        if observer is None:
+            self.__dict__.pop("_link_trait", None)
+            return
+
+        def link_trait_observed(child_object, trait):
+            Universe._link_trait(self, child_object, trait)
+            observer(child_object)
+
+        self._link_trait = link_trait_observed
+
     def _link_trait(self, child_object, trait):
         child_object.add_slot(self._parent_symbol, Universe.PARENT_KIND, trait)
 
@@ -126,6 +237,12 @@ class Universe:
 
         return new_string
 
+    def new_string_builder(self):
+        new_string_builder = VM_StringBuilder()
+        self._link_trait(new_string_builder, self._string_builder_trait)
+
+        return new_string_builder
+
     def new_small_integer(self, value):
         new_small_integer = VM_SmallInteger(value)
         self._link_trait(new_small_integer, self._small_integer_trait)
@@ -138,6 +255,12 @@ class Universe:
 
         return new_byte_array
 
+    def new_byte_array_from_bytes(self, byte_content):
+        new_byte_array = self.new_byte_array(len(byte_content))
+        new_byte_array.bytes_put_at(0, byte_content)
+
+        return new_byte_array
+
     def new_object_array(self, item_count):
         new_object_array = VM_ObjectArray(item_count, self._none_object)
         self._link_trait(new_object_array, self._object_array_trait)
@@ -146,12 +269,26 @@ class Universe:
 
     def new_object_array_from_list(self, object_list):
         new_object_array = self.new_object_array(len(object_list))
-
-        for index in range(len(object_list)):
-            new_object_array.item_put_at(index, object_list[index])
+        new_object_array.items_put_at(0, object_list)
 
         return new_object_array
 
+    def new_integer_vector(self, item_count):
+        new_integer_vector = VM_IntegerVector(item_count)
+        self._link_trait(new_integer_vector, self._integer_vector_trait)
+
+        return new_integer_vector
+
+    def new_integer_vector_from_items(self, items):
+        """
+        :param items: array of typecode VM_IntegerVector.ITEM_TYPECODE, new vector takes ownership of it
+        :return: new integer vector
+        """
+        new_integer_vector = self.new_integer_vector(0)
+        new_integer_vector.set_items(items)
+
+        return new_integer_vector
+
     def new_mirror(self, reflectee):
         new_mirror = VM_Mirror(reflectee)
         self._link_trait(new_mirror, self._mirror_trait)
@@ -193,8 +330,8 @@ class Universe:
         new_error_object = VM_Object()
 
         new_error_object.add_slot(
-            self.new_symbol("name", 0),
-            SlotKind(),
+            self._error_name_symbol,
+            SlotKind.NORMAL,
             error_symbol_name
         )
 
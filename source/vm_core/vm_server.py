@@ -0,0 +1,233 @@
+"""
+Server mode - keeps bootstrapped universe warm and runs modules sent over local unix socket.
+
+Every message (both request and response) is prefixed by its length as 4-byte big-endian integer.
+Request is content of module file, response is JSON object with keys:
+    status - "finished", "budgetExhausted", "deadlineReached" or "failed"
+    result - description of process result (number, text, {"error": name}, {"kind": name}), missing if process didn't finish
+    output - everything module printed
+    message - reason of failure, present only with "failed" status
+
+By default each request is handled by forked child of server, so module can't change universe seen by later requests
+and all children share warm heap of server copy-on-write.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import time
+
+from source.vm_core.bytecode_parsing import DeserializationError
+from source.vm_core.interpreter import Interpreter, ExecutionStatus
+from source.vm_core.main import BOOTLOADER_MODULE_NAME, bootstrap_universe, load_module_process
+from source.vm_core.object_kinds import VM_SmallInteger, VM_String, VM_Symbol
+
+
+_MESSAGE_HEADER = struct.Struct("!I")
+
+# biggest accepted message, protects server from clients sending garbage length
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+EXECUTION_STATUS_NAMES = {
+    ExecutionStatus.Finished: "finished",
+    ExecutionStatus.BudgetExhausted: "budgetExhausted",
+    ExecutionStatus.DeadlineReached: "deadlineReached",
+}
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def send_message(connection, payload):
+    connection.sendall(_MESSAGE_HEADER.pack(len(payload)) + payload)
+
+
+def _receive_exactly(connection, byte_count):
+    chunks = []
+
+    while byte_count > 0:
+        chunk = connection.recv(min(byte_count, 1024 * 1024))
+        if len(chunk) == 0:
+            raise ProtocolError("Connection closed in the middle of message")
+
+        chunks.append(chunk)
+        byte_count -= len(chunk)
+
+    return b"".join(chunks)
+
+
+def receive_message(connection):
+    """
+    :return: payload of message, None if connection was closed before message started
+    """
+    first_byte = connection.recv(1)
+    if len(first_byte) == 0:
+        return None
+
+    message_size, = _MESSAGE_HEADER.unpack(first_byte + _receive_exactly(connection, _MESSAGE_HEADER.size - 1))
+
+    if message_size > MAX_MESSAGE_SIZE:
+        raise ProtocolError("Message of {} bytes is too big".format(message_size))
+
+    return _receive_exactly(connection, message_size)
+
+
+def describe_result(universe, result):
+    """
+    :return: JSON-compatible description of process result
+    """
+    if result is universe.get_none_object():
+        return None
+
+    if result is universe.get_true_object():
+        return True
+
+    if result is universe.get_false_object():
+        return False
+
+    if isinstance(result, VM_SmallInteger):
+        return result.get_value()
+
+    if isinstance(result, VM_String):
+        return result.get_characters()
+
+    if isinstance(result, VM_Symbol):
+        return result.get_text()
+
+    error_name = universe.get_error_name(result)
+    if error_name is not None:
+        return {"error": error_name}
+
+    return {"kind": type(result).__name__}
+
+
+def run_module_stream(universe, module_file_obj, instruction_budget=None, timeout=None):
+    """
+    Runs module in new process of universe, module is deserialized as it is read from stream
+
+    :param module_file_obj: binary file (or other binary stream) with module
+    :param instruction_budget: maximal number of executed instructions, None for no limit
+    :param timeout: maximal run time in seconds, None for no limit
+    :return: response as JSON-compatible dict
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    output = io.StringIO()
+
+    try:
+        with contextlib.redirect_stdout(output):
+            process = load_module_process(universe, module_file_obj)
+            status = Interpreter(universe, process).execute_all(instruction_budget, deadline)
+    except DeserializationError as e:
+        return {"status": "failed", "message": "Deserialization error: {}".format(str(e)), "output": output.getvalue()}
+    except Exception as e:
+        return {"status": "failed", "message": "Internal error: {!r}".format(e), "output": output.getvalue()}
+
+    response = {"status": EXECUTION_STATUS_NAMES[status], "output": output.getvalue()}
+
+    if status == ExecutionStatus.Finished:
+        response["result"] = describe_result(universe, process.get_result())
+
+    return response
+
+def run_module(universe, module_bytes, instruction_budget=None, timeout=None):
+    """
+    Runs module in new process of universe
+
+    :param module_bytes: content of module file
+    :return: response as JSON-compatible dict
+    """
+    return run_module_stream(universe, io.BytesIO(module_bytes), instruction_budget, timeout)
+
+
+class _ModuleRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            module_bytes = receive_message(self.request)
+        except ProtocolError:
+            return
+
+        if module_bytes is None:
+            return
+
+        response = run_module(self.server.universe, module_bytes, self.server.instruction_budget, self.server.timeout)
+        send_message(self.request, json.dumps(response).encode("utf-8"))
+
+
+class VMServer(socketserver.UnixStreamServer):
+    """
+    Runs modules in universe of server itself - later requests see changes made by earlier ones
+    """
+
+    def __init__(self, socket_path, universe, instruction_budget=None, timeout=None):
+        self.universe = universe
+        self.instruction_budget = instruction_budget
+        self.timeout = timeout
+
+        super().__init__(socket_path, _ModuleRequestHandler)
+
+
+class ForkingVMServer(socketserver.ForkingMixIn, VMServer):
+    """
+    Runs each module in forked child, in copy of universe
+    """
+    pass
+
+
+def run_remote_module(socket_path, module_bytes):
+    """
+    Sends module to server and waits for response
+
+    :return: response as dict
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        send_message(connection, module_bytes)
+
+        response = receive_message(connection)
+
+    if response is None:
+        raise ProtocolError("Server closed connection without response")
+
+    return json.loads(response.decode("utf-8"))
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Serves module runs over unix socket, from bootstrapped universe.")
+    parser.add_argument("socket_path", help="path of unix socket to listen on")
+    parser.add_argument("--bootloader", default=BOOTLOADER_MODULE_NAME, help="name of bootloader file")
+    parser.add_argument("--shared-universe", action="store_true", help="run modules in server universe instead of forked copies")
+    parser.add_argument("--max-instructions", type=int, default=None, help="instruction budget of each module")
+    parser.add_argument("--timeout", type=float, default=None, help="time limit of each module, in seconds")
+
+    return parser.parse_args(arguments)
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments(sys.argv[1:])
+
+    universe = bootstrap_universe(arguments.bootloader)
+
+    server_class = VMServer if arguments.shared_universe else ForkingVMServer
+
+    if not arguments.shared_universe:
+        # bootstrapped heap won't be touched by collector, so forked children keep sharing its pages
+        gc.freeze()
+
+    if os.path.exists(arguments.socket_path):
+        os.unlink(arguments.socket_path)
+
+    with server_class(arguments.socket_path, universe, arguments.max_instructions, arguments.timeout) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(arguments.socket_path)
@@ -0,0 +1,214 @@
+"""
+Worker pool - runs many modules on several cores from single bootstrapped universe.
+
+Universe is bootstrapped once in parent process, frozen for garbage collector and inherited by forked workers
+copy-on-write, so workers neither pay bootstrap cost nor duplicate the heap.
+Parent assigns paths of module files to idle workers and workers run them one after another in their own copy of universe,
+so module sees changes made by modules previously run by the same worker.
+Modules are deserialized as they are read from their files. Worker that dies while running module (crash, OOM kill)
+has that module reported as failed, instead of leaving its caller waiting for response that never comes.
+"""
+
+import argparse
+import collections
+import gc
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+
+from source.vm_core.main import BOOTLOADER_MODULE_NAME, bootstrap_universe
+from source.vm_core.vm_server import run_module_stream
+
+
+def _failure_response(message):
+    return {"status": "failed", "message": message, "output": ""}
+
+
+def _worker_main(universe, connection, instruction_budget, timeout):
+    while True:
+        module_path = connection.recv()
+
+        # sentinel - no more jobs
+        if module_path is None:
+            return
+
+        try:
+            with open(module_path, "rb") as module_file_obj:
+                response = run_module_stream(universe, module_file_obj, instruction_budget, timeout)
+        except OSError as e:
+            response = _failure_response("Can't read module: {}".format(str(e)))
+
+        connection.send(response)
+
+
+class _Worker:
+    __slots__ = ("process", "connection", "module_path")
+
+    def __init__(self, process, connection):
+        self.process = process
+
+        # parent end of pipe - paths are sent to worker through it, responses come back
+        self.connection = connection
+
+        # path of module worker is running, None if worker is idle
+        self.module_path = None
+
+
+class WorkerPool:
+    """
+    Pool of forked workers running modules in copies of universe
+    """
+
+    def __init__(self, universe, worker_count, instruction_budget=None, timeout=None):
+        context = multiprocessing.get_context("fork")
+
+        # paths of submitted modules not assigned to any worker yet
+        self._queued_paths = collections.deque()
+        self._pending_job_count = 0
+
+        # objects existing before fork are never touched by collector, so their pages stay shared with workers
+        gc.freeze()
+
+        self._workers = []
+        child_connections = []
+
+        for _ in range(worker_count):
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(universe, child_connection, instruction_budget, timeout),
+                daemon=True
+            )
+
+            self._workers.append(_Worker(process, parent_connection))
+            child_connections.append(child_connection)
+
+        for worker in self._workers:
+            worker.process.start()
+
+        # workers were forked with frozen heap, parent itself can collect as usual
+        gc.unfreeze()
+
+        for child_connection in child_connections:
+            child_connection.close()
+
+    def _dispatch_jobs(self):
+        """Assigns queued modules to idle workers that are still alive"""
+        for worker in self._workers:
+            if len(self._queued_paths) == 0:
+                return
+
+            if worker.module_path is not None or not worker.process.is_alive():
+                continue
+
+            worker.module_path = self._queued_paths.popleft()
+
+            try:
+                worker.connection.send(worker.module_path)
+            except OSError:
+                # worker has just died - its module is reported once its exit is noticed
+                pass
+
+    def submit(self, module_path):
+        self._queued_paths.append(module_path)
+        self._pending_job_count += 1
+
+        self._dispatch_jobs()
+
+    def get_pending_job_count(self):
+        return self._pending_job_count
+
+    def _finish_job(self, worker, response):
+        module_path = worker.module_path
+
+        worker.module_path = None
+        self._pending_job_count -= 1
+        self._dispatch_jobs()
+
+        return module_path, response
+
+    def get_result(self):
+        """
+        Waits for any submitted module to finish, or for worker running it to die
+
+        :return: (module path, response as dict)
+        """
+        while True:
+            busy_workers = [worker for worker in self._workers if worker.module_path is not None]
+
+            if len(busy_workers) == 0:
+                # all workers are gone, queued modules will never run
+                self._pending_job_count -= 1
+                return self._queued_paths.popleft(), _failure_response("No worker left to run module")
+
+            # sentinel of process becomes ready when process exits
+            multiprocessing.connection.wait(
+                [worker.connection for worker in busy_workers] + [worker.process.sentinel for worker in busy_workers]
+            )
+
+            for worker in busy_workers:
+                if worker.connection.poll():
+                    try:
+                        return self._finish_job(worker, worker.connection.recv())
+                    except (EOFError, OSError):
+                        # worker died in the middle of response
+                        pass
+
+                if not worker.process.is_alive():
+                    return self._finish_job(
+                        worker, _failure_response("Worker exited with code {} while running module".format(worker.process.exitcode))
+                    )
+
+    def close(self):
+        """Lets workers finish modules they are running and waits for them to exit - results should be collected before"""
+        for worker in self._workers:
+            try:
+                worker.connection.send(None)
+            except OSError:
+                pass
+
+        for worker in self._workers:
+            worker.process.join()
+            worker.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def run_modules(universe, module_paths, worker_count, instruction_budget=None, timeout=None):
+    """
+    Runs modules in parallel
+
+    :return: generator of (module path, response) in order of completion
+    """
+    with WorkerPool(universe, worker_count, instruction_budget, timeout) as pool:
+        for module_path in module_paths:
+            pool.submit(module_path)
+
+        while pool.get_pending_job_count() > 0:
+            yield pool.get_result()
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Runs bytecode modules in parallel, in forked copies of bootstrapped universe.")
+    parser.add_argument("module_files", nargs="+", help="names of bytecode files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--bootloader", default=BOOTLOADER_MODULE_NAME, help="name of bootloader file")
+    parser.add_argument("--max-instructions", type=int, default=None, help="instruction budget of each module")
+    parser.add_argument("--timeout", type=float, default=None, help="time limit of each module, in seconds")
+
+    return parser.parse_args(arguments)
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments(sys.argv[1:])
+
+    universe = bootstrap_universe(arguments.bootloader)
+
+    for module_path, response in run_modules(universe, arguments.module_files, arguments.workers, arguments.max_instructions, arguments.timeout):
+        print(json.dumps(dict(response, module=module_path)))
@@ -1,6 +1,15 @@
 from tests.test_interpreter import *
 from tests.test_object_layout import *
 from tests.test_bytecode_parsing import *
+from tests.test_jit_compiler import *
+from tests.test_primitives import *
+from tests.test_heap_statistics import *
+from tests.test_heap_snapshot import *
+from tests.test_vm_server import *
+from tests.test_vm_worker_pool import *
+from tests.test_sampling_profiler import *
+from tests.test_method_profiler import *
+from tests.test_module_compiler import *
 
 import unittest
 
@@ -1,8 +1,12 @@
+import io
+import lzma
 import unittest
+import zlib
 
-from source.vm_core.bytecode_parsing import BytecodeDeserializer, DeserializationError
-from source.vm_core.bytecodes import LiteralTags
-from source.vm_core.object_kinds import VM_ByteArray, VM_Symbol, VM_SmallInteger, VM_ObjectArray
+from source.vm_core import bytecode_parsing
+from source.vm_core.bytecode_parsing import BytecodeDeserializer, DeserializationError, deserialize_module, deserialize_module_stream, compress_module
+from source.vm_core.bytecodes import CORRECT_MODULE_SIGNATURE, LiteralTags, ModuleFormatTags, Opcodes
+from source.vm_core.object_kinds import VM_ByteArray, VM_Symbol, VM_SmallInteger, VM_ObjectArray, VM_Code
 
 
 class UniverseMockup:
@@ -21,6 +25,9 @@ class UniverseMockup:
     def new_small_integer(self, value):
         return VM_SmallInteger(value)
 
+    def new_code(self, stack_usage, literals, bytecode):
+        return VM_Code(stack_usage, literals, bytecode)
+
 
 class BytearrayParsingTestCase(unittest.TestCase):
     def test_bytearray_correct(self):
@@ -238,5 +245,232 @@ class ObjectArrayParsing(unittest.TestCase):
 
 
 
+class CodeParsingTestCase(unittest.TestCase):
+    @staticmethod
+    def _make_code_bytes(bytecode_content):
+        return (
+            [LiteralTags.VM_CODE] + list((1).to_bytes(8, byteorder="big", signed=True))
+            + [LiteralTags.VM_OBJECT_ARRAY] + list((0).to_bytes(8, byteorder="big", signed=True))
+            + [LiteralTags.VM_BYTE_ARRAY] + list(len(bytecode_content).to_bytes(8, byteorder="big", signed=True)) + bytecode_content
+        )
+
+    def test_code_correct_jumps(self):
+        byte_list = self._make_code_bytes([Opcodes.JUMP_FORWARD, 0x01, Opcodes.NOOP, 0x00, Opcodes.JUMP_BACKWARD, 0x03])
+
+        deserializer = BytecodeDeserializer(universe=UniverseMockup(), byte_list=byte_list)
+        result = deserializer.parse_code()
+
+        self.assertTrue(
+            isinstance(result, VM_Code) and result.get_instruction_count() == 3,
+            "Code parsing with jumps inside of code must return VM_Code"
+        )
+
+    def test_code_jump_outside(self):
+        byte_list = self._make_code_bytes([Opcodes.NOOP, 0x00, Opcodes.JUMP_FORWARD, 0x01])
+
+        deserializer = BytecodeDeserializer(universe=UniverseMockup(), byte_list=byte_list)
+
+        with self.assertRaises(DeserializationError, msg="Using code parsing, having jump that leads outside of code must fail"):
+            result = deserializer.parse_code()
+
+    def test_code_quickened_send(self):
+        for opcode in Opcodes.QUICKENED_SEND_OPCODES:
+            byte_list = self._make_code_bytes([opcode, 0x00])
+
+            deserializer = BytecodeDeserializer(universe=UniverseMockup(), byte_list=byte_list)
+
+            with self.assertRaises(DeserializationError, msg="Using code parsing, having quickened send must fail"):
+                result = deserializer.parse_code()
+
+
+def _int64_bytes(value):
+    return list(value.to_bytes(8, byteorder="big", signed=True))
+
+
+class SymbolPoolParsingTestCase(unittest.TestCase):
+    @staticmethod
+    def _make_module_bytes(literal_bytes, literal_count, pool_texts):
+        symbol_pool_bytes = [ModuleFormatTags.SYMBOL_POOL] + _int64_bytes(len(pool_texts))
+        for text in pool_texts:
+            symbol_pool_bytes += _int64_bytes(0) + _int64_bytes(len(text)) + [ord(ch) for ch in text]
+
+        return (
+            CORRECT_MODULE_SIGNATURE + symbol_pool_bytes
+            + [LiteralTags.VM_CODE] + _int64_bytes(1)
+            + [LiteralTags.VM_OBJECT_ARRAY] + _int64_bytes(literal_count) + literal_bytes
+            + [LiteralTags.VM_BYTE_ARRAY] + _int64_bytes(0)
+        )
+
+    def test_symbol_references(self):
+        literal_bytes = (
+            [LiteralTags.VM_SYMBOL_REFERENCE] + _int64_bytes(1)
+            + [LiteralTags.VM_SYMBOL_REFERENCE] + _int64_bytes(0)
+            + [LiteralTags.VM_SYMBOL_REFERENCE] + _int64_bytes(1)
+            + [LiteralTags.VM_SYMBOL] + _int64_bytes(0) + _int64_bytes(1) + [ord("c")]
+        )
+
+        code = deserialize_module(UniverseMockup(), self._make_module_bytes(literal_bytes, 4, ["first", "second"]))
+        literals = code.get_literals()
+
+        self.assertTrue(
+            [literals.item_get_at(index).get_text() for index in range(4)] == ["second", "first", "second", "c"],
+            "Symbol references must be resolved to symbols of pool by their index, inline symbols must still be allowed"
+        )
+
+        self.assertTrue(
+            literals.item_get_at(0) is literals.item_get_at(2),
+            "Every symbol of pool must be created only once, no matter how many times it is referenced"
+        )
+
+    def test_symbol_reference_outside_pool(self):
+        literal_bytes = [LiteralTags.VM_SYMBOL_REFERENCE] + _int64_bytes(1)
+
+        with self.assertRaises(DeserializationError, msg="Symbol reference outside of symbol pool must fail"):
+            deserialize_module(UniverseMockup(), self._make_module_bytes(literal_bytes, 1, ["only"]))
+
+    def test_module_without_pool(self):
+        module_bytes = CORRECT_MODULE_SIGNATURE + CodeParsingTestCase._make_code_bytes([Opcodes.NOOP, 0x00])
+
+        self.assertTrue(
+            isinstance(deserialize_module(UniverseMockup(), module_bytes), VM_Code),
+            "Modules in original format, without symbol pool, must still load"
+        )
+
+
+class StreamParsingTestCase(unittest.TestCase):
+    def test_bounded_read_ahead(self):
+        stream = io.BytesIO(bytes(
+            [LiteralTags.VM_SMALL_INTEGER] + _int64_bytes(42)
+            + [LiteralTags.VM_BYTE_ARRAY] + _int64_bytes(100000) + [0x07] * 100000
+        ))
+
+        deserializer = BytecodeDeserializer(universe=UniverseMockup(), stream=stream)
+        result = deserializer.parse_small_integer()
+
+        self.assertTrue(
+            result.get_value() == 42 and stream.tell() <= bytecode_parsing.READ_AHEAD_SIZE,
+            "Deserializer must read stream only as far as its read-ahead window reaches"
+        )
+
+        result = deserializer.parse_bytearray()
+
+        self.assertTrue(
+            result.get_byte_count() == 100000 and result.byte_get_at(99999) == 0x07,
+            "Items bigger than read-ahead window must be read whole"
+        )
+
+    def test_oversized_length(self):
+        oversized_length = 2 ** 40
+        literal_variants = (
+            [LiteralTags.VM_BYTE_ARRAY] + _int64_bytes(oversized_length) + [0x00] * 16,
+            [LiteralTags.VM_SYMBOL] + _int64_bytes(0) + _int64_bytes(oversized_length) + [ord("a")] * 16,
+        )
+
+        for literal_bytes in literal_variants:
+            module_bytes = bytes(
+                CORRECT_MODULE_SIGNATURE
+                + [LiteralTags.VM_CODE] + _int64_bytes(1)
+                + [LiteralTags.VM_OBJECT_ARRAY] + _int64_bytes(1) + literal_bytes
+            )
+
+            for module_variant in (module_bytes, compress_module(module_bytes, ModuleFormatTags.ZLIB_COMPRESSED)):
+                with self.assertRaises(DeserializationError, msg="Size field bigger than rest of module must fail, not allocate declared size"):
+                    deserialize_module_stream(UniverseMockup(), io.BytesIO(module_variant))
+
+    def test_module_file(self):
+        module_bytes = CORRECT_MODULE_SIGNATURE + CodeParsingTestCase._make_code_bytes([Opcodes.NOOP, 0x00])
+
+        with self.assertRaises(DeserializationError, msg="Stream ending in middle of module must fail"):
+            deserialize_module_stream(UniverseMockup(), io.BufferedReader(io.BytesIO(bytes(module_bytes[:-1]))))
+
+        self.assertTrue(
+            isinstance(deserialize_module_stream(UniverseMockup(), io.BufferedReader(io.BytesIO(bytes(module_bytes)))), VM_Code),
+            "Module must be deserializable from buffered binary stream"
+        )
+
+
+class CompressedModuleTestCase(unittest.TestCase):
+    def setUp(self):
+        # many literals, so that compressed module spans several chunks
+        literal_bytes = []
+        for index in range(5000):
+            literal_bytes += [LiteralTags.VM_SMALL_INTEGER] + _int64_bytes(index)
+
+        self.module_bytes = bytes(
+            CORRECT_MODULE_SIGNATURE
+            + [LiteralTags.VM_CODE] + _int64_bytes(1)
+            + [LiteralTags.VM_OBJECT_ARRAY] + _int64_bytes(5000) + literal_bytes
+            + [LiteralTags.VM_BYTE_ARRAY] + _int64_bytes(2) + [Opcodes.NOOP, 0x00]
+        )
+
+    def _check_code(self, code):
+        literals = code.get_literals()
+
+        return (
+            isinstance(code, VM_Code)
+            and literals.get_item_count() == 5000
+            and all(literals.item_get_at(index).get_value() == index for index in range(5000))
+        )
+
+    def test_compressed_modules(self):
+        original_chunk_size = bytecode_parsing.COMPRESSED_CHUNK_SIZE
+        bytecode_parsing.COMPRESSED_CHUNK_SIZE = 256
+
+        try:
+            for format_tag in (ModuleFormatTags.ZLIB_COMPRESSED, ModuleFormatTags.LZMA_COMPRESSED):
+                compressed_bytes = compress_module(self.module_bytes, format_tag)
+
+                self.assertTrue(
+                    len(compressed_bytes) < len(self.module_bytes),
+                    "Compressed module must be smaller than original one"
+                )
+
+                self.assertTrue(
+                    self._check_code(deserialize_module(UniverseMockup(), list(compressed_bytes))),
+                    "Compressed module must deserialize into the same code as original one"
+                )
+        finally:
+            bytecode_parsing.COMPRESSED_CHUNK_SIZE = original_chunk_size
+
+    def test_decompression_bounded(self):
+        # zeros compress about thousand times, so single compressed chunk holds megabytes
+        payload = bytes(16 * 1024 * 1024)
+
+        for decompressor, compressed_bytes in (
+            (zlib.decompressobj(), zlib.compress(payload)),
+            (lzma.LZMADecompressor(), lzma.compress(payload)),
+        ):
+            reader = bytecode_parsing._DecompressingReader(decompressor, io.BytesIO(compressed_bytes))
+            buffer = bytearray(bytecode_parsing.READ_AHEAD_SIZE)
+
+            decompressed_count = 0
+            largest_pending_count = 0
+
+            while True:
+                count = reader.readinto(buffer)
+                largest_pending_count = max(largest_pending_count, len(reader._pending))
+
+                if count == 0:
+                    break
+
+                decompressed_count += count
+
+            self.assertTrue(
+                largest_pending_count <= bytecode_parsing.READ_AHEAD_SIZE,
+                "Decompressed bytes waiting to be read must be bounded by size of read, not by compression ratio"
+            )
+
+            self.assertTrue(
+                decompressed_count == len(payload),
+                "When decompression is bounded, all decompressed bytes must still be read"
+            )
+
+    def test_truncated_module(self):
+        compressed_bytes = compress_module(self.module_bytes, ModuleFormatTags.ZLIB_COMPRESSED)
+
+        with self.assertRaises(DeserializationError, msg="Truncated compressed module must fail"):
+            deserialize_module(UniverseMockup(), list(compressed_bytes[:len(compressed_bytes) // 2]))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
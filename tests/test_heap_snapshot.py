@@ -0,0 +1,101 @@
+import io
+import unittest
+
+from source.vm_core.heap_snapshot import HeapSnapshotError, read_heap_snapshot, write_heap_snapshot
+from source.vm_core.heap_snapshot_analysis import HeapSnapshotAnalysis, analyze_heap_snapshot
+from source.vm_core.object_layout import VM_Object, SlotKind
+from source.vm_core.universe import Universe
+
+
+def _make_record(object_id, size, references):
+    return {
+        "id": object_id,
+        "kind": "VM_Object",
+        "size": size,
+        "slots": [["slot{}".format(reference), reference] for reference in references],
+        "references": references,
+    }
+
+
+class HeapSnapshotTestCase(unittest.TestCase):
+    def test_snapshot_round_trip(self):
+        universe = Universe()
+        universe.init_clean_universe()
+
+        snapshot_file = io.StringIO()
+        object_count = universe.write_heap_snapshot(snapshot_file)
+
+        snapshot_file.seek(0)
+        root_ids, records = read_heap_snapshot(snapshot_file)
+
+        self.assertTrue(
+            object_count == len(records) == universe.get_heap_statistics().get_total_object_count(),
+            "Heap snapshot must contain every object reachable from lobby exactly once"
+        )
+
+        self.assertTrue(
+            all(reference in records for record in records.values() for reference in record["references"]),
+            "Every reference in heap snapshot must point to object present in the snapshot"
+        )
+
+        self.assertTrue(
+            records[root_ids[0]]["slots"] != [] and all(isinstance(name, str) for name, _ in records[root_ids[0]]["slots"]),
+            "Heap snapshot must record slot names of objects"
+        )
+
+    def test_snapshot_rejects_unrelated_file(self):
+        with self.assertRaises(HeapSnapshotError):
+            read_heap_snapshot(io.StringIO('{"some": "json"}\n'))
+
+
+class HeapSnapshotAnalysisTestCase(unittest.TestCase):
+    def test_retained_sizes(self):
+        # root -> 1 -> 3 ; root -> 2 -> 3 ; 1 -> 4
+        records = {
+            0: _make_record(0, 10, [1, 2]),
+            1: _make_record(1, 20, [3, 4]),
+            2: _make_record(2, 30, [3]),
+            3: _make_record(3, 40, []),
+            4: _make_record(4, 50, []),
+        }
+
+        analysis = HeapSnapshotAnalysis([0], records)
+
+        self.assertTrue(
+            analysis.get_immediate_dominator(3) == 0,
+            "Object reachable through several paths must be dominated by their common ancestor"
+        )
+
+        self.assertTrue(
+            analysis.get_retained_size(1) == 20 + 50 and analysis.get_retained_size(0) == 150,
+            "Retained size must contain only sizes of dominated objects"
+        )
+
+        self.assertTrue(
+            analysis.get_dominator_path(4) == [0, 1, 4] and analysis.format_dominator_path(4).endswith("slot1 -> slot4"),
+            "Dominator path must lead from root through dominators and name slots along the way"
+        )
+
+    def test_analysis_of_written_snapshot(self):
+        root_object = VM_Object()
+        holder_object = VM_Object()
+        big_object = VM_Object()
+
+        root_object.add_slot("holder", SlotKind.NORMAL, holder_object)
+        holder_object.add_slot("big", SlotKind.NORMAL, big_object)
+        big_object.add_slot("self", SlotKind.NORMAL, big_object)
+
+        snapshot_file = io.StringIO()
+        write_heap_snapshot(snapshot_file, [root_object])
+        snapshot_file.seek(0)
+
+        analysis = analyze_heap_snapshot(snapshot_file)
+
+        self.assertTrue(
+            analysis.get_largest_retainers(1) == [0] and analysis.format_dominator_path(2).endswith("holder -> big"),
+            "Analysis of written snapshot must find root as biggest retainer and name slots on dominator path"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
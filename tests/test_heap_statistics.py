@@ -0,0 +1,80 @@
+import unittest
+
+from source.vm_core.heap_statistics import collect_heap_statistics, walk_heap
+from source.vm_core.object_layout import VM_Object, SlotKind
+from source.vm_core.universe import Universe
+
+
+class HeapWalkTestCase(unittest.TestCase):
+    def test_walk_cycle(self):
+        first_object = VM_Object()
+        second_object = VM_Object()
+
+        first_object.add_slot("next", SlotKind.NORMAL, second_object)
+        second_object.add_slot("next", SlotKind.NORMAL, first_object)
+
+        visited_objects = list(walk_heap([first_object]))
+
+        self.assertTrue(
+            len(visited_objects) == 2 and first_object in visited_objects and second_object in visited_objects,
+            "Heap walk must visit each reachable object exactly once, even if objects form cycle"
+        )
+
+
+class HeapStatisticsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.universe = Universe()
+        self.universe.init_clean_universe()
+
+    def test_census_counts_reachable_objects(self):
+        statistics_before = self.universe.get_heap_statistics()
+
+        byte_array = self.universe.new_byte_array(10000)
+        self.universe.get_lobby_object().add_slot(self.universe.new_symbol("data", 0), SlotKind.NORMAL, byte_array)
+
+        statistics_after = self.universe.get_heap_statistics()
+
+        self.assertTrue(
+            statistics_after.get_object_counts().get("VM_ByteArray", 0) == statistics_before.get_object_counts().get("VM_ByteArray", 0) + 1,
+            "Heap census must count objects reachable from lobby"
+        )
+
+        self.assertTrue(
+            statistics_after.get_largest_objects()[0][1] == "VM_ByteArray",
+            "Heap census must report biggest reachable object first"
+        )
+
+    def test_census_ignores_unreachable_objects(self):
+        statistics_before = self.universe.get_heap_statistics()
+
+        unreachable_object = self.universe.new_byte_array(1000)
+
+        statistics_after = self.universe.get_heap_statistics()
+        statistics_with_root = self.universe.get_heap_statistics(extra_roots=[unreachable_object])
+
+        self.assertTrue(
+            statistics_after.get_total_object_count() == statistics_before.get_total_object_count(),
+            "Heap census must not count objects unreachable from roots"
+        )
+
+        self.assertTrue(
+            statistics_with_root.get_total_object_count() > statistics_before.get_total_object_count(),
+            "Heap census must count objects reachable from extra roots"
+        )
+
+    def test_census_symbols(self):
+        statistics = collect_heap_statistics([
+            self.universe.new_object_array_from_list([
+                self.universe.new_symbol("same", 0),
+                self.universe.new_symbol("same", 0),
+            ])
+        ])
+
+        self.assertTrue(
+            statistics.get_symbol_count() > statistics.get_distinct_symbol_count(),
+            "Heap census must distinguish between symbol objects and distinct symbols"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
 from source.vm_core import object_kinds
-from source.vm_core.interpreter import Interpreter
+from source.vm_core import object_layout
+from source.vm_core import interpreter as interpreter_module
+from source.vm_core.interpreter import Interpreter, Tracer
 from source.vm_core.bytecodes import Opcodes
 
 from collections import namedtuple
+import time
 import unittest
 
 from source.vm_core.object_kinds import VM_ByteArray, VM_ObjectArray
@@ -10,14 +13,32 @@ from source.vm_core.object_layout import SlotKind
 
 SetupResult = namedtuple("SetupResult", ("literals", "bytecode", "stack", "frame"))
 
+TRUE_OBJECT_MOCKUP = object_kinds.VM_Object()
+FALSE_OBJECT_MOCKUP = object_kinds.VM_Object()
+
 
 class UniverseMockup:
     def get_none_object(self):
         return None
 
+    def get_true_object(self):
+        return TRUE_OBJECT_MOCKUP
+
+    def get_false_object(self):
+        return FALSE_OBJECT_MOCKUP
+
     def new_symbol(self, name, arity):
         return object_kinds.VM_Symbol(name, arity)
 
+    def get_unknown_selector_symbol(self):
+        return self.new_symbol("unknownSelector", 2)
+
+    def get_ambitious_selector_symbol(self):
+        return self.new_symbol("ambitiousSelector", 2)
+
+    def get_error_symbol(self, error_name):
+        return self.new_symbol(error_name, 0)
+
     def new_error_object(self, error_symbol):
         new_error = object_kinds.VM_Object()
 
@@ -26,6 +47,12 @@ class UniverseMockup:
         return new_error
 
 
+    def new_object_array_from_list(self, items):
+        object_array = VM_ObjectArray(len(items), self.get_none_object())
+        object_array.items_put_at(0, items)
+
+        return object_array
+
     def new_frame_with_stack_size(self, stack_size, method_activation):
         stack = object_kinds.VM_ObjectArray(stack_size, self.get_none_object())
         frame = object_kinds.VM_Frame(self.get_none_object(), stack, method_activation)
@@ -270,7 +297,7 @@ class InstructionSendTestCase(unittest.TestCase):
         setup = _setup_process(
             literals_content=[slot_name],
             stack_content=[receiver],
-            bytecode_content=[Opcodes.SEND, 0x00],
+            bytecode_content=[Opcodes.SEND, 0x00, Opcodes.PULL, 0x00],
             none_object=None
         )
 
@@ -313,7 +340,7 @@ class InstructionSendTestCase(unittest.TestCase):
         setup = _setup_process(
             literals_content=[slot_name],
             stack_content=[receiver, argument1, argument2],
-            bytecode_content=[Opcodes.SEND, 0x00],
+            bytecode_content=[Opcodes.SEND, 0x00, Opcodes.PULL, 0x00],
             none_object=None
         )
 
@@ -379,5 +406,486 @@ class InstructionSendTestCase(unittest.TestCase):
         )
 
 
+class InstructionSendFailureTestCase(unittest.TestCase):
+    def _setup_failing_send(self, receiver, slot_name):
+        unknown_handler = object_kinds.VM_Object()
+        ambitious_handler = object_kinds.VM_Object()
+
+        receiver.add_slot(object_kinds.VM_Symbol("unknownSelector", 2), SlotKind(), unknown_handler)
+        receiver.add_slot(object_kinds.VM_Symbol("ambitiousSelector", 2), SlotKind(), ambitious_handler)
+
+        setup = _setup_process(
+            literals_content=[slot_name],
+            stack_content=[receiver],
+            bytecode_content=[Opcodes.SEND, 0x00],
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        Interpreter(UniverseMockup(), process).execute_instruction()
+
+        return setup.stack.item_get_at(0), unknown_handler, ambitious_handler
+
+    def test_send_unknown_selector(self):
+        receiver = object_kinds.VM_Object()
+        receiver.add_slot("parent", SlotKind.PARENT, object_kinds.VM_Object())
+
+        result, unknown_handler, _ = self._setup_failing_send(receiver, object_kinds.VM_Symbol("missing", 0))
+
+        self.assertTrue(
+            result is unknown_handler,
+            "When send doesn't find slot, it must be redirected to 'unknownSelector' handler"
+        )
+
+    def test_send_ambitious_selector(self):
+        slot_name = object_kinds.VM_Symbol("shared", 0)
+
+        first_parent = object_kinds.VM_Object()
+        second_parent = object_kinds.VM_Object()
+        first_parent.add_slot(slot_name, SlotKind(), object_kinds.VM_Object())
+        second_parent.add_slot(slot_name, SlotKind(), object_kinds.VM_Object())
+
+        receiver = object_kinds.VM_Object()
+        receiver.add_slot("parent1", SlotKind.PARENT, first_parent)
+        receiver.add_slot("parent2", SlotKind.PARENT, second_parent)
+
+        result, _, ambitious_handler = self._setup_failing_send(receiver, slot_name)
+
+        self.assertTrue(
+            result is ambitious_handler,
+            "When send finds slot in several parents, it must be redirected to 'ambitiousSelector' handler"
+        )
+
+
+class InstructionSendQuickeningTestCase(unittest.TestCase):
+    def test_send_quickened_to_data(self):
+        slot_content = object_kinds.VM_Object()
+        receiver = object_kinds.VM_Object()
+        slot_name = object_kinds.VM_Symbol("send_target", 0)
+        receiver.add_slot(slot_name, SlotKind(), slot_content)
+
+        setup = _setup_process(
+            literals_content=[slot_name],
+            stack_content=[receiver],
+            bytecode_content=[Opcodes.SEND, 0x00],
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        interpreter.execute_instruction()
+
+        self.assertTrue(
+            setup.bytecode.byte_get_at(0) == Opcodes.SEND_DATA,
+            "When send opcode evaluates ordinary object, the instruction must be rewritten into send_data opcode."
+        )
+
+        self.assertTrue(
+            setup.stack.item_get_at(0) is slot_content,
+            "When send opcode is quickened, the send itself must still be evaluated."
+        )
+
+    def test_send_quickened_to_primitive(self):
+        primitive_result = object_kinds.VM_SmallInteger(42)
+        primitive = object_kinds.VM_PrimitiveMethod(0, lambda interpreter, parameters: primitive_result)
+
+        receiver = object_kinds.VM_Object()
+        slot_name = object_kinds.VM_Symbol("send_target", 0)
+        receiver.add_slot(slot_name, SlotKind(), primitive)
+
+        setup = _setup_process(
+            literals_content=[slot_name],
+            stack_content=[receiver],
+            bytecode_content=[Opcodes.SEND, 0x00],
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        interpreter.execute_instruction()
+
+        self.assertTrue(
+            setup.bytecode.byte_get_at(0) == Opcodes.SEND_PRIMITIVE and setup.stack.item_get_at(0) is primitive_result,
+            "When send opcode evaluates primitive method, the instruction must be rewritten into send_primitive opcode."
+        )
+
+    def test_send_quickened_guard_mismatch(self):
+        slot_content = object_kinds.VM_Object()
+        receiver = object_kinds.VM_Object()
+        slot_name = object_kinds.VM_Symbol("send_target", 0)
+        receiver.add_slot(slot_name, SlotKind(), slot_content)
+
+        # instruction was quickened for primitive, but slot now contains ordinary object
+        setup = _setup_process(
+            literals_content=[slot_name],
+            stack_content=[receiver],
+            bytecode_content=[Opcodes.SEND_PRIMITIVE, 0x00],
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        interpreter.execute_instruction()
+
+        self.assertTrue(
+            setup.stack.item_get_at(0) is slot_content,
+            "When quickened send finds slot content of different kind, it must fall back to generic evaluation."
+        )
+
+        self.assertTrue(
+            setup.bytecode.byte_get_at(0) == Opcodes.SEND_DATA,
+            "When quickened send finds slot content of different kind, the instruction must be quickened again."
+        )
+
+    def test_quickened_send_memoized_lookup(self):
+        slot_name = object_kinds.VM_Symbol("send_target", 0)
+        parent_name = object_kinds.VM_Symbol("parent", 0)
+
+        grandparent = object_kinds.VM_Object()
+        grandparent.add_slot(slot_name, SlotKind(), object_kinds.VM_SmallInteger(1))
+
+        parent = object_kinds.VM_Object()
+        parent.add_slot(parent_name, SlotKind.PARENT, grandparent)
+
+        receiver = object_kinds.VM_Object()
+        receiver.add_slot(parent_name, SlotKind.PARENT, parent)
+
+        setup = _setup_process(
+            literals_content=[slot_name],
+            stack_content=[receiver],
+            bytecode_content=[Opcodes.SEND_DATA, 0x00],
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        interpreter.execute_instruction()
+
+        self.assertTrue(
+            (slot_name, id(parent)) in object_layout._cached_lookups and setup.stack.item_get_at(0).get_value() == 1,
+            "Quickened send must memoize its lookup in parents of receiver"
+        )
+
+        # slot added to searched object shadows memoized holder
+        shadowing_content = object_kinds.VM_SmallInteger(2)
+        parent.add_slot(slot_name, SlotKind(), shadowing_content)
+
+        setup.frame.pull_item(None)
+        setup.frame.push_item(receiver)
+        setup.frame.set_instruction_index(0)
+        interpreter.execute_instruction()
+
+        self.assertTrue(
+            setup.stack.item_get_at(0) is shadowing_content,
+            "When object searched by memoized lookup changes its slots, quickened send must find slot again"
+        )
+
+
+class InstructionJumpTestCase(unittest.TestCase):
+    def test_jump_forward(self):
+        setup = _setup_process(
+            literals_content=[],
+            stack_content=[None],
+            bytecode_content=[Opcodes.JUMP_FORWARD, 0x01, Opcodes.NOOP, 0x00, Opcodes.NOOP, 0x00],
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        interpreter.execute_instruction()
+
+        self.assertTrue(
+            setup.frame.get_instruction_index() == 2,
+            "When jump_forward opcode is executed, the instruction index must move by distance counted from next instruction."
+        )
+
+    def test_jump_backward(self):
+        setup = _setup_process(
+            literals_content=[],
+            stack_content=[None],
+            bytecode_content=[Opcodes.NOOP, 0x00, Opcodes.JUMP_BACKWARD, 0x02],
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        interpreter.execute_instruction()
+        interpreter.execute_instruction()
+
+        self.assertTrue(
+            setup.frame.get_instruction_index() == 0,
+            "When jump_backward opcode is executed, the instruction index must move back by distance counted from next instruction."
+        )
+
+    def test_jump_out_of_bounds(self):
+        setup = _setup_process(
+            literals_content=[],
+            stack_content=[None],
+            bytecode_content=[Opcodes.JUMP_BACKWARD, 0x02],
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        interpreter.execute_instruction()
+
+        self.assertTrue(
+            process.get_result().get_slot(object_kinds.VM_Symbol("name", 0)) == object_kinds.VM_Symbol("jumpOutOfBounds", 0),
+            "When jump leads outside of code, process must end with result being 'jumpOutOfBounds' object."
+        )
+
+    def test_conditional_jump(self):
+        for opcode, condition, expected_index in (
+            (Opcodes.JUMP_FORWARD_IF_TRUE, TRUE_OBJECT_MOCKUP, 2),
+            (Opcodes.JUMP_FORWARD_IF_TRUE, FALSE_OBJECT_MOCKUP, 1),
+            (Opcodes.JUMP_FORWARD_IF_FALSE, FALSE_OBJECT_MOCKUP, 2),
+            (Opcodes.JUMP_FORWARD_IF_FALSE, TRUE_OBJECT_MOCKUP, 1),
+        ):
+            setup = _setup_process(
+                literals_content=[],
+                stack_content=[condition],
+                bytecode_content=[opcode, 0x01, Opcodes.NOOP, 0x00, Opcodes.NOOP, 0x00],
+                none_object=None
+            )
+
+            process = object_kinds.VM_Process(None, setup.frame)
+            interpreter = Interpreter(UniverseMockup(), process)
+            interpreter.execute_instruction()
+
+            self.assertTrue(
+                setup.frame.get_instruction_index() == expected_index and setup.frame.is_stack_empty(),
+                "When conditional jump is executed, it must pull condition and jump only if condition matches."
+            )
+
+    def test_conditional_jump_non_boolean(self):
+        setup = _setup_process(
+            literals_content=[],
+            stack_content=[object_kinds.VM_Object()],
+            bytecode_content=[Opcodes.JUMP_FORWARD_IF_TRUE, 0x00],
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        interpreter.execute_instruction()
+
+        self.assertTrue(
+            process.get_result().get_slot(object_kinds.VM_Symbol("name", 0)) == object_kinds.VM_Symbol("nonBooleanCondition", 0),
+            "When conditional jump pulls object that is neither true nor false, process must end with result being 'nonBooleanCondition' object."
+        )
+
+
+class InstructionTailSendTestCase(unittest.TestCase):
+    def _setup_tail_send(self, caller_bytecode):
+        method = object_kinds.VM_Object()
+        code = object_kinds.VM_Code(2, object_kinds.VM_ObjectArray(2, None), object_kinds.VM_ByteArray(2))
+        method.set_code(code)
+
+        receiver = object_kinds.VM_Object()
+        slot_name = object_kinds.VM_Symbol("send_target", 0)
+        receiver.add_slot(slot_name, SlotKind(), method)
+
+        setup_for_root_frame = _setup_process(
+            literals_content=[],
+            stack_content=[None],
+            bytecode_content=[],
+            none_object=None
+        )
+
+        setup_for_caller_frame = _setup_process(
+            literals_content=[slot_name],
+            stack_content=[receiver],
+            bytecode_content=caller_bytecode,
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup_for_root_frame.frame)
+        process.push_frame(setup_for_caller_frame.frame)
+
+        interpreter = Interpreter(UniverseMockup(), process)
+        interpreter.execute_instruction()
+
+        return process, setup_for_root_frame.frame, code
+
+    def test_send_followed_by_return(self):
+        process, root_frame, code = self._setup_tail_send([Opcodes.SEND, 0x00, Opcodes.RETURN_EXPLICIT, 0x00])
+
+        self.assertTrue(
+            process.peek_frame().get_code() is code and process.peek_frame().get_previous_frame() is root_frame,
+            "When send of method object is followed by return_explicit, the new frame must replace the frame in which instruction was executed."
+        )
+
+    def test_send_at_end_of_code(self):
+        process, root_frame, code = self._setup_tail_send([Opcodes.SEND, 0x00])
+
+        self.assertTrue(
+            process.peek_frame().get_code() is code and process.peek_frame().get_previous_frame() is root_frame,
+            "When send of method object is the last instruction, the new frame must replace the frame in which instruction was executed."
+        )
+
+
+class BoundedExecutionTestCase(unittest.TestCase):
+    def _setup_loop_process(self):
+        # jump backward to itself - loops forever
+        setup = _setup_process(
+            literals_content=[],
+            stack_content=[],
+            bytecode_content=[Opcodes.NOOP, 0x00, Opcodes.JUMP_BACKWARD, 0x02],
+            none_object=None
+        )
+
+        return object_kinds.VM_Process(None, setup.frame)
+
+    def test_instruction_budget(self):
+        process = self._setup_loop_process()
+        interpreter = Interpreter(UniverseMockup(), process)
+
+        status = interpreter.execute_all(instruction_budget=interpreter_module.BUDGET_CHECK_INTERVAL * 3 + 1)
+
+        self.assertTrue(
+            status == interpreter_module.ExecutionStatus.BudgetExhausted and not process.has_finished(None),
+            "When instruction budget runs out, execution must stop and report exhausted budget"
+        )
+
+        status = interpreter.execute_all(deadline=time.monotonic() + 0.05)
+
+        self.assertTrue(
+            status == interpreter_module.ExecutionStatus.DeadlineReached,
+            "When deadline passes, execution must stop and report reached deadline, even if code got compiled"
+        )
+
+    def test_resumed_execution_finishes(self):
+        setup = _setup_process(
+            literals_content=[],
+            stack_content=[],
+            bytecode_content=[Opcodes.NOOP, 0x00] * 5,
+            none_object=None
+        )
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+
+        first_status = interpreter.execute_all(instruction_budget=2)
+
+        self.assertTrue(
+            first_status == interpreter_module.ExecutionStatus.BudgetExhausted and setup.frame.get_instruction_index() == 2,
+            "Execution with budget must execute exactly budgeted number of instructions"
+        )
+
+        second_status = interpreter.execute_all(instruction_budget=100)
+
+        self.assertTrue(
+            second_status == interpreter_module.ExecutionStatus.Finished and process.has_finished(None),
+            "Stopped execution must be resumable up to end of process"
+        )
+
+
+class RecordingTracer(Tracer):
+    def __init__(self):
+        self.events = []
+
+    def on_instruction(self, interpreter, frame, opcode, parameter):
+        self.events.append(("instruction", opcode))
+
+    def on_send(self, interpreter, selector, receiver, holder):
+        self.events.append(("send", selector, receiver, holder))
+
+    def on_primitive_call(self, interpreter, primitive, receiver, arguments):
+        self.events.append(("primitive", primitive))
+
+    def on_frame_push(self, interpreter, frame):
+        self.events.append(("push", frame))
+
+    def on_frame_pop(self, interpreter, frame):
+        self.events.append(("pop", frame))
+
+    def on_process_finish(self, interpreter, process):
+        self.events.append(("finish", process))
+
+
+class TracerTestCase(unittest.TestCase):
+    def _setup_send_process(self, slot_content):
+        receiver = object_kinds.VM_Object()
+        selector = object_kinds.VM_Symbol("send_target", 0)
+        receiver.add_slot(selector, SlotKind(), slot_content)
+
+        setup = _setup_process(
+            literals_content=[selector, object_kinds.VM_Symbol("result", 0)],
+            stack_content=[receiver],
+            bytecode_content=[Opcodes.SEND, 0x00, Opcodes.PULL, 0x00, Opcodes.PUSH_LITERAL, 0x01],
+            none_object=None
+        )
+
+        return setup, receiver, selector
+
+    def test_tracer_method_send(self):
+        method = object_kinds.VM_Object()
+        method_literals = VM_ObjectArray(1, None)
+        method_literals.item_put_at(0, object_kinds.VM_Symbol("method_result", 0))
+        method_bytecode = VM_ByteArray(2)
+        method_bytecode.byte_put_at(0, Opcodes.PUSH_LITERAL)
+        method.set_code(object_kinds.VM_Code(1, method_literals, method_bytecode))
+
+        setup, receiver, selector = self._setup_send_process(method)
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        tracer = RecordingTracer()
+        interpreter.set_tracer(tracer)
+        interpreter.execute_all()
+
+        method_frame = [event[1] for event in tracer.events if event[0] == "push"]
+
+        self.assertTrue(
+            [event[0] for event in tracer.events] == [
+                "instruction", "send", "push",
+                "instruction", "pop",
+                "instruction", "instruction", "pop", "finish"
+            ],
+            "Tracer must be notified about instructions, sends, frame changes and process finish in order they happened"
+        )
+
+        self.assertTrue(
+            tracer.events[1] == ("send", selector, receiver, receiver),
+            "Tracer must be notified about selector, receiver and holder of found slot"
+        )
+
+        self.assertTrue(
+            tracer.events[4] == ("pop", method_frame[0]) and tracer.events[7] == ("pop", setup.frame),
+            "Tracer must be notified about returned frames"
+        )
+
+    def test_tracer_primitive_send(self):
+        primitive = object_kinds.VM_PrimitiveMethod(0, lambda interpreter, parameters: object_kinds.VM_Object())
+        setup, _, _ = self._setup_send_process(primitive)
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        tracer = RecordingTracer()
+        interpreter.set_tracer(tracer)
+        interpreter.execute_instruction()
+
+        self.assertTrue(
+            tracer.events[-1] == ("primitive", primitive),
+            "Tracer must be notified about call of primitive"
+        )
+
+    def test_tracer_detached(self):
+        primitive = object_kinds.VM_PrimitiveMethod(0, lambda interpreter, parameters: object_kinds.VM_Object())
+        setup, _, _ = self._setup_send_process(primitive)
+
+        process = object_kinds.VM_Process(None, setup.frame)
+        interpreter = Interpreter(UniverseMockup(), process)
+        tracer = RecordingTracer()
+        interpreter.set_tracer(tracer)
+        interpreter.set_tracer(None)
+        interpreter.execute_all()
+
+        self.assertTrue(
+            tracer.events == [] and process.has_finished(None),
+            "Detached tracer must not be notified about anything"
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
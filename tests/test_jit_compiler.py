@@ -0,0 +1,293 @@
+from source.vm_core import object_kinds
+from source.vm_core import jit_compiler
+from source.vm_core import interpreter as interpreter_module
+from source.vm_core.interpreter import Interpreter
+from source.vm_core.bytecodes import Opcodes
+
+import time
+import unittest
+
+from source.vm_core.object_kinds import VM_ByteArray, VM_ObjectArray
+from source.vm_core.object_layout import SlotKind
+from tests.test_interpreter import UniverseMockup, TRUE_OBJECT_MOCKUP, FALSE_OBJECT_MOCKUP
+
+
+class InterpreterMockup:
+    def get_universe(self):
+        return UniverseMockup()
+
+
+def _setup_frame(literals_content, bytecode_content, stack_usage):
+    bytecode = VM_ByteArray(len(bytecode_content))
+    for index in range(len(bytecode_content)):
+        bytecode.byte_put_at(index, bytecode_content[index])
+
+    literals = VM_ObjectArray(len(literals_content), None)
+    for index in range(len(literals_content)):
+        literals.item_put_at(index, literals_content[index])
+
+    code = object_kinds.VM_Code(stack_usage, literals, bytecode)
+
+    method = object_kinds.VM_Object()
+    method.set_code(code)
+
+    return object_kinds.VM_Frame(None, VM_ObjectArray(stack_usage, None), method)
+
+
+def _setup_receiver(slot_content):
+    selector = object_kinds.VM_Symbol("combine", 1)
+
+    receiver = object_kinds.VM_Object()
+    receiver.add_slot(selector, SlotKind(), slot_content)
+
+    return receiver, selector
+
+
+class CompiledFunctionTestCase(unittest.TestCase):
+    def test_compiled_primitive_send(self):
+        argument = object_kinds.VM_Symbol("argument", 0)
+        primitive = object_kinds.VM_PrimitiveMethod(1, lambda interpreter, parameters: parameters[0])
+        receiver, selector = _setup_receiver(primitive)
+
+        frame = _setup_frame(
+            literals_content=[receiver, argument, selector],
+            bytecode_content=[
+                Opcodes.PUSH_LITERAL, 0x00,
+                Opcodes.PUSH_LITERAL, 0x01,
+                Opcodes.SEND_PRIMITIVE, 0x02,
+                Opcodes.RETURN_EXPLICIT, 0x00
+            ],
+            stack_usage=2
+        )
+
+        jit_compiler.compile_code(frame.get_code())
+        frame.get_code().get_compiled_function()(InterpreterMockup(), frame)
+
+        self.assertTrue(
+            frame.get_instruction_index() == 3,
+            "Compiled function must stop at return instruction, because it is left to interpreter"
+        )
+
+        self.assertTrue(
+            frame.get_stack_items() == [argument],
+            "When compiled function stops, the frame stack must contain result of inlined primitive send"
+        )
+
+    def test_compiled_send_deoptimization(self):
+        argument = object_kinds.VM_Symbol("argument", 0)
+        receiver, selector = _setup_receiver(object_kinds.VM_Object())
+
+        frame = _setup_frame(
+            literals_content=[receiver, argument, selector],
+            bytecode_content=[
+                Opcodes.PUSH_LITERAL, 0x00,
+                Opcodes.PUSH_LITERAL, 0x01,
+                Opcodes.SEND_PRIMITIVE, 0x02,
+                Opcodes.RETURN_EXPLICIT, 0x00
+            ],
+            stack_usage=2
+        )
+
+        jit_compiler.compile_code(frame.get_code())
+        frame.get_code().get_compiled_function()(InterpreterMockup(), frame)
+
+        self.assertTrue(
+            frame.get_instruction_index() == 2,
+            "When assumption of compiled send doesn't hold, compiled function must stop at that send"
+        )
+
+        self.assertTrue(
+            frame.get_stack_depth() == 2 and frame.get_stack_items()[1] is argument,
+            "When compiled function deoptimizes, the frame stack must contain receiver and arguments of failed send"
+        )
+
+    def test_compiled_code_disabled_after_deoptimizations(self):
+        receiver, selector = _setup_receiver(object_kinds.VM_Object())
+
+        frame = _setup_frame(
+            literals_content=[receiver, object_kinds.VM_SmallInteger(42), selector],
+            bytecode_content=[
+                Opcodes.PUSH_LITERAL, 0x00,
+                Opcodes.PUSH_LITERAL, 0x01,
+                Opcodes.SEND_PRIMITIVE, 0x02,
+            ],
+            stack_usage=2
+        )
+
+        jit_compiler.compile_code(frame.get_code())
+        compiled_function = frame.get_code().get_compiled_function()
+
+        for _ in range(jit_compiler.DEOPTIMIZATION_LIMIT):
+            frame.set_stack_items([], None)
+            frame.set_instruction_index(0)
+            compiled_function(InterpreterMockup(), frame)
+
+        self.assertTrue(
+            frame.get_code().get_compiled_function() is None and frame.get_code().is_compilation_disabled(),
+            "When compiled function deoptimizes too often, it must be thrown away"
+        )
+
+    def test_compiled_code_in_interpreter(self):
+        argument = object_kinds.VM_Symbol("argument", 0)
+        primitive = object_kinds.VM_PrimitiveMethod(1, lambda interpreter, parameters: parameters[0])
+        receiver, selector = _setup_receiver(primitive)
+
+        frame = _setup_frame(
+            literals_content=[receiver, argument, selector],
+            bytecode_content=[
+                Opcodes.PUSH_LITERAL, 0x00,
+                Opcodes.PUSH_LITERAL, 0x01,
+                Opcodes.SEND_PRIMITIVE, 0x02,
+                Opcodes.RETURN_EXPLICIT, 0x00
+            ],
+            stack_usage=2
+        )
+
+        jit_compiler.compile_code(frame.get_code())
+
+        process = object_kinds.VM_Process(None, frame)
+        Interpreter(UniverseMockup(), process).execute_all()
+
+        self.assertTrue(
+            process.get_result() is argument,
+            "When code is compiled, the process must finish with the same result as if it was interpreted"
+        )
+
+
+    def test_compiled_loop(self):
+        remaining_iterations = [5]
+
+        def primitive_has_next(interpreter, parameters):
+            remaining_iterations[0] -= 1
+            return TRUE_OBJECT_MOCKUP if remaining_iterations[0] > 0 else FALSE_OBJECT_MOCKUP
+
+        selector = object_kinds.VM_Symbol("hasNext", 0)
+        receiver = object_kinds.VM_Object()
+        receiver.add_slot(selector, SlotKind(), object_kinds.VM_PrimitiveMethod(0, primitive_has_next))
+
+        frame = _setup_frame(
+            literals_content=[receiver, selector],
+            bytecode_content=[
+                Opcodes.PUSH_LITERAL, 0x00,
+                Opcodes.SEND_PRIMITIVE, 0x01,
+                Opcodes.JUMP_FORWARD_IF_FALSE, 0x01,
+                Opcodes.JUMP_BACKWARD, 0x04,
+                Opcodes.PUSH_LITERAL, 0x00,
+            ],
+            stack_usage=1
+        )
+
+        jit_compiler.compile_code(frame.get_code())
+        frame.get_code().get_compiled_function()(InterpreterMockup(), frame)
+
+        self.assertTrue(
+            remaining_iterations[0] == 0,
+            "Compiled function must run whole loop by itself"
+        )
+
+        self.assertTrue(
+            frame.has_finished() and frame.get_stack_depth() == 1,
+            "When compiled loop ends, the compiled function must continue after the loop up to end of code"
+        )
+
+    def test_inconsistent_stack_depth_not_compiled(self):
+        frame = _setup_frame(
+            literals_content=[object_kinds.VM_Symbol("item", 0)],
+            bytecode_content=[
+                Opcodes.PUSH_LITERAL, 0x00,
+                Opcodes.JUMP_FORWARD_IF_TRUE, 0x01,
+                Opcodes.PUSH_LITERAL, 0x00,
+                Opcodes.NOOP, 0x00,
+            ],
+            stack_usage=2
+        )
+
+        jit_compiler.compile_code(frame.get_code())
+
+        self.assertTrue(
+            frame.get_code().get_compiled_function() is None and frame.get_code().is_compilation_disabled(),
+            "When stack depth of instruction depends on path taken to it, code must not be compiled"
+        )
+
+
+class CompiledExecutionLimitTestCase(unittest.TestCase):
+    # instructions of one iteration of counting loop
+    LOOP_LENGTH = 4
+
+    def _setup_counting_loop(self):
+        """
+        :return: (frame of code looping forever, list with number of loop iterations)
+        """
+        iteration_count = [0]
+
+        def primitive_count(interpreter, parameters):
+            iteration_count[0] += 1
+            return TRUE_OBJECT_MOCKUP
+
+        selector = object_kinds.VM_Symbol("count", 0)
+        receiver = object_kinds.VM_Object()
+        receiver.add_slot(selector, SlotKind(), object_kinds.VM_PrimitiveMethod(0, primitive_count))
+
+        frame = _setup_frame(
+            literals_content=[receiver, selector],
+            bytecode_content=[
+                Opcodes.PUSH_LITERAL, 0x00,
+                Opcodes.SEND_PRIMITIVE, 0x01,
+                Opcodes.PULL, 0x00,
+                Opcodes.JUMP_BACKWARD, 0x04,
+            ],
+            stack_usage=1
+        )
+
+        jit_compiler.compile_code(frame.get_code())
+
+        return frame, iteration_count
+
+    def test_compiled_function_instruction_limit(self):
+        frame, iteration_count = self._setup_counting_loop()
+
+        executed_count = frame.get_code().get_compiled_function()(InterpreterMockup(), frame, 10)
+
+        self.assertTrue(
+            executed_count == 3 * self.LOOP_LENGTH and iteration_count[0] == 3,
+            "Compiled function must return number of executed instructions once it reaches instruction limit at backward jump"
+        )
+
+        self.assertTrue(
+            frame.get_instruction_index() == 0 and frame.get_stack_depth() == 0,
+            "When compiled function reaches instruction limit, the frame must point at target of backward jump"
+        )
+
+    def test_compiled_loop_instruction_budget(self):
+        frame, iteration_count = self._setup_counting_loop()
+        process = object_kinds.VM_Process(None, frame)
+
+        instruction_budget = interpreter_module.BUDGET_CHECK_INTERVAL * 10 + 1
+        status = Interpreter(UniverseMockup(), process).execute_all(instruction_budget=instruction_budget)
+
+        self.assertTrue(
+            status == interpreter_module.ExecutionStatus.BudgetExhausted,
+            "When instruction budget runs out in compiled loop, execution must stop and report exhausted budget"
+        )
+
+        self.assertTrue(
+            abs(iteration_count[0] * self.LOOP_LENGTH - instruction_budget) <= self.LOOP_LENGTH,
+            "Every instruction executed by compiled function must be charged to instruction budget"
+        )
+
+    def test_compiled_loop_deadline(self):
+        frame, iteration_count = self._setup_counting_loop()
+        process = object_kinds.VM_Process(None, frame)
+
+        start_time = time.monotonic()
+        status = Interpreter(UniverseMockup(), process).execute_all(deadline=start_time + 0.01)
+        elapsed_time = time.monotonic() - start_time
+
+        self.assertTrue(
+            status == interpreter_module.ExecutionStatus.DeadlineReached and elapsed_time < 0.1,
+            "When deadline passes in compiled loop, execution must stop shortly after it"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import contextlib
+import io
+import os
+import pstats
+import tempfile
+import unittest
+
+from source.vm_core import main
+from source.vm_core import object_kinds
+from source.vm_core.bytecodes import Opcodes
+from source.vm_core.interpreter import Interpreter
+from source.vm_core.method_profiler import MethodProfiler, ROOT_METHOD_NAME
+from source.vm_core.object_kinds import VM_ByteArray, VM_ObjectArray
+from source.vm_core.object_layout import SlotKind
+from source.vm_core.universe import Universe
+from tests.test_interpreter import _setup_process
+
+
+class MethodProfilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.universe = Universe()
+        self.universe.init_clean_universe()
+
+    def _setup_interpreter(self):
+        """Module sending 'compute' twice, method 'compute' pushes (and so copies) object literal"""
+        method_literals = VM_ObjectArray(1, None)
+        method_literals.item_put_at(0, object_kinds.VM_Object())
+        method_bytecode = VM_ByteArray(2)
+        method_bytecode.byte_put_at(0, Opcodes.PUSH_LITERAL)
+
+        method = object_kinds.VM_Object()
+        self.method_code = object_kinds.VM_Code(1, method_literals, method_bytecode)
+        method.set_code(self.method_code)
+
+        receiver = object_kinds.VM_Object()
+        selector = object_kinds.VM_Symbol("compute", 0)
+        receiver.add_slot(selector, SlotKind(), method)
+
+        setup = _setup_process(
+            literals_content=[selector, object_kinds.VM_Symbol("result", 0)],
+            stack_content=[receiver, receiver],
+            bytecode_content=[Opcodes.SEND, 0x00, Opcodes.PULL, 0x00, Opcodes.SEND, 0x00, Opcodes.PULL, 0x00, Opcodes.PUSH_LITERAL, 0x01],
+            none_object=self.universe.get_none_object()
+        )
+        self.module_code = setup.frame.get_code()
+
+        process = object_kinds.VM_Process(self.universe.get_none_object(), setup.frame)
+        return Interpreter(self.universe, process)
+
+    def _profile(self):
+        interpreter = self._setup_interpreter()
+
+        profiler = MethodProfiler()
+        profiler.attach(interpreter)
+        interpreter.execute_all()
+        profiler.detach()
+
+        return profiler
+
+    def test_method_statistics(self):
+        statistics = self._profile().get_statistics()
+
+        self.assertTrue(
+            set(statistics) == {(self.module_code, ROOT_METHOD_NAME), (self.method_code, "compute")},
+            "Methods must be identified by their code and selector they were reached through"
+        )
+
+        method_statistics = statistics[(self.method_code, "compute")]
+        module_statistics = statistics[(self.module_code, ROOT_METHOD_NAME)]
+
+        self.assertTrue(
+            method_statistics.call_count == 2 and module_statistics.call_count == 1,
+            "Every activation of method must be counted as call"
+        )
+
+        self.assertTrue(
+            method_statistics.allocation_count == 2 and module_statistics.allocation_count > 0,
+            "Objects allocated while method was active must be attributed to method"
+        )
+
+        self.assertTrue(
+            module_statistics.inclusive_time >= method_statistics.inclusive_time + module_statistics.exclusive_time - 1e-9,
+            "Inclusive time of caller must contain time of its callees"
+        )
+
+    def test_allocation_observer_removed(self):
+        self._profile()
+
+        self.assertTrue(
+            "_link_trait" not in vars(self.universe),
+            "Detached profiler must not keep observing allocations of universe"
+        )
+
+    def test_table(self):
+        table = self._profile().format_table(sort_key="calls")
+        lines = table.splitlines()
+
+        self.assertTrue(
+            len(lines) == 3 and "compute" in lines[1] and ROOT_METHOD_NAME in lines[2],
+            "Table must list every method under header, sorted by chosen column"
+        )
+
+    def test_pstats_file(self):
+        profiler = self._profile()
+
+        with tempfile.TemporaryDirectory() as directory:
+            stats_path = os.path.join(directory, "profile.stats")
+            profiler.dump_stats(stats_path)
+
+            stats = pstats.Stats(stats_path, stream=io.StringIO())
+
+        self.assertTrue(
+            stats.total_calls == 3,
+            "Written statistics must be loadable by pstats"
+        )
+
+        method_entry = [entry for function, entry in stats.stats.items() if function[2] == "compute"][0]
+
+        self.assertTrue(
+            [function[2] for function in method_entry[4]] == [ROOT_METHOD_NAME],
+            "Written statistics must record callers of methods"
+        )
+
+    def test_redirected_send(self):
+        handler_bytecode = VM_ByteArray(2)
+        handler_bytecode.byte_put_at(0, Opcodes.NOOP)
+        handler_code = object_kinds.VM_Code(0, VM_ObjectArray(0, None), handler_bytecode)
+
+        handler = object_kinds.VM_Object()
+        handler.set_code(handler_code)
+
+        receiver = object_kinds.VM_Object()
+        receiver.add_slot(self.universe.get_unknown_selector_symbol(), SlotKind(), handler)
+
+        setup = _setup_process(
+            literals_content=[object_kinds.VM_Symbol("missing", 0)],
+            stack_content=[receiver],
+            bytecode_content=[Opcodes.SEND, 0x00],
+            none_object=self.universe.get_none_object()
+        )
+
+        interpreter = Interpreter(self.universe, object_kinds.VM_Process(self.universe.get_none_object(), setup.frame))
+
+        profiler = MethodProfiler()
+        profiler.attach(interpreter)
+        interpreter.execute_all()
+        profiler.detach()
+
+        self.assertTrue(
+            set(selector_name for code, selector_name in profiler.get_statistics() if code is handler_code)
+            == {self.universe.get_unknown_selector_symbol().get_text()},
+            "Send redirected to failure handler must be attributed to handler, under selector of handler"
+        )
+
+
+class ProfileArgumentsTestCase(unittest.TestCase):
+    def test_profilers_exclusive(self):
+        arguments = main.parse_arguments(["module", "--method-profile", "stats"])
+
+        self.assertTrue(
+            arguments.method_profile == "stats" and arguments.sample_profile is None,
+            "Method profile argument must be accepted on its own"
+        )
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit, msg="Method profile and sample profile arguments must not be accepted together"):
+                main.parse_arguments(["module", "--method-profile", "stats", "--sample-profile", "stacks"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import io
+import os
+import tempfile
+import unittest
+
+from source.vm_core import module_compiler
+from source.vm_core.bytecode_parsing import deserialize_module
+from source.vm_core.bytecodes import LiteralTags, ModuleFormatTags, Opcodes
+from source.vm_core.bytecode_serialization import serialize_module
+from source.vm_core.object_kinds import VM_Symbol
+from source.vm_core.universe import Universe
+from tests.test_vm_server import _int64, _module_bytes, _small_integer_literal
+
+
+def _symbol_literal(text, arity):
+    return [LiteralTags.VM_SYMBOL] + _int64(arity) + _int64(len(text)) + [ord(ch) for ch in text]
+
+
+def _new_universe():
+    universe = Universe()
+    universe.init_clean_universe()
+
+    return universe
+
+
+# module with repeated symbols and with slot object holding method
+SAMPLE_MODULE = _module_bytes(
+    literals=[
+        _symbol_literal("value", 0),
+        _symbol_literal("value", 0),
+        [LiteralTags.VM_OBJECT] + _int64(1)
+        + [0] + _symbol_literal("value", 0) + _small_integer_literal(7)
+        + [LiteralTags.VM_CODE] + _int64(1)
+        + [LiteralTags.VM_OBJECT_ARRAY] + _int64(1) + _symbol_literal("value", 0)
+        + [LiteralTags.VM_BYTE_ARRAY] + _int64(4) + [Opcodes.NOOP, 0x00, Opcodes.PUSH_LITERAL, 0x00],
+    ],
+    bytecode=[Opcodes.PUSH_LITERAL, 0x02, Opcodes.SEND, 0x00],
+    stack_usage=1
+)
+
+
+class BytecodeOptimizationTestCase(unittest.TestCase):
+    def test_noops_removed(self):
+        bytecode = bytes([
+            Opcodes.NOOP, 0x00,
+            Opcodes.PUSH_MYSELF, 0x00,
+            Opcodes.JUMP_FORWARD_IF_TRUE, 0x02,
+            Opcodes.NOOP, 0x00,
+            Opcodes.JUMP_FORWARD, 0x00,
+            Opcodes.PUSH_MYSELF, 0x00,
+            Opcodes.JUMP_BACKWARD, 0x07,
+        ])
+
+        self.assertTrue(
+            module_compiler.optimize_bytecode(bytecode) == bytes([
+                Opcodes.PUSH_MYSELF, 0x00,
+                Opcodes.JUMP_FORWARD_IF_TRUE, 0x00,
+                Opcodes.PUSH_MYSELF, 0x00,
+                Opcodes.JUMP_BACKWARD, 0x04,
+            ]),
+            "Optimization must remove instructions without effect and retarget jumps to instructions kept after them"
+        )
+
+
+class ModuleCompilerTestCase(unittest.TestCase):
+    def test_serialization_round_trip(self):
+        universe = _new_universe()
+        code = deserialize_module(universe, SAMPLE_MODULE)
+
+        serialized = serialize_module(code, universe.get_none_object())
+        reloaded = deserialize_module(universe, serialized)
+
+        self.assertTrue(
+            serialize_module(reloaded, universe.get_none_object()) == serialized and len(serialized) < len(SAMPLE_MODULE),
+            "Serialized module must load into the same code, with repeated symbols written only once"
+        )
+
+    def test_compile_module(self):
+        for compression_tag in (None, ModuleFormatTags.ZLIB_COMPRESSED):
+            compiled, removed_count = module_compiler.compile_module(io.BytesIO(SAMPLE_MODULE), compression_tag)
+            code = deserialize_module(_new_universe(), compiled)
+
+            method_code = code.get_literals().item_get_at(2).get_code()
+
+            self.assertTrue(
+                removed_count == 1 and method_code.get_instruction_count() == 1,
+                "Compiled module must have optimized bytecode"
+            )
+
+            self.assertTrue(
+                code.get_literals().item_get_at(0) is code.get_literals().item_get_at(1)
+                and code.get_literals().item_get_at(0) == VM_Symbol("value", 0),
+                "Compiled module must refer to symbols through symbol pool"
+            )
+
+    def test_compile_module_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            module_paths = []
+
+            for index in range(3):
+                module_paths.append(os.path.join(directory, "module{}".format(index)))
+
+                with open(module_paths[-1], "wb") as module_file_obj:
+                    module_file_obj.write(SAMPLE_MODULE if index < 2 else b"ORE" + bytes([0xFF]))
+
+            reports = {report["module"]: report for report in module_compiler.compile_module_files(module_paths, worker_count=2)}
+
+            self.assertTrue(
+                reports[module_paths[0]]["status"] == "compiled" and os.path.exists(module_paths[0] + module_compiler.DEFAULT_OUTPUT_SUFFIX),
+                "Every valid module must be compiled into its output file"
+            )
+
+            self.assertTrue(
+                reports[module_paths[2]]["status"] == "failed",
+                "Malformed module must be reported as failed without stopping other modules"
+            )
+
+    def test_unexpected_error_reported(self):
+        def failing_compile_module(module_file_obj, compression_tag=None):
+            raise MemoryError("module too big")
+
+        original_compile_module = module_compiler.compile_module
+        module_compiler.compile_module = failing_compile_module
+
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                module_path = os.path.join(directory, "module")
+
+                with open(module_path, "wb") as module_file_obj:
+                    module_file_obj.write(SAMPLE_MODULE)
+
+                reports = list(module_compiler.compile_module_files([module_path], worker_count=1))
+        finally:
+            module_compiler.compile_module = original_compile_module
+
+        self.assertTrue(
+            len(reports) == 1 and reports[0]["status"] == "failed" and "MemoryError" in reports[0]["message"],
+            "Unexpected error while compiling module must be reported as failure of that module, not raised"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -164,5 +164,170 @@ class ObjectTestCase(unittest.TestCase):
         )
 
 
+    def test_slot_lookup_follows_parent_changes(self):
+        TEST_NAME = "target"
+
+        firstParentObject = object_layout.VM_Object()
+        secondParentObject = object_layout.VM_Object()
+        childrenObject = object_layout.VM_Object()
+
+        firstParentObject.add_slot(TEST_NAME, object_layout.SlotKind(), 42)
+        childrenObject.add_slot("parent", object_layout.SlotKind.PARENT, object_layout.VM_Object())
+
+        # parent slot is reassigned, copied and removed
+        childrenObject.set_slot("parent", firstParentObject)
+        childrenCopy = childrenObject.copy()
+        childrenObject.add_slot("parent2", object_layout.SlotKind.PARENT, secondParentObject)
+
+        self.assertTrue(
+            childrenObject.lookup_slot(TEST_NAME) == (object_layout.SlotLookupStatus.FoundOne, firstParentObject),
+            "Lookup must search object currently stored in parent slot"
+        )
+
+        self.assertTrue(
+            childrenCopy.lookup_slot(TEST_NAME) == (object_layout.SlotLookupStatus.FoundOne, firstParentObject),
+            "Lookup in copy of object must search parents of original object"
+        )
+
+        childrenObject.del_slot("parent")
+
+        self.assertTrue(
+            childrenObject.lookup_slot(TEST_NAME)[0] == object_layout.SlotLookupStatus.FoundNone,
+            "Lookup must not search parent of removed parent slot"
+        )
+
+        self.assertTrue(
+            childrenCopy.lookup_slot(TEST_NAME) == (object_layout.SlotLookupStatus.FoundOne, firstParentObject),
+            "Removing parent slot from object must not affect its copies"
+        )
+
+
+class CachedLookupTestCase(unittest.TestCase):
+    def setUp(self):
+        object_layout.invalidate_cached_lookups()
+
+        self.grandParentObject = object_layout.VM_Object()
+        self.parentObject = object_layout.VM_Object()
+        self.parentObject.add_slot("parent", object_layout.SlotKind.PARENT, self.grandParentObject)
+
+    def _new_child(self):
+        childObject = object_layout.VM_Object()
+        childObject.add_slot("parent", object_layout.SlotKind.PARENT, self.parentObject)
+
+        return childObject
+
+    def test_cached_miss_invalidated_by_new_slot(self):
+        self.assertTrue(
+            self._new_child().lookup_slot("target")[0] == object_layout.SlotLookupStatus.FoundNone,
+            "Lookup for non-existing slot should be failure with 'FoundNone' status"
+        )
+
+        self.grandParentObject.add_slot("target", object_layout.SlotKind(), 42)
+
+        self.assertTrue(
+            self._new_child().lookup_slot("target") == (object_layout.SlotLookupStatus.FoundOne, self.grandParentObject),
+            "When slot is added to object searched by cached failed lookup, the lookup must find it"
+        )
+
+    def test_cached_miss_invalidated_by_parent_change(self):
+        otherParentObject = object_layout.VM_Object()
+        otherParentObject.add_slot("target", object_layout.SlotKind(), 42)
+
+        self._new_child().lookup_slot("target")
+        self.parentObject.set_slot("parent", otherParentObject)
+
+        self.assertTrue(
+            self._new_child().lookup_slot("target") == (object_layout.SlotLookupStatus.FoundOne, otherParentObject),
+            "When parent slot of object searched by cached failed lookup changes, the lookup must search new parent"
+        )
+
+    def test_memoized_lookup_invalidated_by_removed_slot(self):
+        self.grandParentObject.add_slot("target", object_layout.SlotKind(), 42)
+
+        self.assertTrue(
+            self._new_child().lookup_slot("target", memoize_found=True) == (object_layout.SlotLookupStatus.FoundOne, self.grandParentObject),
+            "Memoized lookup must find slot in grandparent"
+        )
+
+        self.grandParentObject.del_slot("target")
+
+        self.assertTrue(
+            self._new_child().lookup_slot("target", memoize_found=True)[0] == object_layout.SlotLookupStatus.FoundNone,
+            "When slot found by memoized lookup is removed, the lookup must fail"
+        )
+
+
+class ParameterBindingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.method = object_layout.VM_Object()
+        self.method.set_code("code")
+
+        self.method.add_slot("first", object_layout.SlotKind.PARAMETER, None)
+        self.method.add_slot("local", object_layout.SlotKind.NORMAL, None)
+        self.method.add_slot("second", object_layout.SlotKind.PARAMETER, None)
+
+    def test_parameter_count(self):
+        self.assertTrue(
+            self.method.get_parameter_count() == 2,
+            "Parameter count of method must be number of its parameter slots"
+        )
+
+        self.method.del_slot("first")
+
+        self.assertTrue(
+            self.method.get_parameter_count() == 1,
+            "Removed parameter slot must not be counted"
+        )
+
+    def test_bind_parameters(self):
+        activation = self.method.copy()
+        activation.bind_parameters([1, 2])
+
+        self.assertTrue(
+            activation.get_slot("first") == 1 and activation.get_slot("second") == 2 and activation.get_slot("local") is None,
+            "Arguments must be bound to parameter slots in order in which slots were created"
+        )
+
+        self.assertTrue(
+            self.method.get_slot("first") is None and self.method.get_slot("second") is None,
+            "Binding arguments in activation must not change method it was copied from"
+        )
+
+    def test_set_slot_in_copy(self):
+        activation = self.method.copy()
+        activation.set_slot("local", 3)
+
+        self.assertTrue(
+            activation.get_slot("local") == 3 and self.method.get_slot("local") is None,
+            "Setting slot of copy must not change original object"
+        )
+
+
+class SlotKindTestCase(unittest.TestCase):
+    def test_slot_kinds_are_shared(self):
+        self.assertTrue(
+            object_layout.SlotKind() is object_layout.SlotKind.NORMAL,
+            "Creating slot kind must return shared instance"
+        )
+
+        self.assertTrue(
+            object_layout.SlotKind().toggleParent().toggleParameter() is object_layout.SlotKind.PARENT_PARAMETER,
+            "Toggling slot kind must return shared instance of resulting kind"
+        )
+
+    def test_slot_kind_toggle_keeps_original(self):
+        parent_kind = object_layout.SlotKind.PARENT
+
+        toggled_kind = parent_kind.toggleParent()
+
+        self.assertTrue(
+            parent_kind.isParent() and not toggled_kind.isParent(),
+            "Toggling slot kind must not change the original kind"
+        )
+
+        with self.assertRaises(AttributeError, msg="Slot kind must be immutable"):
+            parent_kind._isParent = False
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,370 @@
+import unittest
+
+from array import array
+
+from source.vm_core.object_kinds import VM_ByteArray, VM_String, VM_IntegerVector
+from source.vm_core.primitives import primitives_byte_array, primitives_string, primitives_object_array
+from source.vm_core.primitives import primitives_string_builder, primitives_integer_vector
+from source.vm_core.universe import Universe
+
+
+class InterpreterMockup:
+    def __init__(self):
+        self._universe = Universe()
+        self._universe.init_clean_universe()
+
+    def get_universe(self):
+        return self._universe
+
+
+class ByteArrayPrimitivesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.interpreter = InterpreterMockup()
+        self.universe = self.interpreter.get_universe()
+
+    def _integer(self, value):
+        return self.universe.new_small_integer(value)
+
+    def test_copy_range(self):
+        source = self.universe.new_byte_array_from_bytes(b"abcdef")
+        target = self.universe.new_byte_array(4)
+
+        primitives_byte_array.primitive_byte_array_copy_range(
+            self.interpreter, [source, self._integer(2), target, self._integer(1), self._integer(3)]
+        )
+
+        self.assertTrue(
+            target.bytes_get_at(0, 4) == b"\x00cde",
+            "ByteArray_CopyRange must copy specified range of source into target at specified index"
+        )
+
+    def test_copy_range_overlapping(self):
+        byte_array = self.universe.new_byte_array_from_bytes(b"abcdef")
+
+        primitives_byte_array.primitive_byte_array_copy_range(
+            self.interpreter, [byte_array, self._integer(0), byte_array, self._integer(2), self._integer(4)]
+        )
+
+        self.assertTrue(
+            byte_array.bytes_get_at(0, 6) == b"ababcd",
+            "ByteArray_CopyRange within single array must behave as if range was copied into temporary array first"
+        )
+
+    def test_fill(self):
+        byte_array = self.universe.new_byte_array(5)
+
+        primitives_byte_array.primitive_byte_array_fill(
+            self.interpreter, [byte_array, self._integer(1), self._integer(3), self._integer(7)]
+        )
+
+        self.assertTrue(
+            byte_array.bytes_get_at(0, 5) == bytes([0, 7, 7, 7, 0]),
+            "ByteArray_Fill must overwrite specified range by byte value"
+        )
+
+    def test_compare(self):
+        for left, right, expected in ((b"abc", b"abd", -1), (b"abc", b"abc", 0), (b"abcd", b"abc", 1)):
+            result = primitives_byte_array.primitive_byte_array_compare(
+                self.interpreter,
+                [self.universe.new_byte_array_from_bytes(left), self.universe.new_byte_array_from_bytes(right)]
+            )
+
+            self.assertTrue(
+                result.get_value() == expected,
+                "ByteArray_Compare must compare byte arrays lexicographically"
+            )
+
+    def test_find(self):
+        byte_array = self.universe.new_byte_array_from_bytes(b"abcabc")
+
+        result = primitives_byte_array.primitive_byte_array_find(
+            self.interpreter, [byte_array, self._integer(ord("b")), self._integer(2)]
+        )
+
+        self.assertTrue(
+            result.get_value() == 4,
+            "ByteArray_Find must return index of first occurrence at or after start index"
+        )
+
+        result = primitives_byte_array.primitive_byte_array_find(
+            self.interpreter, [byte_array, self._integer(ord("z")), self._integer(0)]
+        )
+
+        self.assertTrue(
+            result.get_value() == -1,
+            "ByteArray_Find must return -1 if byte is not present"
+        )
+
+    def test_string_conversion(self):
+        string_object = self.universe.new_string("čaj")
+
+        byte_array = primitives_string.primitive_string_as_byte_array(self.interpreter, [string_object])
+
+        self.assertTrue(
+            isinstance(byte_array, VM_ByteArray) and byte_array.bytes_get_at(0, byte_array.get_byte_count()) == "čaj".encode("utf-8"),
+            "String_AsByteArray must return UTF-8 bytes of string"
+        )
+
+        result = primitives_byte_array.primitive_byte_array_as_string(self.interpreter, [byte_array])
+
+        self.assertTrue(
+            isinstance(result, VM_String) and result.get_characters() == "čaj",
+            "ByteArray_AsString must decode UTF-8 bytes into string"
+        )
+
+    def test_string_conversion_invalid_utf8(self):
+        byte_array = self.universe.new_byte_array_from_bytes(b"ok\xff\xc3")
+
+        result = primitives_byte_array.primitive_byte_array_as_string(self.interpreter, [byte_array])
+
+        self.assertTrue(
+            isinstance(result, VM_String) and result.get_characters() == "ok\ufffd\ufffd",
+            "ByteArray_AsString must replace bytes that aren't valid UTF-8 instead of failing"
+        )
+
+
+class ObjectArrayPrimitivesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.interpreter = InterpreterMockup()
+        self.universe = self.interpreter.get_universe()
+        self.items = [self.universe.new_small_integer(value) for value in range(5)]
+
+    def _integer(self, value):
+        return self.universe.new_small_integer(value)
+
+    def _content(self, object_array):
+        return object_array.items_get_at(0, object_array.get_item_count())
+
+    def test_copy_range(self):
+        source = self.universe.new_object_array_from_list(self.items)
+        target = self.universe.new_object_array(3)
+
+        primitives_object_array.primitive_object_array_copy_range(
+            self.interpreter, [source, self._integer(3), target, self._integer(0), self._integer(2)]
+        )
+
+        self.assertTrue(
+            self._content(target) == [self.items[3], self.items[4], self.universe.get_none_object()],
+            "ObjectArray_CopyRange must copy specified range of source into target at specified index"
+        )
+
+    def test_resized(self):
+        object_array = self.universe.new_object_array_from_list(self.items)
+
+        grown = primitives_object_array.primitive_object_array_resized(self.interpreter, [object_array, self._integer(7)])
+        shrunk = primitives_object_array.primitive_object_array_resized(self.interpreter, [object_array, self._integer(2)])
+
+        self.assertTrue(
+            self._content(grown) == self.items + [self.universe.get_none_object()] * 2,
+            "ObjectArray_Resized with bigger size must copy all items and fill rest with none object"
+        )
+
+        self.assertTrue(
+            self._content(shrunk) == self.items[:2] and object_array.get_item_count() == 5,
+            "ObjectArray_Resized with smaller size must copy leading items and leave original array intact"
+        )
+
+    def test_fill(self):
+        object_array = self.universe.new_object_array_from_list(self.items)
+
+        primitives_object_array.primitive_object_array_fill(
+            self.interpreter, [object_array, self._integer(1), self._integer(2), self.items[0]]
+        )
+
+        self.assertTrue(
+            self._content(object_array) == [self.items[0]] * 3 + self.items[3:],
+            "ObjectArray_Fill must overwrite specified range by item"
+        )
+
+    def test_index_of(self):
+        symbol = self.universe.new_symbol("item", 0)
+        equal_symbol = self.universe.new_symbol("item", 0)
+        object_array = self.universe.new_object_array_from_list([equal_symbol, symbol, symbol])
+
+        result = primitives_object_array.primitive_object_array_index_of(
+            self.interpreter, [object_array, symbol, self._integer(0)]
+        )
+
+        self.assertTrue(
+            result.get_value() == 1,
+            "ObjectArray_IndexOf must search by identity, not equality"
+        )
+
+        result = primitives_object_array.primitive_object_array_index_of(
+            self.interpreter, [object_array, self.items[0], self._integer(0)]
+        )
+
+        self.assertTrue(
+            result.get_value() == -1,
+            "ObjectArray_IndexOf must return -1 if item is not present"
+        )
+
+    def test_reverse(self):
+        object_array = self.universe.new_object_array_from_list(self.items)
+
+        primitives_object_array.primitive_object_array_reverse(self.interpreter, [object_array])
+
+        self.assertTrue(
+            self._content(object_array) == list(reversed(self.items)),
+            "ObjectArray_Reverse must reverse order of items"
+        )
+
+    def test_concatenate(self):
+        left = self.universe.new_object_array_from_list(self.items[:2])
+        right = self.universe.new_object_array_from_list(self.items[2:])
+
+        result = primitives_object_array.primitive_object_array_concatenate(self.interpreter, [left, right])
+
+        self.assertTrue(
+            self._content(result) == self.items,
+            "ObjectArray_Concatenate must return new array with items of both arrays"
+        )
+
+
+class StringBuilderPrimitivesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.interpreter = InterpreterMockup()
+        self.universe = self.interpreter.get_universe()
+
+    def test_build_string(self):
+        builder = primitives_string_builder.primitive_string_builder_new(self.interpreter, [])
+
+        primitives_string_builder.primitive_string_builder_append(self.interpreter, [builder, self.universe.new_string("items: ")])
+        primitives_string_builder.primitive_string_builder_append_integer(self.interpreter, [builder, self.universe.new_small_integer(-42)])
+
+        character_count = primitives_string_builder.primitive_string_builder_get_character_count(self.interpreter, [builder])
+        result = primitives_string_builder.primitive_string_builder_as_string(self.interpreter, [builder])
+
+        self.assertTrue(
+            isinstance(result, VM_String) and result.get_characters() == "items: -42",
+            "StringBuilder_AsString must return string made of all appended fragments"
+        )
+
+        self.assertTrue(
+            character_count.get_value() == len("items: -42"),
+            "StringBuilder_CharCount must return number of appended characters"
+        )
+
+        primitives_string_builder.primitive_string_builder_append(self.interpreter, [builder, self.universe.new_string("!")])
+        result = primitives_string_builder.primitive_string_builder_as_string(self.interpreter, [builder])
+
+        self.assertTrue(
+            result.get_characters() == "items: -42!",
+            "StringBuilder must remain usable after it was converted to string"
+        )
+
+
+class IntegerVectorPrimitivesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.interpreter = InterpreterMockup()
+        self.universe = self.interpreter.get_universe()
+
+    def _integer(self, value):
+        return self.universe.new_small_integer(value)
+
+    def _vector(self, values):
+        return self.universe.new_integer_vector_from_items(array(VM_IntegerVector.ITEM_TYPECODE, values))
+
+    def _content(self, vector):
+        return list(vector.get_items())
+
+    def test_conversion(self):
+        object_array = self.universe.new_object_array_from_list([self._integer(value) for value in (3, -1, 4)])
+
+        vector = primitives_integer_vector.primitive_integer_vector_from_array(self.interpreter, [object_array])
+        back = primitives_integer_vector.primitive_integer_vector_as_array(self.interpreter, [vector])
+
+        self.assertTrue(
+            isinstance(vector, VM_IntegerVector) and self._content(vector) == [3, -1, 4],
+            "IntegerVector_FromArray must unbox small integers of array into vector"
+        )
+
+        self.assertTrue(
+            [item.get_value() for item in back.items_get_at(0, back.get_item_count())] == [3, -1, 4],
+            "IntegerVector_AsArray must box items of vector into new array"
+        )
+
+    def test_elementwise_arithmetic(self):
+        left = self._vector([7, -7, 10])
+        right = self._vector([2, 2, -3])
+
+        self.assertTrue(
+            self._content(primitives_integer_vector.primitive_integer_vector_add(self.interpreter, [left, right])) == [9, -5, 7],
+            "IntegerVector_Add must add vectors item by item"
+        )
+
+        self.assertTrue(
+            self._content(primitives_integer_vector.primitive_integer_vector_mul(self.interpreter, [left, self._integer(3)])) == [21, -21, 30],
+            "When operand is small integer, it must be applied to every item"
+        )
+
+        self.assertTrue(
+            self._content(primitives_integer_vector.primitive_integer_vector_div(self.interpreter, [left, right])) == [3, -3, -3],
+            "IntegerVector_Div must round toward zero like SmallInteger_Div"
+        )
+
+        self.assertTrue(
+            self._content(primitives_integer_vector.primitive_integer_vector_modulo(self.interpreter, [left, self._integer(4)])) == [3, 1, 2],
+            "IntegerVector_Mod must compute modulo like SmallInteger_Mod"
+        )
+
+        self.assertTrue(
+            self._content(left) == [7, -7, 10],
+            "Elementwise operations must not modify their operands"
+        )
+
+    def test_overflow_wraps(self):
+        vector = self._vector([2 ** 63 - 1, 5])
+
+        result = primitives_integer_vector.primitive_integer_vector_add(self.interpreter, [vector, self._integer(1)])
+
+        self.assertTrue(
+            self._content(result) == [-2 ** 63, 6],
+            "Items out of 64-bit range must wrap around"
+        )
+
+    def test_mask_and_select(self):
+        vector = self._vector([5, 1, 8, 3])
+
+        mask = primitives_integer_vector.primitive_integer_vector_greater(self.interpreter, [vector, self._integer(3)])
+        selected = primitives_integer_vector.primitive_integer_vector_select(self.interpreter, [vector, mask])
+
+        self.assertTrue(
+            self._content(mask) == [1, 0, 1, 0],
+            "Comparison must produce mask with 1 where comparison holds and 0 elsewhere"
+        )
+
+        self.assertTrue(
+            self._content(selected) == [5, 8],
+            "IntegerVector_Select must keep only items selected by mask"
+        )
+
+    def test_reductions(self):
+        vector = self._vector([4, -2, 9])
+
+        self.assertTrue(
+            primitives_integer_vector.primitive_integer_vector_sum(self.interpreter, [vector]).get_value() == 11
+            and primitives_integer_vector.primitive_integer_vector_min(self.interpreter, [vector]).get_value() == -2
+            and primitives_integer_vector.primitive_integer_vector_max(self.interpreter, [vector]).get_value() == 9,
+            "Reductions must return sum, minimum and maximum of items"
+        )
+
+        self.assertTrue(
+            primitives_integer_vector.primitive_integer_vector_dot(self.interpreter, [vector, self._vector([1, 2, 3])]).get_value() == 27,
+            "IntegerVector_Dot must return sum of products of items"
+        )
+
+    def test_slice(self):
+        vector = self._vector([1, 2, 3, 4, 5])
+
+        result = primitives_integer_vector.primitive_integer_vector_slice(self.interpreter, [vector, self._integer(1), self._integer(3)])
+        result.item_put_at(0, 100)
+
+        self.assertTrue(
+            self._content(result) == [100, 3, 4] and self._content(vector) == [1, 2, 3, 4, 5],
+            "IntegerVector_Slice must return independent vector with items of specified range"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import io
+import threading
+import time
+import unittest
+
+from source.vm_core import object_kinds
+from source.vm_core import sampling_profiler
+from source.vm_core.bytecodes import Opcodes
+from source.vm_core.interpreter import Interpreter
+from source.vm_core.object_kinds import VM_ByteArray, VM_ObjectArray
+from source.vm_core.object_layout import SlotKind
+from source.vm_core.sampling_profiler import SamplingProfiler
+from tests.test_interpreter import UniverseMockup
+
+
+def _setup_code(bytecode_content):
+    bytecode = VM_ByteArray(len(bytecode_content))
+    bytecode.bytes_put_at(0, bytes(bytecode_content))
+
+    return object_kinds.VM_Code(1, VM_ObjectArray(0, None), bytecode)
+
+
+def _setup_frame(previous_frame, code, receiver):
+    activation = object_kinds.VM_Object()
+    activation.set_code(code)
+
+    if receiver is not None:
+        activation.add_slot(object_kinds.VM_Symbol("me", 0), SlotKind.PARENT, receiver)
+
+    frame = object_kinds.VM_Frame(None, VM_ObjectArray(1, None), activation)
+    frame.set_previous_frame(previous_frame)
+
+    return frame
+
+
+class SamplingProfilerTestCase(unittest.TestCase):
+    def _setup_interpreter(self):
+        """Process running module frame, which called 'compute' method defined in parent of receiver"""
+        method_code = _setup_code([Opcodes.NOOP, 0x00])
+        method = object_kinds.VM_Object()
+        method.set_code(method_code)
+
+        trait = object_kinds.VM_Object()
+        trait.add_slot(object_kinds.VM_Symbol("compute", 0), SlotKind(), method)
+
+        receiver = object_kinds.VM_Object()
+        receiver.add_slot("parent", SlotKind.PARENT, trait)
+
+        module_frame = _setup_frame(None, _setup_code([Opcodes.NOOP, 0x00]), None)
+        method_frame = _setup_frame(module_frame, method_code, receiver)
+
+        process = object_kinds.VM_Process(None, module_frame)
+        process.push_frame(method_frame)
+
+        return Interpreter(UniverseMockup(), process)
+
+    def test_sample_labels(self):
+        profiler = SamplingProfiler(self._setup_interpreter())
+        profiler.take_sample()
+        profiler.take_sample()
+
+        self.assertTrue(
+            profiler.get_folded_stacks() == {"<module>;compute": 2},
+            "Sampled stack must go from outermost frame to innermost and label method frames by slot of their method"
+        )
+
+        output = io.StringIO()
+        profiler.write_folded_stacks(output)
+
+        self.assertTrue(
+            output.getvalue() == "<module>;compute 2\n",
+            "Folded stacks must be written as stack followed by number of samples"
+        )
+
+    def _setup_deep_interpreter(self, method_name, depth):
+        """Process running module frame with depth of frames of method above it"""
+        method_code = _setup_code([Opcodes.NOOP, 0x00])
+        method = object_kinds.VM_Object()
+        method.set_code(method_code)
+
+        receiver = object_kinds.VM_Object()
+        receiver.add_slot(object_kinds.VM_Symbol(method_name, 0), SlotKind(), method)
+
+        process = object_kinds.VM_Process(None, _setup_frame(None, _setup_code([Opcodes.NOOP, 0x00]), None))
+
+        for _ in range(depth):
+            process.push_frame(_setup_frame(process.peek_frame(), method_code, receiver))
+
+        return Interpreter(UniverseMockup(), process)
+
+    def test_deep_stack_truncated(self):
+        profiler = SamplingProfiler(self._setup_deep_interpreter("recurse", sampling_profiler.MAX_SAMPLED_DEPTH * 2))
+        profiler.take_sample()
+
+        labels = list(profiler.get_folded_stacks())[0].split(";")
+
+        self.assertTrue(
+            labels[0] == "<module>" and labels[-1] == "recurse" and len(labels) == sampling_profiler.MAX_SAMPLED_DEPTH + 1,
+            "Sample of deep stack must keep outermost and innermost frames"
+        )
+
+        self.assertTrue(
+            labels.count(sampling_profiler.TRUNCATED_LABEL) == 1,
+            "Sample of deep stack must mark frames that were left out"
+        )
+
+    def test_label_sanitized(self):
+        profiler = SamplingProfiler(self._setup_deep_interpreter("at: x;put:", 1))
+        profiler.take_sample()
+
+        self.assertTrue(
+            profiler.get_folded_stacks() == {"<module>;at:_x_put:": 1},
+            "Semicolons and whitespace in labels must be replaced, so they don't break folded format"
+        )
+
+    def _setup_loop_interpreter(self):
+        module_frame = _setup_frame(None, _setup_code([Opcodes.NOOP, 0x00, Opcodes.JUMP_BACKWARD, 0x02]), None)
+        return Interpreter(UniverseMockup(), object_kinds.VM_Process(None, module_frame))
+
+    def test_sampling_by_thread(self):
+        interpreter = self._setup_loop_interpreter()
+        profiler = SamplingProfiler(interpreter)
+
+        result = []
+        worker = threading.Thread(target=lambda: result.append(self._sample_loop(profiler, interpreter)))
+        worker.start()
+        worker.join()
+
+        self.assertTrue(
+            result[0] > 0,
+            "Profiler started outside of main thread must sample by sampler thread"
+        )
+
+    def test_sampling_by_signal(self):
+        interpreter = self._setup_loop_interpreter()
+        profiler = SamplingProfiler(interpreter)
+
+        self.assertTrue(
+            self._sample_loop(profiler, interpreter) > 0,
+            "Running profiler must take samples periodically"
+        )
+
+    @staticmethod
+    def _sample_loop(profiler, interpreter):
+        with profiler:
+            deadline = time.monotonic() + 1.0
+            while time.monotonic() < deadline and profiler.get_sample_count() == 0:
+                interpreter.execute_all(instruction_budget=1000)
+
+        return profiler.get_sample_count()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from source.vm_core import vm_server
+from source.vm_core.bytecodes import CORRECT_MODULE_SIGNATURE, LiteralTags, Opcodes
+from source.vm_core.universe import Universe
+
+
+def _int64(value):
+    return list(value.to_bytes(8, byteorder="big", signed=True))
+
+
+def _module_bytes(literals, bytecode, stack_usage):
+    """Serializes module code with specified (already serialized) literals"""
+    module = list(CORRECT_MODULE_SIGNATURE) + [LiteralTags.VM_CODE] + _int64(stack_usage)
+
+    module += [LiteralTags.VM_OBJECT_ARRAY] + _int64(len(literals))
+    for literal in literals:
+        module += literal
+
+    module += [LiteralTags.VM_BYTE_ARRAY] + _int64(len(bytecode)) + bytecode
+
+    return bytes(module)
+
+
+def _small_integer_literal(value):
+    return [LiteralTags.VM_SMALL_INTEGER] + _int64(value)
+
+
+RETURN_42_MODULE = _module_bytes(
+    literals=[_small_integer_literal(42)],
+    bytecode=[Opcodes.PUSH_LITERAL, 0x00],
+    stack_usage=1
+)
+
+
+def _new_universe():
+    universe = Universe()
+    universe.init_clean_universe()
+
+    return universe
+
+
+class RunModuleTestCase(unittest.TestCase):
+    def test_run_module_result(self):
+        response = vm_server.run_module(_new_universe(), RETURN_42_MODULE)
+
+        self.assertTrue(
+            response["status"] == "finished" and response["result"] == 42,
+            "When module finishes, response must contain its result"
+        )
+
+    def test_run_malformed_module(self):
+        response = vm_server.run_module(_new_universe(), b"ORE" + bytes([0xFF]))
+
+        self.assertTrue(
+            response["status"] == "failed",
+            "When module can't be deserialized, response must report failure"
+        )
+
+    def test_run_module_error_result(self):
+        # pull from empty stack
+        response = vm_server.run_module(_new_universe(), _module_bytes(literals=[], bytecode=[Opcodes.PULL, 0x00], stack_usage=0))
+
+        self.assertTrue(
+            response["result"] == {"error": "stackUnderflow"},
+            "When module ends with process error, response must contain name of the error"
+        )
+
+    def test_run_module_budget(self):
+        loop_module = _module_bytes(literals=[], bytecode=[Opcodes.NOOP, 0x00, Opcodes.JUMP_BACKWARD, 0x02], stack_usage=0)
+
+        response = vm_server.run_module(_new_universe(), loop_module, instruction_budget=100)
+
+        self.assertTrue(
+            response["status"] == "budgetExhausted" and "result" not in response,
+            "When module runs out of instruction budget, response must report it without result"
+        )
+
+
+class ServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, "vm.socket")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _serve(self, server_class):
+        server = server_class(self.socket_path, _new_universe())
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+        self.addCleanup(stop)
+
+    def test_shared_universe_server(self):
+        self._serve(vm_server.VMServer)
+
+        responses = [vm_server.run_remote_module(self.socket_path, RETURN_42_MODULE) for _ in range(2)]
+
+        self.assertTrue(
+            all(response["status"] == "finished" and response["result"] == 42 for response in responses),
+            "Server must answer every request with result of sent module"
+        )
+
+    @unittest.skipUnless(hasattr(os, "fork"), "forking server needs os.fork")
+    def test_forking_server(self):
+        self._serve(vm_server.ForkingVMServer)
+
+        response = vm_server.run_remote_module(self.socket_path, RETURN_42_MODULE)
+
+        self.assertTrue(
+            response["status"] == "finished" and response["result"] == 42,
+            "Forking server must answer request with result of sent module"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+from source.vm_core import vm_worker_pool
+from source.vm_core.bytecodes import Opcodes
+from source.vm_core.universe import Universe
+from tests.test_vm_server import _module_bytes, _small_integer_literal
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "worker pool needs os.fork")
+class WorkerPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+        self.universe = Universe()
+        self.universe.init_clean_universe()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write_module(self, name, result_value):
+        module_path = os.path.join(self.directory.name, name)
+
+        with open(module_path, "wb") as module_file_obj:
+            module_file_obj.write(_module_bytes(
+                literals=[_small_integer_literal(result_value)],
+                bytecode=[Opcodes.PUSH_LITERAL, 0x00],
+                stack_usage=1
+            ))
+
+        return module_path
+
+    def test_run_modules(self):
+        module_paths = [self._write_module("module{}".format(index), index) for index in range(5)]
+
+        responses = dict(vm_worker_pool.run_modules(self.universe, module_paths, worker_count=2))
+
+        self.assertTrue(
+            all(responses[module_paths[index]]["result"] == index for index in range(5)),
+            "Worker pool must run every submitted module and report its result"
+        )
+
+    def test_missing_module(self):
+        missing_path = os.path.join(self.directory.name, "missing")
+
+        responses = dict(vm_worker_pool.run_modules(self.universe, [missing_path], worker_count=1))
+
+        self.assertTrue(
+            responses[missing_path]["status"] == "failed",
+            "When module file can't be read, worker must report failure instead of dying"
+        )
+
+    def test_dead_worker(self):
+        # module looping forever, so worker is surely running it when it is killed
+        looping_path = os.path.join(self.directory.name, "looping")
+
+        with open(looping_path, "wb") as module_file_obj:
+            module_file_obj.write(_module_bytes(literals=[], bytecode=[Opcodes.JUMP_BACKWARD, 0x01], stack_usage=0))
+
+        queued_path = self._write_module("queued", 1)
+
+        with vm_worker_pool.WorkerPool(self.universe, worker_count=1) as pool:
+            pool.submit(looping_path)
+            pool.submit(queued_path)
+
+            pool._workers[0].process.kill()
+
+            responses = dict(pool.get_result() for _ in range(2))
+
+        self.assertTrue(
+            responses[looping_path]["status"] == "failed" and pool.get_pending_job_count() == 0,
+            "When worker dies while running module, the module must be reported as failed instead of waited for forever"
+        )
+
+        self.assertTrue(
+            responses[queued_path]["status"] == "failed",
+            "When no worker is left, queued modules must be reported as failed"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()